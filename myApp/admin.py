@@ -1,3 +1,19 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import OutboxEmail
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "subject", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    list_filter = ("status", "kind")
+    search_fields = ("subject", "to", "last_error")
+    readonly_fields = ("created_at", "sent_at", "locked_until")
+    actions = ["requeue"]
+
+    @admin.action(description="Requeue selected emails now")
+    def requeue(self, request, queryset):
+        from django.utils import timezone
+        n = queryset.exclude(status=OutboxEmail.SENT).update(
+            status=OutboxEmail.PENDING, attempts=0, next_attempt_at=timezone.now(), last_error="")
+        self.message_user(request, f"Requeued {n} email(s).")
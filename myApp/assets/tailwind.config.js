@@ -0,0 +1,9 @@
+// Tailwind v3 build config, used by `python manage.py build_assets`.
+// The theme lives in tailwind.theme.json so the CDN fallback ({% tailwind_css %}) shares it.
+module.exports = {
+  content: {
+    relative: true,
+    files: ["../templates/**/*.html", "../static/js/chat/**/*.js"],
+  },
+  theme: require("./tailwind.theme.json"),
+};
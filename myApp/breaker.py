@@ -0,0 +1,203 @@
+# myApp/breaker.py
+"""
+Circuit breaker + adaptive timeout for the OpenAI upstream.
+
+closed     calls flow; latencies feed a rolling window (for streams, the time to the
+           first delta). The per-call timeout is p99 × TIMEOUT_MULTIPLIER, clamped to
+           [MIN_TIMEOUT, MAX_TIMEOUT], so a brownout stops costing the full 30 s per request.
+open       after FAILURE_THRESHOLD consecutive failures, or a FAILURE_RATE over the
+           last WINDOW calls; every call fails fast (CircuitOpen) for COOLDOWN seconds.
+half-open  after the cooldown one probe call is let through; success closes the
+           circuit, failure re-opens it for another cooldown.
+
+Only upstream-health failures count: timeouts, connection errors, 429 and 5xx.
+A 400 is our bug, not a brownout.
+
+There is one breaker per model (`get_breaker(model)`).
+Configure with settings.CHAT_BREAKER (see DEFAULTS). Thread-safe; the lock is only
+held for bookkeeping, so it's fine to call from coroutines too.
+"""
+from __future__ import annotations
+import threading, time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DEFAULTS = {
+    "FAILURE_THRESHOLD": 5, "WINDOW": 20, "FAILURE_RATE": 0.5, "COOLDOWN": 15,
+    "MIN_TIMEOUT": 8, "MAX_TIMEOUT": 30, "TIMEOUT_MULTIPLIER": 1.5, "MIN_SAMPLES": 20,
+}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling upstream while the circuit is open."""
+
+
+def is_upstream_failure(e: BaseException) -> bool:
+    status = getattr(e, "status_code", None)
+    if status is None:
+        return True  # timeouts, connection resets, DNS…
+    return status == 429 or status >= 500
+
+
+class LatencyWindow:
+    """Last `size` latency samples (seconds) with cheap percentiles."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+
+
+class CircuitBreaker:
+    def __init__(self, conf: dict | None = None):
+        self.conf = {**DEFAULTS, **(conf or {})}
+        self.latency = LatencyWindow()
+        self._outcomes: deque[bool] = deque(maxlen=int(self.conf["WINDOW"]))  # True = failure
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.trips = 0
+
+    # ---- gate -------------------------------------------------------------
+    def allow(self) -> bool:
+        """True if a call may go upstream now (claims the probe slot when half-open)."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.conf["COOLDOWN"]:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def check(self) -> None:
+        if not self.allow():
+            raise CircuitOpen("OpenAI circuit is open")
+
+    @contextmanager
+    def guard(self, timed: bool = True):
+        """`with breaker.guard(): call()` — check, then record the outcome (latency if `timed`)."""
+        self.check()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        except BaseException:  # cancelled / generator closed: no verdict on upstream
+            self.release()
+            raise
+        self.record_success(time.monotonic() - started if timed else None)
+
+    def timeout(self) -> float:
+        c = self.conf
+        if len(self.latency) < c["MIN_SAMPLES"]:
+            return float(c["MAX_TIMEOUT"])
+        p99 = self.latency.percentile(99) or c["MAX_TIMEOUT"]
+        return float(min(c["MAX_TIMEOUT"], max(c["MIN_TIMEOUT"], p99 * c["TIMEOUT_MULTIPLIER"])))
+
+    # ---- outcomes ---------------------------------------------------------
+    def record_latency(self, seconds: float) -> None:
+        """A latency sample without an outcome (a stream's time to first delta)."""
+        self.latency.add(seconds)
+
+    def record_success(self, latency: float | None = None) -> None:
+        if latency is not None:
+            self.latency.add(latency)
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._outcomes.clear()
+            self._probe_in_flight = False
+
+    def record_failure(self, e: BaseException | None = None) -> None:
+        if isinstance(e, CircuitOpen):
+            return  # our own fast-fail, not an upstream outcome
+        if e is not None and not is_upstream_failure(e):
+            self.record_success()  # upstream answered; the request itself was bad
+            return
+        with self._lock:
+            self._outcomes.append(True)
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            window_full = len(self._outcomes) == self._outcomes.maxlen
+            rate = sum(self._outcomes) / len(self._outcomes)
+            if (self.state == HALF_OPEN
+                    or self.consecutive_failures >= self.conf["FAILURE_THRESHOLD"]
+                    or (window_full and rate >= self.conf["FAILURE_RATE"])):
+                if self.state != OPEN:
+                    self.trips += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a claimed probe slot without an outcome (e.g. the caller went away)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            state, failures = self.state, self.consecutive_failures
+            retry_in = max(0.0, self.conf["COOLDOWN"] - (time.monotonic() - self.opened_at)) if state == OPEN else 0.0
+            recent = list(self._outcomes)
+        p50, p99 = self.latency.percentile(50), self.latency.percentile(99)
+        return {
+            "state": state,
+            "consecutive_failures": failures,
+            "recent_failure_rate": round(sum(recent) / len(recent), 3) if recent else 0.0,
+            "retry_in_s": round(retry_in, 1),
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "timeout_s": round(self.timeout(), 2),
+            "latency_p50_s": round(p50, 3) if p50 is not None else None,
+            "latency_p99_s": round(p99, 3) if p99 is not None else None,
+        }
+
+
+_instances: dict[str, CircuitBreaker] = {}
+_instance_lock = threading.Lock()
+
+def get_breaker(model: str = "default") -> CircuitBreaker:
+    """Process-wide breaker for one upstream model, built from settings.CHAT_BREAKER on first use.
+
+    One per model, so a rate-limit storm on the cheap route doesn't open the circuit
+    (or stretch the timeout) for the model it falls back to.
+    """
+    breaker = _instances.get(model)
+    if breaker is None:
+        with _instance_lock:
+            breaker = _instances.get(model)
+            if breaker is None:
+                breaker = _instances[model] = CircuitBreaker(getattr(settings, "CHAT_BREAKER", {}))
+    return breaker
+
+def all_breakers() -> dict[str, CircuitBreaker]:
+    with _instance_lock:
+        return dict(_instances)
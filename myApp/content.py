@@ -0,0 +1,219 @@
+# myApp/content.py
+"""
+Site content: tiers, comparison table, FAQ, testimonials and the rest of the homepage.
+
+This is the single source for everything that describes Lioraè Co. to visitors:
+    - the homepage context (`HOME_CONTEXT`);
+    - the offline chat answers (`offline.build_intents`);
+    - the tier, FAQ and process sections of the chat system prompt (`TIERS_PROMPT`, `FAQ_PROMPT`,
+      `PROCESS_PROMPT`);
+    - the contact form's service checkboxes (`SERVICE_LABELS`).
+Editing a tier here updates all four, so the site and the assistant can't drift apart.
+
+Records are frozen, slotted dataclasses and collections are tuples. Everything is
+built once at import and shared by every request; nothing here is allocated per hit.
+`VERSION` fingerprints the content, and the page cache keys on it.
+"""
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass
+from types import MappingProxyType
+
+
+@dataclass(frozen=True, slots=True)
+class Tier:
+    name: str
+    price: str
+    tag: str
+    badge: str
+    bullets: tuple[str, ...]
+    wide: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class CompareRow:
+    feature: str
+    cells: tuple[str, ...]  # one per tier, in TIERS order
+
+
+@dataclass(frozen=True, slots=True)
+class FaqItem:
+    key: str
+    question: str
+    answer: str  # long form, as shown on the homepage
+    short: str   # one or two sentences, for chat answers and the prompt
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessStep:
+    name: str
+    detail: str
+
+
+@dataclass(frozen=True, slots=True)
+class Testimonial:
+    quote: str
+    author: str
+    role: str
+
+
+@dataclass(frozen=True, slots=True)
+class Stat:
+    label: str
+    value: str
+    delta: str
+    trend: str  # "up" | "down"
+
+
+@dataclass(frozen=True, slots=True)
+class Logo:
+    src: str
+    alt: str
+
+
+# ------------------------------------------------------------
+# Offer
+# ------------------------------------------------------------
+TIERS: tuple[Tier, ...] = (
+    Tier("IGNITE", "PHP 75,000 / month", "Smart Social Foundations", "Best for startups",
+         ("20 posts • 25 stories • 3 reels", "AI-assisted captions & hashtags", "Content calendar + auto-scheduling",
+          "Basic landing/portfolio + hosting", "Monthly analytics report")),
+    Tier("SYNC", "PHP 95,000 / month", "Social + Web Alignment", "Lead-gen ready",
+         ("30 posts • 35 stories • 6 reels", "Campaign strategy & funnel planning", "Landing page optimization + CRM",
+          "AI trend suggestions • conversion copy", "Lead & engagement dashboard")),
+    Tier("VISION", "PHP 120,000 / month", "AI-Enhanced Growth Engine", "Min. 3-month plan",
+         ("25 posts • 25 stories • 8 reels", "Predictive campaign builder", "Social listening & competitor analysis",
+          "Bi-weekly analytics & retargeting", "Advanced dashboards & automation")),
+    Tier("AUTHORITY", "PHP 150,000 / month", "Omnipresence + Automation", "Thought leadership",
+         ("40 posts • 40 stories • 10 reels", "Omnichannel (IG/TikTok/FB/LinkedIn)",
+          "Sentiment heatmap & campaign intelligence", "Dynamic website + CRM automation")),
+    Tier("ASCEND", "PHP 200,000+ / month", "Full Growth Ecosystem", "Enterprise",
+         ("50+ posts across platforms", "Full funnel strategy & ad support", "Weekly trend & business intelligence",
+          "Enterprise automation & personalization"), wide=True),
+)
+
+COMPARE_ROWS: tuple[CompareRow, ...] = (
+    CompareRow("Posts / Stories / Reels", ("20 / 25 / 3", "30 / 35 / 6", "25 / 25 / 8", "40 / 40 / 10", "50+ / 50+ / 10+")),
+    CompareRow("AI-assisted captions & hashtags", ("✓", "✓", "✓", "✓", "✓")),
+    CompareRow("Content calendar & auto-scheduling", ("✓", "✓", "✓", "✓", "✓")),
+    CompareRow("Campaign strategy & funnel planning", ("—", "✓", "✓", "✓", "✓")),
+    CompareRow("Landing page / Website + CRM", ("Basic site + hosting", "Landing + CRM", "Optimization + CRM",
+                                                "Dynamic site + CRM automation", "Enterprise personalization")),
+    CompareRow("Analytics cadence", ("Monthly", "Leads dashboard", "Bi-weekly + retargeting", "Advanced dashboards", "Weekly BI")),
+    CompareRow("Social listening & competitor analysis", ("—", "—", "✓", "✓", "✓")),
+    CompareRow("Ad support", ("—", "—", "—", "—", "✓")),
+)
+
+SERVICE_LABELS: tuple[str, ...] = (
+    "Content", "Reels", "Community", "Paid Social", "Landing Page", "CRM & Automation", "Analytics",
+)
+
+STEPS: tuple[str, ...] = ("Discovery", "Strategy", "Tech Integration", "AI Empowerment", "Growth & Optimization")
+
+# How an engagement runs, as the assistant explains it (the homepage shows STEPS)
+PROCESS: tuple[ProcessStep, ...] = (
+    ProcessStep("Discover & Audit", "kickoff, goals, audience, baseline."),
+    ProcessStep("Strategy", "messaging, pillars, campaign roadmap."),
+    ProcessStep("Setup", "stack, scheduler, CRM, pixels, analytics."),
+    ProcessStep("Ship", "weekly content (AI-assisted captions, best-time posting), light automations."),
+    ProcessStep("Review & Scale", "dashboards, learnings, iterate, retarget, expand winners."),
+)
+
+FAQ: tuple[FaqItem, ...] = (
+    FaqItem("website", "Do I need a website to start with your services?",
+            "Not necessarily. If you don’t have one yet, we can build a starter landing page as part of our "
+            "packages to give your brand a digital home.",
+            "Not necessarily. We can ship a starter landing page so your brand has a clean digital home."),
+    FaqItem("ai", "How does AI help my business if I’m a small startup?",
+            "AI saves you time and maximizes results—from generating on-brand captions to predicting the best "
+            "posting times and automating lead capture. It makes your business more efficient, even with a small team.",
+            "From on-brand captioning to best-time posting and chatbot lead capture, AI saves hours and lifts consistency."),
+    FaqItem("social_only", "What if I only need Social Media Management?",
+            "Our packages are designed to scale. You can start with social foundations (Tier 1) and later upgrade "
+            "to include web funnels, automation, and AI tools as your business grows.",
+            "Yes. Begin with IGNITE and upgrade to funnels/automation as you grow."),
+    FaqItem("results", "How long before I see results?",
+            "Most clients see improved engagement and visibility in the first 1–2 months, while lead conversions "
+            "and ROI typically become clear within 3–6 months of consistent campaigns.",
+            "Engagement typically uplifts within 1–2 months; conversions/ROI often clarify within 3–6 months "
+            "with consistent campaigns."),
+    FaqItem("ownership", "Who owns the content and tools you create for us?",
+            "All content, websites, and customized AI tools we create for you belong to your business. We manage "
+            "and optimize them on your behalf.",
+            "You do. All content, sites and customized AI tools we create belong to your business; we manage and "
+            "optimize them on your behalf."),
+    FaqItem("all_in_one", "What makes this different from hiring separate freelancers or agencies?",
+            "With us, you get an all-in-one growth system: creative storytelling, tech integration, and AI-powered "
+            "automation—saving you time, cost, and the hassle of coordinating multiple providers.",
+            "One growth system instead of several vendors: storytelling, tech integration and AI-powered "
+            "automation under one retainer."),
+)
+
+# ------------------------------------------------------------
+# Social proof and imagery
+# ------------------------------------------------------------
+TESTIMONIALS: tuple[Testimonial, ...] = (
+    Testimonial("From scattered posts to a real funnel—we saw lift in 6 weeks.", "Amira", "COO"),
+    Testimonial("Clean, premium, and measurable. Exactly what we needed.", "Rami", "CMO"),
+    Testimonial("Finally feels like our brand—and it converts.", "Leah", "Founder"),
+    Testimonial("Strategy-first content. The dashboards made ROI obvious.", "Noah", "Head of Growth"),
+)
+
+STATS: tuple[Stat, ...] = (
+    Stat("Total Users", "50,789", "8.5% from yesterday", "up"),
+    Stat("Total Orders", "20,393", "1.3% from last week", "up"),
+    Stat("Total Sales", "$60,000", "4.3% from yesterday", "down"),
+    Stat("Total Pending", "5,040", "1.8% from yesterday", "up"),
+)
+
+# Stock images, self-hosted: `manage.py import_images` fetches each remote original once
+# into static/ under its key (resized and recompressed). Templates reference the key with
+# `{% responsive_img %}`, which serves the hashed local copy, or hotlinks the remote URL
+# until the import has run.
+_UNSPLASH = "https://images.unsplash.com/photo-{}?auto=format&fit=crop&w=1600&q=80"
+_PHOTOS = ("1521737604893-d14cc237f11d", "1522252234503-e356532cafd5", "1529101091764-c3526daf38fe",
+           "1518770660439-4636190af475", "1556761175-4b46a572b786", "1519389950473-47ba0277781c",
+           "1542744173-05336fcc7ad4", "1498050108023-c5249f4df085")
+_LOGO_NAMES = ("Stripe", "Shopify", "HubSpot", "Notion", "Figma", "Klaviyo", "Meta Ads", "Google Ads")
+_AVATARS = (32, 11, 5, 21, 47, 58)  # testimonial headshots
+
+REMOTE_IMAGES: MappingProxyType[str, str] = MappingProxyType({
+    **{f"img/stock/photo-{pid.split('-')[0]}.jpg": _UNSPLASH.format(pid) for pid in _PHOTOS},
+    **{f"img/stock/logo-{name.lower().replace(' ', '-')}.png":
+       f"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text={name.replace(' ', '+')}" for name in _LOGO_NAMES},
+    "img/stock/logo-mark.png": "https://dummyimage.com/200x200/0b0f1a/ffffff.png&text=L",
+    **{f"img/stock/avatar-{n}.jpg": f"https://i.pravatar.cc/80?img={n}" for n in _AVATARS},
+})
+
+LOGOS: tuple[Logo, ...] = tuple(
+    Logo(f"img/stock/logo-{name.lower().replace(' ', '-')}.png", name) for name in _LOGO_NAMES
+)
+
+IMAGES: tuple[str, ...] = tuple(f"img/stock/photo-{pid.split('-')[0]}.jpg" for pid in _PHOTOS)
+OG_IMAGE = IMAGES[4]
+LOGO = "img/stock/logo-mark.png"
+IG_HANDLE = "liorae"
+
+# ------------------------------------------------------------
+# Derived, built once
+# ------------------------------------------------------------
+HOME_CONTEXT = MappingProxyType({
+    "images": IMAGES, "steps": STEPS, "faq": FAQ, "stats": STATS, "tiers": TIERS,
+    "testimonials": TESTIMONIALS, "compare_rows": COMPARE_ROWS, "logos": LOGOS,
+    "service_labels": SERVICE_LABELS, "og_image": OG_IMAGE, "logo": LOGO,
+    "ig_handle": IG_HANDLE,
+})
+
+def _tiers_prompt() -> str:
+    blocks = []
+    for i, t in enumerate(TIERS, 1):
+        bullets = "\n".join(f"   - {b}" for b in t.bullets)
+        blocks.append(f"{i}) {t.name} — “{t.tag}” ({t.price}; {t.badge})\n{bullets}")
+    return "Service tiers (typical inclusions; scopes can be tailored)\n" + "\n\n".join(blocks)
+
+TIERS_PROMPT = _tiers_prompt()
+FAQ_PROMPT = "FAQs (quick answers)\n" + "\n".join(f"- {f.question} {f.short}" for f in FAQ)
+PROCESS_PROMPT = "Process (how we work)\n" + "\n".join(f"{i}) {s.name} — {s.detail}" for i, s in enumerate(PROCESS, 1))
+
+VERSION = hashlib.sha256(repr((TIERS, COMPARE_ROWS, SERVICE_LABELS, STEPS, FAQ, TESTIMONIALS, STATS,
+                               LOGOS, IMAGES, LOGO, IG_HANDLE, REMOTE_IMAGES.items())).encode("utf-8")).hexdigest()[:12]
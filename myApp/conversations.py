@@ -0,0 +1,169 @@
+# myApp/conversations.py
+"""
+Server-side chat memory keyed by the session's `chat_cid`.
+
+Each conversation keeps a rolling window of recent turns under a token budget. When the
+window overflows, the oldest turns are folded into a short extractive summary (first
+sentence of each message; the oldest lines drop off first), so follow-ups keep their context without
+resending the whole transcript or paying for a summarization call.
+
+Configure with settings.CHAT_MEMORY:
+    {"BACKEND": "local" | "django", "ALIAS": "default", "MAX_TOKENS": 600,
+     "SUMMARY_TOKENS": 150, "TTL": 7200, "MAX_CONVERSATIONS": 2000}
+Conversations idle for TTL seconds are dropped; the local backend also evicts the
+least recently used conversation beyond MAX_CONVERSATIONS.
+"""
+from __future__ import annotations
+import re, threading, time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .prompts import count_tokens
+
+DEFAULTS = {
+    "BACKEND": "local", "ALIAS": "default",
+    "MAX_TOKENS": 600, "SUMMARY_TOKENS": 150,
+    "TTL": 2 * 60 * 60, "MAX_CONVERSATIONS": 2000,
+}
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s")
+
+
+def _gist(text: str, limit: int = 160) -> str:
+    first = _SENTENCE.split(" ".join((text or "").split()), maxsplit=1)[0]
+    return first if len(first) <= limit else first[: limit - 1].rstrip() + "…"
+
+
+@dataclass
+class Conversation:
+    summary: list[str] = field(default_factory=list)  # oldest first
+    turns: list[tuple[str, str]] = field(default_factory=list)  # (role, content), oldest first
+
+    def tokens(self) -> int:
+        return sum(count_tokens(c) for _, c in self.turns) + sum(count_tokens(s) for s in self.summary)
+
+    def messages(self) -> list[dict]:
+        """Chat-completions messages for this window (summary first, then verbatim turns)."""
+        out = []
+        if self.summary:
+            out.append({"role": "system",
+                        "content": "Earlier in this conversation:\n" + "\n".join(self.summary)})
+        out += [{"role": r, "content": c} for r, c in self.turns]
+        return out
+
+    def compact(self, max_tokens: int, summary_tokens: int) -> None:
+        # fold oldest turns into the summary, but always keep the latest exchange verbatim
+        while len(self.turns) > 2 and self.tokens() > max_tokens:
+            role, content = self.turns.pop(0)
+            self.summary.append(f"- {'User' if role == 'user' else 'Liora'}: {_gist(content)}")
+        while self.summary and sum(count_tokens(s) for s in self.summary) > summary_tokens:
+            self.summary.pop(0)
+
+
+# ------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------
+class LocalBackend:
+    def __init__(self, max_conversations: int):
+        self.max_conversations = max(1, int(max_conversations))
+        self._data: OrderedDict[str, tuple[float, Conversation]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, cid: str) -> Conversation | None:
+        with self._lock:
+            item = self._data.get(cid)
+            if item is None:
+                return None
+            expires, conv = item
+            if expires < time.monotonic():
+                del self._data[cid]
+                return None
+            return Conversation(list(conv.summary), list(conv.turns))
+
+    def save(self, cid: str, conv: Conversation, ttl: int) -> None:
+        with self._lock:
+            self._data[cid] = (time.monotonic() + ttl, conv)
+            self._data.move_to_end(cid)
+            while len(self._data) > self.max_conversations:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+    """Shared across workers; size eviction is the cache's own."""
+
+    def __init__(self, alias: str):
+        from django.core.cache import caches
+        self._cache = caches[alias]
+
+    def load(self, cid: str) -> Conversation | None:
+        raw = self._cache.get(f"chatmem:{cid}")
+        if raw is None:
+            return None
+        return Conversation(list(raw["summary"]), [tuple(t) for t in raw["turns"]])
+
+    def save(self, cid: str, conv: Conversation, ttl: int) -> None:
+        self._cache.set(f"chatmem:{cid}", {"summary": conv.summary, "turns": conv.turns}, ttl)
+
+
+# ------------------------------------------------------------
+# Front
+# ------------------------------------------------------------
+class ConversationStore:
+    def __init__(self, backend, max_tokens: int, summary_tokens: int, ttl: int):
+        self.backend = backend
+        self.max_tokens = int(max_tokens)
+        self.summary_tokens = int(summary_tokens)
+        self.ttl = int(ttl)
+
+    def window(self, cid: str | None) -> Conversation:
+        if not cid:
+            return Conversation()
+        try:
+            return self.backend.load(cid) or Conversation()
+        except Exception:
+            return Conversation()  # losing memory beats failing the turn
+
+    def append(self, cid: str | None, user_msg: str, reply: str) -> None:
+        if not cid:
+            return
+        conv = self.window(cid)
+        conv.turns += [("user", user_msg), ("assistant", reply)]
+        conv.compact(self.max_tokens, self.summary_tokens)
+        try:
+            self.backend.save(cid, conv, self.ttl)
+        except Exception:
+            pass
+
+    async def awindow(self, cid: str | None) -> Conversation:
+        if isinstance(self.backend, LocalBackend):
+            return self.window(cid)
+        return await sync_to_async(self.window)(cid)
+
+    async def aappend(self, cid: str | None, user_msg: str, reply: str) -> None:
+        if isinstance(self.backend, LocalBackend):
+            return self.append(cid, user_msg, reply)
+        await sync_to_async(self.append)(cid, user_msg, reply)
+
+
+_instance: ConversationStore | None = None
+_instance_lock = threading.Lock()
+
+def get_conversations() -> ConversationStore:
+    """Process-wide store built from settings.CHAT_MEMORY on first use."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                conf = {**DEFAULTS, **getattr(settings, "CHAT_MEMORY", {})}
+                if conf["BACKEND"] == "django":
+                    backend = DjangoCacheBackend(conf["ALIAS"])
+                else:
+                    backend = LocalBackend(conf["MAX_CONVERSATIONS"])
+                _instance = ConversationStore(backend, conf["MAX_TOKENS"], conf["SUMMARY_TOKENS"], conf["TTL"])
+    return _instance
@@ -0,0 +1,174 @@
+# myApp/critical.py
+"""
+Critical-CSS extraction for the public pages.
+
+`extract(css, html)` keeps the rules in `css` whose selectors can match markup in `html`
+(the rendered page up to its FOLD_MARKER). It is a conservative match with no browser:
+a selector is kept when every class, id and tag it names occurs in that markup.
+Pseudo-classes, pseudo-elements and attribute selectors are ignored, so `.btn:hover`
+counts as `.btn`, and `:root`/`*` always match. @media/@supports blocks keep whichever
+of their rules survive, and @keyframes are kept only if a kept rule refers to them.
+Anything dropped still arrives with the full stylesheet, which loads without blocking
+render (see `{% page_styles %}`).
+
+`manage.py build_assets --only critical` writes one file per page and fails when a page's
+inline CSS goes over BUDGET. Configure with settings.CRITICAL_CSS (see DEFAULTS).
+"""
+from __future__ import annotations
+import re
+
+from django.conf import settings
+
+FOLD_MARKER = "<!-- below-the-fold"
+
+DEFAULTS = {
+    "BUDGET": 20 * 1024,  # bytes of inline <style> per page
+    # classes/ids that are on screen at first paint but not in the page markup above the
+    # fold: the fixed chat launcher, and state classes that scripts add straight after load
+    "ALWAYS": ("chat-toggle", "chat-preview", "pulse", "show", "inview"),
+}
+
+
+def conf() -> dict:
+    return {**DEFAULTS, **getattr(settings, "CRITICAL_CSS", {})}
+
+
+# ------------------------------------------------------------
+# Markup side: what's above the fold
+# ------------------------------------------------------------
+_CLASS_ATTR = re.compile(r"""\sclass\s*=\s*["']([^"']*)["']""")
+_ID_ATTR = re.compile(r"""\sid\s*=\s*["']([^"']*)["']""")
+_TAG = re.compile(r"<([a-zA-Z][\w-]*)")
+
+
+def above_the_fold(html: str) -> str:
+    """The page's markup up to FOLD_MARKER; ValueError if the template has none."""
+    cut = html.find(FOLD_MARKER)
+    if cut < 0:
+        raise ValueError(f"no {FOLD_MARKER!r} marker in the page")
+    return html[:cut]
+
+
+def _present(html: str, always=()) -> set[str]:
+    names = set(always)
+    for m in _CLASS_ATTR.finditer(html):
+        names.update(m.group(1).split())
+    names.update(m.group(1) for m in _ID_ATTR.finditer(html))
+    names.update(m.group(1).lower() for m in _TAG.finditer(html))
+    return names
+
+
+# ------------------------------------------------------------
+# Selector side
+# ------------------------------------------------------------
+# escapes (Tailwind's `.md\:py-12`, `.\32xl`) are swapped for private-use characters first,
+# so the `:`/`[`/`.` they hide aren't mistaken for selector syntax
+_ESCAPE = re.compile(r"\\([0-9a-fA-F]{1,6}\s?|.)", re.S)
+_PRIVATE = 0xF0000
+_ATTR = re.compile(r"\[[^\]]*\]")
+_PSEUDO = re.compile(r"::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?")
+_NAME = r"[\w\-\U000F0000-\U000FFFFF]+"
+_CLASS_OR_ID = re.compile(rf"[.#]({_NAME})")
+_TYPE = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+
+
+def _hide_escape(m: re.Match) -> str:
+    esc = m.group(1)
+    char = chr(int(esc, 16)) if re.fullmatch(r"[0-9a-fA-F]{1,6}\s?", esc) else esc
+    return chr(_PRIVATE + ord(char)) if ord(char) < 0x10000 else char
+
+
+def _unhide(name: str) -> str:
+    return "".join(chr(ord(c) - _PRIVATE) if ord(c) >= _PRIVATE else c for c in name)
+
+
+def _split(text: str, sep: str = ",") -> list[str]:
+    """Split on `sep` outside parentheses/brackets."""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _matches(selector: str, present: set[str]) -> bool:
+    sel = _ESCAPE.sub(_hide_escape, selector)
+    sel = _PSEUDO.sub("", _ATTR.sub("", sel))
+    needed = {_unhide(n) for n in _CLASS_OR_ID.findall(sel)}
+    needed.update(t.lower() for t in _TYPE.findall(_CLASS_OR_ID.sub("", sel)))
+    return needed <= present
+
+
+# ------------------------------------------------------------
+# Stylesheet side
+# ------------------------------------------------------------
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_NESTING_AT_RULES = ("@media", "@supports", "@layer")
+_KEYFRAMES = re.compile(r"@(?:-webkit-)?keyframes\s+([\w-]+)")
+
+
+def _blocks(css: str):
+    """Top-level (prelude, body) pairs; body is None for statements like @import."""
+    start = depth = 0
+    quote = prelude = None
+    body_start = 0
+    for i, ch in enumerate(css):
+        if quote:
+            if ch == quote and css[i - 1] != "\\":
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "{":
+            if depth == 0:
+                prelude, body_start = css[start:i].strip(), i + 1
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                yield prelude, css[body_start:i]
+                start = i + 1
+        elif ch == ";" and depth == 0:
+            if css[start:i].strip():
+                yield css[start:i].strip(), None
+            start = i + 1
+
+
+def _select(css: str, present: set[str], keyframes: dict[str, str]) -> list[str]:
+    kept = []
+    for prelude, body in _blocks(css):
+        if body is None:
+            kept.append(prelude + ";")
+        elif prelude.startswith("@"):
+            kf = _KEYFRAMES.match(prelude)
+            if kf:
+                keyframes[kf.group(1)] = f"{prelude}{{{body}}}"
+            elif prelude.split(None, 1)[0].lower() in _NESTING_AT_RULES:
+                inner = _select(body, present, keyframes)
+                if inner:
+                    kept.append(f"{prelude}{{{''.join(inner)}}}")
+            else:  # @font-face, @page, @property: small and global
+                kept.append(f"{prelude}{{{body}}}")
+        elif any(_matches(sel, present) for sel in _split(prelude)):
+            kept.append(f"{prelude}{{{body}}}")
+    return kept
+
+
+def extract(css: str, html: str, always=()) -> str:
+    """The rules of `css` that apply to `html`, minified."""
+    keyframes: dict[str, str] = {}
+    out = "".join(_select(_COMMENT.sub("", css), _present(html, always), keyframes))
+    used = [text for name, text in keyframes.items() if re.search(rf"\b{re.escape(name)}\b", out)]
+    return minify_css(out + "".join(used))
+
+
+def minify_css(css: str) -> str:
+    css = _COMMENT.sub("", css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
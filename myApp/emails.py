@@ -0,0 +1,71 @@
+# myApp/emails.py
+"""
+Rendering for transactional emails.
+
+Each email is a pair of templates, `emails/<name>.html` and `emails/<name>.txt`.
+`get_email(name)` looks the pair up and compiles it once per process, then keeps the
+compiled `Template` objects. `render(context)` builds a single template `Context` and
+renders both variants from it, so nothing is looked up, parsed or wrapped twice per
+message. The .txt variant is rendered without HTML autoescaping, since it is plain
+text ("O'Brien", not "O&#x27;Brien").
+
+CACHE is on by default. It doesn't follow DEBUG, because this site runs with DEBUG on in
+production. Turn it off (EMAIL_TEMPLATE_CACHE=0) while editing the templates, and the
+pair is then loaded again on every call, so edits show up without a restart. Django's cached
+template loader, which is on by default, also keeps lookups cheap for everything else.
+
+`manage.py bench_email_render` compares this with four `render_to_string` calls.
+Configure with settings.EMAIL_TEMPLATES (see DEFAULTS).
+"""
+from __future__ import annotations
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template import Context
+from django.template.loader import get_template
+
+DEFAULTS = {"CACHE": True}
+
+
+class EmailTemplate:
+    def __init__(self, name: str):
+        self.name = name
+        # backend wrappers -> engine templates: render() then takes a Context we build once
+        self.html = get_template(f"emails/{name}.html").template
+        self.text = get_template(f"emails/{name}.txt").template
+
+    def render(self, context: dict) -> tuple[str, str]:
+        """(text, html) for one message, both rendered from the same Context."""
+        ctx = Context(context, autoescape=False)
+        text = self.text.render(ctx)
+        ctx.autoescape = True
+        html = self.html.render(ctx)
+        return text, html
+
+    def message(self, subject: str, to: list[str], context: dict, *, from_email: str | None = None,
+                reply_to: list[str] | None = None) -> EmailMultiAlternatives:
+        text, html = self.render(context)
+        msg = EmailMultiAlternatives(subject, text, from_email or settings.DEFAULT_FROM_EMAIL, to,
+                                     reply_to=reply_to)
+        msg.attach_alternative(html, "text/html")
+        return msg
+
+
+_compiled: dict[str, EmailTemplate] = {}
+_lock = threading.Lock()
+
+def _caching() -> bool:
+    return bool({**DEFAULTS, **getattr(settings, "EMAIL_TEMPLATES", {})}["CACHE"])
+
+def get_email(name: str) -> EmailTemplate:
+    """The compiled html/txt pair for `name`, built on first use."""
+    if not _caching():
+        return EmailTemplate(name)
+    tpl = _compiled.get(name)
+    if tpl is None:
+        with _lock:
+            tpl = _compiled.get(name)
+            if tpl is None:
+                tpl = _compiled[name] = EmailTemplate(name)
+    return tpl
@@ -1,6 +1,8 @@
 # myApp/forms.py
 from django import forms
 
+from .content import SERVICE_LABELS
+
 BUDGET_CHOICES = [
     ("50-75", "PHP 50k – 75k"),
     ("75-120", "PHP 75k – 120k"),
@@ -15,11 +17,6 @@ TIMELINE_CHOICES = [
     ("6m+", "6+ months"),
 ]
 
-SERVICE_LABELS = [
-    "Content", "Reels", "Community", "Paid Social",
-    "Landing Page", "CRM & Automation", "Analytics",
-]
-
 class ContactForm(forms.Form):
     full_name = forms.CharField(max_length=120)
     email = forms.EmailField()
@@ -0,0 +1,317 @@
+# myApp/governor.py
+"""
+Concurrency governor for upstream LLM calls.
+
+At most LIMIT calls per process run at once. Later callers wait in a bounded priority
+queue. Returning visitors, who are mid-conversation, go ahead of first messages, and
+each priority is FIFO. Once MAX_QUEUE callers are waiting, new ones are shed at once
+(`Overloaded`) instead of piling up threads: the JSON views answer 503 with
+Retry-After (`too_busy`), and a stream gets BUSY_REPLY as its text.
+
+The wait is deadline-aware. A turn has TURN_DEADLINE seconds in all, and the call
+itself typically takes p50 of recent latencies (the slowest model's breaker window). A caller may
+queue for min(QUEUE_TIMEOUT, TURN_DEADLINE - p50) seconds; if that is already gone,
+waiting is pointless and it is shed right away.
+
+With CLUSTER_LIMIT > 0 a second, cluster-wide cap is kept in a Django cache alias
+(add/incr/decr; atomic on Redis/Memcached). A caller holding a local slot polls for
+a cluster slot until its deadline.
+
+`Governor` is for threads, `AsyncGovernor` for coroutines on one event loop. Both
+report queue depth, wait-time percentiles and shed counts. `try_acquire()` takes a slot
+only if one is free right now; hedged second calls use it, so they are counted too.
+
+Configure with settings.CHAT_GOVERNOR (see DEFAULTS).
+"""
+from __future__ import annotations
+import asyncio, heapq, itertools, math, threading, time
+from contextlib import asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+
+from .breaker import LatencyWindow, all_breakers
+
+DEFAULTS = {
+    "LIMIT": 16, "MAX_QUEUE": 32, "QUEUE_TIMEOUT": 8.0, "TURN_DEADLINE": 25.0,
+    "CLUSTER_LIMIT": 0, "ALIAS": "default", "TTL": 120, "POLL": 0.05, "RETRY_AFTER": 5,
+}
+
+BUSY_REPLY = "I’m swamped with messages right now — give me a few seconds and try again."
+
+RETURNING, NEW = 0, 1  # priorities; lower goes first
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing (or after queueing too long) when upstream capacity is spent."""
+
+    def __init__(self, reason: str, retry_after: float = DEFAULTS["RETRY_AFTER"]):
+        super().__init__(f"LLM capacity exhausted ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def too_busy(e: Overloaded) -> JsonResponse:
+    """503 + Retry-After for a shed turn (the chat widget shows `reply`, like ratelimit's 429)."""
+    resp = JsonResponse({"reply": BUSY_REPLY, "error": "overloaded", "reason": e.reason}, status=503)
+    resp["Retry-After"] = str(max(1, math.ceil(e.retry_after)))
+    return resp
+
+
+class _Base:
+    def __init__(self, conf: dict | None = None):
+        self.conf = {**DEFAULTS, **(conf or {})}
+        self.limit = max(1, int(self.conf["LIMIT"]))
+        self.max_queue = int(self.conf["MAX_QUEUE"])
+        self._active = 0
+        self._waiters: list[list] = []  # heap of [priority, seq, handle]
+        self._seq = itertools.count()
+        self.waits = LatencyWindow(500)
+        self.admitted = 0
+        self.queued = 0
+        self.max_depth = 0
+        self.shed: dict[str, int] = {}
+        self._cache = None
+        if int(self.conf["CLUSTER_LIMIT"]) > 0:
+            from django.core.cache import caches
+            self._cache = caches[self.conf["ALIAS"]]
+
+    def max_wait(self) -> float:
+        """Seconds a new caller may queue and still finish its call within the turn deadline."""
+        c = self.conf
+        # the route isn't chosen yet: assume the slowest model's typical call
+        expected = max((b.latency.percentile(50) or 0.0 for b in all_breakers().values()), default=0.0)
+        return min(float(c["QUEUE_TIMEOUT"]), float(c["TURN_DEADLINE"]) - expected)
+
+    def _shed(self, reason: str) -> Overloaded:
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+        return Overloaded(reason, float(self.conf["RETRY_AFTER"]))
+
+    def _remove(self, entry: list) -> None:
+        try:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+        except ValueError:
+            pass
+
+    # ---- cluster-wide cap (cache counter) ---------------------------------
+    def _cluster_try(self) -> bool:
+        k = "chatgov:inflight"
+        ttl = int(self.conf["TTL"])
+        self._cache.add(k, 0, ttl)
+        try:
+            n = self._cache.incr(k)
+        except ValueError:
+            self._cache.add(k, 1, ttl)
+            n = 1
+        if n > int(self.conf["CLUSTER_LIMIT"]):
+            self._cluster_release()
+            return False
+        return True
+
+    def _cluster_release(self) -> None:
+        try:
+            self._cache.decr("chatgov:inflight")
+        except ValueError:
+            pass
+
+    def _cluster_inflight(self) -> int | None:
+        if self._cache is None:
+            return None
+        try:
+            return int(self._cache.get("chatgov:inflight") or 0)
+        except Exception:
+            return None
+
+    def stats(self) -> dict:
+        p50, p95 = self.waits.percentile(50), self.waits.percentile(95)
+        return {
+            "limit": self.limit, "in_flight": self._active, "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue, "max_depth_seen": self.max_depth,
+            "admitted": self.admitted, "queued": self.queued, "shed": dict(self.shed),
+            "wait_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "wait_p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "max_wait_s": round(self.max_wait(), 2),
+            "cluster_limit": int(self.conf["CLUSTER_LIMIT"]) or None,
+            "cluster_in_flight": self._cluster_inflight(),
+        }
+
+
+class Governor(_Base):
+    def __init__(self, conf: dict | None = None):
+        super().__init__(conf)
+        self._cond = threading.Condition()
+
+    def _acquire_local(self, priority: int, deadline: float) -> None:
+        with self._cond:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                raise self._shed("queue_full")
+            if deadline <= time.monotonic():
+                raise self._shed("deadline")
+            entry = [priority, next(self._seq), False]
+            heapq.heappush(self._waiters, entry)
+            self.queued += 1
+            self.max_depth = max(self.max_depth, len(self._waiters))
+            while not entry[2]:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._remove(entry)
+                    raise self._shed("queue_timeout")
+                self._cond.wait(remaining)
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now: no queueing, nothing shed. Pair with `release()`."""
+        with self._cond:
+            if self._active >= self.limit or self._waiters:
+                return False
+            self._active += 1
+        if self._cache is not None and not self._cluster_try():
+            self._release_local()
+            return False
+        with self._cond:
+            self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        if self._cache is not None:
+            self._cluster_release()
+        self._release_local()
+
+    def _release_local(self) -> None:
+        with self._cond:
+            if self._waiters:
+                heapq.heappop(self._waiters)[2] = True  # hand the slot straight to the next waiter
+                self._cond.notify_all()
+            else:
+                self._active -= 1
+
+    @contextmanager
+    def slot(self, priority: int = NEW):
+        """Hold one upstream slot for the body, or raise Overloaded."""
+        started = time.monotonic()
+        deadline = started + self.max_wait()
+        self._acquire_local(priority, deadline)
+        try:
+            if self._cache is not None:
+                while not self._cluster_try():
+                    if time.monotonic() + self.conf["POLL"] > deadline:
+                        with self._cond:
+                            raise self._shed("cluster_timeout")
+                    time.sleep(self.conf["POLL"])
+        except BaseException:
+            self._release_local()
+            raise
+        self.waits.add(time.monotonic() - started)
+        with self._cond:
+            self.admitted += 1
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return super().stats()
+
+
+class AsyncGovernor(_Base):
+    """All callers must share one event loop (one per ASGI worker)."""
+
+    async def _acquire_local(self, priority: int, deadline: float) -> None:
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("queue_full")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise self._shed("deadline")
+        fut = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), fut]
+        heapq.heappush(self._waiters, entry)
+        self.queued += 1
+        self.max_depth = max(self.max_depth, len(self._waiters))
+        try:
+            # not wait_for: on 3.11 it swallows a cancellation that lands after the grant
+            await asyncio.wait((fut,), timeout=remaining)
+        except asyncio.CancelledError:
+            self._remove(entry)
+            if fut.done() and not fut.cancelled():
+                self._release_local()  # granted as we were cancelled: pass it on
+            fut.cancel()
+            raise
+        if not fut.done():
+            self._remove(entry)
+            fut.cancel()
+            raise self._shed("queue_timeout")
+
+    async def try_acquire(self) -> bool:
+        if self._active >= self.limit or self._waiters:
+            return False
+        self._active += 1
+        if self._cache is not None and not await sync_to_async(self._cluster_try)():
+            self._release_local()
+            return False
+        self.admitted += 1
+        return True
+
+    async def release(self) -> None:
+        if self._cache is not None:
+            await sync_to_async(self._cluster_release)()
+        self._release_local()
+
+    def _release_local(self) -> None:
+        while self._waiters:
+            fut = heapq.heappop(self._waiters)[2]
+            if not fut.done():
+                fut.set_result(True)  # hand the slot straight to the next waiter
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = NEW):
+        started = time.monotonic()
+        deadline = started + self.max_wait()
+        await self._acquire_local(priority, deadline)
+        try:
+            if self._cache is not None:
+                while not await sync_to_async(self._cluster_try)():
+                    if time.monotonic() + self.conf["POLL"] > deadline:
+                        raise self._shed("cluster_timeout")
+                    await asyncio.sleep(self.conf["POLL"])
+        except BaseException:
+            self._release_local()
+            raise
+        self.waits.add(time.monotonic() - started)
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            await self.release()
+
+
+_instance: Governor | None = None
+_async_instance: AsyncGovernor | None = None
+_instance_lock = threading.Lock()
+
+def get_governor() -> Governor:
+    """Process-wide governor for threaded callers, built from settings.CHAT_GOVERNOR."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = Governor(getattr(settings, "CHAT_GOVERNOR", {}))
+    return _instance
+
+def get_async_governor() -> AsyncGovernor:
+    """Same, for coroutines on this worker's event loop."""
+    global _async_instance
+    if _async_instance is None:
+        with _instance_lock:
+            if _async_instance is None:
+                _async_instance = AsyncGovernor(getattr(settings, "CHAT_GOVERNOR", {}))
+    return _async_instance
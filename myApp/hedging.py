@@ -0,0 +1,216 @@
+# myApp/hedging.py
+"""
+Hedged upstream requests: first response wins.
+
+The primary call starts right away. If it hasn't returned after a delay taken from
+the recent latency distribution (p90 of the primary model's breaker window by default), a second
+call is fired — the same request, or the same prompt on a fallback model — and
+whichever succeeds first is used. If one attempt fails, the other can still win.
+
+Hedges are capped by BUDGET, the share of recent requests (last WINDOW) allowed to
+send a second call, so a slow patch can't double the upstream bill.
+
+Each hedge holds a governor slot while it runs (`try_acquire`, no queueing). When none
+is free the request isn't hedged: a saturated upstream gets no extra calls.
+
+`Hedger.run` is for threads. The primary runs on the caller's own thread, so it never
+waits behind other requests' work, and only the hedge goes to the small pool. A blocking
+SDK call can't be interrupted, so the caller returns once the primary is back: with the
+hedge's reply if that finished first, or if the primary failed. A hedge that loses keeps
+its thread and governor slot until it finishes. `Hedger.arun` is for coroutines, and
+there the loser task really is cancelled, so the first reply is returned right away.
+
+Configure with settings.CHAT_HEDGE (see DEFAULTS). Off unless ENABLED.
+"""
+from __future__ import annotations
+import asyncio, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .breaker import all_breakers, get_breaker
+
+DEFAULTS = {
+    "ENABLED": False, "PERCENTILE": 90, "MIN_DELAY": 1.0, "MAX_DELAY": 8.0,
+    "BUDGET": 0.1, "WINDOW": 200, "MODEL": None, "THREADS": 16,
+}
+
+
+class Hedger:
+    def __init__(self, conf: dict | None = None):
+        self.conf = {**DEFAULTS, **(conf or {})}
+        self.enabled = bool(self.conf["ENABLED"])
+        self.model: str | None = self.conf["MODEL"]  # None = repeat the primary request
+        self._recent: deque[bool] = deque(maxlen=int(self.conf["WINDOW"]))  # True = hedged
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self.requests = self.hedged = self.hedge_wins = self.over_budget = self.no_slot = 0
+
+    def delay(self, model: str = "default") -> float:
+        c = self.conf
+        p = get_breaker(model).latency.percentile(c["PERCENTILE"])
+        if p is None:
+            return float(c["MAX_DELAY"])
+        return float(min(c["MAX_DELAY"], max(c["MIN_DELAY"], p)))
+
+    def _begin(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self._recent.append(False)
+
+    def _claim_hedge(self) -> bool:
+        """Spend budget on a second call, if recent hedges leave room for one."""
+        with self._lock:
+            allowed = self.conf["BUDGET"] * max(len(self._recent), 20)
+            if sum(self._recent) + 1 > allowed:
+                self.over_budget += 1
+                return False
+            self._recent[-1] = True
+            self.hedged += 1
+            return True
+
+    def _won_by_hedge(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def _skip_no_slot(self) -> None:
+        with self._lock:
+            self.no_slot += 1
+
+    # ---- threads ----------------------------------------------------------
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(int(self.conf["THREADS"]), thread_name_prefix="chat-hedge")
+        return self._pool
+
+    @staticmethod
+    def _hedge_call(hedge, governor):
+        try:
+            return hedge()
+        finally:
+            if governor is not None:
+                governor.release()
+
+    def run(self, primary, hedge, model: str = "default", governor=None):
+        """
+        `primary` / `hedge` are zero-arg callables returning the reply; `model` is the primary's.
+        The hedge takes a slot of `governor` (a `Governor`) or doesn't run.
+        """
+        self._begin()
+        lock = threading.Lock()
+        state = {"done": False, "hedge": None}
+
+        def launch():
+            with lock:
+                if state["done"]:
+                    return
+                if governor is not None and not governor.try_acquire():
+                    self._skip_no_slot()
+                    return
+                if not self._claim_hedge():
+                    if governor is not None:
+                        governor.release()
+                    return
+                state["hedge"] = self._executor().submit(self._hedge_call, hedge, governor)
+
+        timer = threading.Timer(self.delay(model), launch)
+        timer.daemon = True
+        timer.start()
+        error = None
+        try:
+            result = primary()
+        except Exception as e:
+            error = e
+        finally:
+            with lock:
+                state["done"] = True
+                timer.cancel()
+        second = state["hedge"]
+        if second is None:
+            if error is not None:
+                raise error
+            return result
+        if error is None and not (second.done() and second.exception() is None):
+            return result  # the primary answered first; the hedge's reply is dropped
+        try:
+            reply = second.result()
+        except Exception:
+            if error is not None:
+                raise error
+            return result
+        self._won_by_hedge()
+        return reply
+
+    # ---- asyncio ----------------------------------------------------------
+    @staticmethod
+    async def _ahedge_call(hedge, governor):
+        try:
+            return await hedge()
+        finally:
+            if governor is not None:
+                await governor.release()
+
+    async def arun(self, primary, hedge, model: str = "default", governor=None):
+        """`primary` / `hedge` are zero-arg coroutine functions; `governor` is an `AsyncGovernor`."""
+        self._begin()
+        first = asyncio.ensure_future(primary())
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay(model))
+            if done:
+                return await first
+            if governor is not None and not await governor.try_acquire():
+                self._skip_no_slot()
+                return await first
+            if not self._claim_hedge():
+                if governor is not None:
+                    await governor.release()
+                return await first
+            second = asyncio.ensure_future(self._ahedge_call(hedge, governor))
+            tasks.append(second)
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        if t is second:
+                            self._won_by_hedge()
+                        return t.result()
+                    error = error or t.exception()
+            raise error
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = list(self._recent)
+            out = {
+                "enabled": self.enabled,
+                "model": self.model,
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "over_budget": self.over_budget,
+                "no_slot": self.no_slot,
+                "recent_hedge_rate": round(sum(recent) / len(recent), 3) if recent else 0.0,
+            }
+        out["delay_s"] = {model: round(self.delay(model), 2) for model in all_breakers()}
+        return out
+
+
+_instance: Hedger | None = None
+_instance_lock = threading.Lock()
+
+def get_hedger() -> Hedger:
+    """Process-wide hedger built from settings.CHAT_HEDGE on first use."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = Hedger(getattr(settings, "CHAT_HEDGE", {}))
+    return _instance
@@ -0,0 +1,210 @@
+# myApp/images.py
+"""
+Responsive image variants for the site's own images.
+
+`build()` (run by `manage.py build_images`) takes every JPEG/PNG under
+myApp/static/<SOURCES>. For each one it writes AVIF and WebP copies at each of WIDTHS
+that is narrower than the original (plus the original width) into myApp/static/<OUT>.
+Then collectstatic hashes them like any other static file, and whitenoise serves them
+with far-future caching. The results go into assets/images.json, with intrinsic sizes
+and a source digest so unchanged images are skipped next time.
+
+`{% responsive_img %}` reads the manifest and emits a <picture> with srcset/sizes and
+the original's width/height, so the browser reserves the box before the bytes arrive
+(no layout shift). An image that isn't in the manifest yet is rendered as a plain <img>.
+
+`import_remote()` (`manage.py import_images`) self-hosts hotlinked stock images (see
+content.REMOTE_IMAGES). Each original is downloaded once into IMPORT_CACHE, or read
+from a local directory, so the import runs offline. It is then capped at IMPORT_MAX_WIDTH,
+recompressed, and written into static/ under its key, ready for `build()`.
+
+AVIF needs a Pillow build with AVIF support (11.3+ wheels); without it, only WebP
+variants are written. Configure with settings.RESPONSIVE_IMAGES (see DEFAULTS).
+"""
+from __future__ import annotations
+import hashlib, json, shutil, threading, urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    from PIL import Image, ImageOps, features  # type: ignore
+except Exception:  # optional dependency (build time only)
+    Image = ImageOps = features = None  # type: ignore
+
+APP_DIR = Path(__file__).resolve().parent
+STATIC = APP_DIR / "static"
+MANIFEST = APP_DIR / "assets" / "images.json"
+
+DEFAULTS = {
+    "SOURCES": ("img",),
+    "OUT": "img/r",
+    "WIDTHS": (160, 320, 480, 768, 1080, 1600),
+    "FORMATS": ("avif", "webp"),
+    "QUALITY": {"avif": 50, "webp": 78},
+    "IMPORT_CACHE": APP_DIR / "assets" / "vendor" / "img",
+    "IMPORT_MAX_WIDTH": 1600,
+    "IMPORT_QUALITY": 82,  # JPEG
+}
+_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+_MIME = {"avif": "image/avif", "webp": "image/webp"}
+_SAVE_OPTS = {"webp": {"method": 6}, "avif": {"speed": 4}}  # slower encode, smaller files
+
+
+def _conf() -> dict:
+    return {**DEFAULTS, **getattr(settings, "RESPONSIVE_IMAGES", {})}
+
+
+@dataclass(frozen=True, slots=True)
+class ResponsiveImage:
+    width: int
+    height: int
+    variants: tuple[tuple[str, tuple[tuple[int, str], ...]], ...]  # (format, ((width, static name), ...))
+
+    def sources(self):
+        """(mime type, ((width, static name), ...)) per format, best format first."""
+        return tuple((_MIME[fmt], ws) for fmt, ws in self.variants)
+
+
+# ------------------------------------------------------------
+# Build (needs Pillow)
+# ------------------------------------------------------------
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def _formats(conf: dict) -> list[str]:
+    return [fmt for fmt in conf["FORMATS"] if fmt != "avif" or features.check("avif")]
+
+
+def _targets(width: int, widths) -> list[int]:
+    return sorted({w for w in widths if w < width} | {width})
+
+
+def build(force: bool = False, log=print) -> dict:
+    """Write missing/stale variants and the manifest; returns the manifest dict."""
+    if Image is None:
+        raise RuntimeError("Pillow is required to build responsive images (pip install Pillow)")
+    conf = _conf()
+    out_dir = STATIC / conf["OUT"]
+    old = json.loads(MANIFEST.read_text(encoding="utf-8")) if MANIFEST.exists() else {}
+    fmts = _formats(conf)
+    if "avif" in conf["FORMATS"] and "avif" not in fmts:
+        log("This Pillow build has no AVIF support; writing WebP only.")
+    manifest: dict = {}
+    for root in conf["SOURCES"]:
+        for src in sorted((STATIC / root).rglob("*")):
+            if src.suffix.lower() not in _EXTENSIONS or out_dir in src.parents:
+                continue
+            name = src.relative_to(STATIC).as_posix()
+            digest = _digest(src)
+            prev = old.get(name)
+            if (not force and prev and prev["digest"] == digest and prev["formats"] == fmts
+                    and all((STATIC / n).exists() for ws in prev["variants"].values() for _, n in ws)):
+                manifest[name] = prev
+                continue
+            with Image.open(src) as im:
+                im = ImageOps.exif_transpose(im)
+                width, height = im.size
+                if im.mode not in ("RGB", "RGBA"):
+                    im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+                variants: dict[str, list] = {}
+                stem = src.relative_to(STATIC / root).with_suffix("").as_posix().replace("/", "-")
+                for fmt in fmts:
+                    for w in _targets(width, conf["WIDTHS"]):
+                        rel = f"{conf['OUT']}/{stem}-{w}.{fmt}"
+                        resized = im if w == width else im.resize((w, round(height * w / width)), Image.LANCZOS)
+                        (STATIC / rel).parent.mkdir(parents=True, exist_ok=True)
+                        resized.save(STATIC / rel, fmt.upper(), quality=conf["QUALITY"][fmt], **_SAVE_OPTS.get(fmt, {}))
+                        variants.setdefault(fmt, []).append([w, rel])
+            manifest[name] = {"width": width, "height": height, "digest": digest, "formats": fmts,
+                              "variants": variants}
+            log(f"{name}: {width}x{height} -> {sum(len(v) for v in variants.values())} variants")
+    MANIFEST.write_text(json.dumps(manifest, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    _cache.clear()
+    return manifest
+
+
+def _fetch(url: str, dest: Path) -> None:
+    req = urllib.request.Request(url, headers={"User-Agent": "liorae-import_images/1.0"})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        body = resp.read()
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    dest.write_bytes(body)
+
+
+def _optimize(src: Path, dest: Path, conf: dict) -> None:
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.width > conf["IMPORT_MAX_WIDTH"]:
+            im = im.resize((conf["IMPORT_MAX_WIDTH"], round(im.height * conf["IMPORT_MAX_WIDTH"] / im.width)),
+                           Image.LANCZOS)
+        if dest.suffix.lower() == ".png":
+            im.save(dest, "PNG", optimize=True)
+        else:
+            im.convert("RGB").save(dest, "JPEG", quality=conf["IMPORT_QUALITY"], optimize=True, progressive=True)
+
+
+def import_remote(remote, source: Path | None = None, force: bool = False, log=print,
+                  keep_going: bool = False) -> list[str]:
+    """Self-host `remote` ({static name: url}); returns the names written.
+
+    Originals come from `source/<file name>` when given, else from IMPORT_CACHE, which
+    is filled from the network only for files it doesn't have yet. With `keep_going`, an
+    image that can't be fetched is logged and skipped (it keeps hotlinking its URL).
+    """
+    conf = _conf()
+    cache = Path(conf["IMPORT_CACHE"])
+    if Image is None:
+        log("Pillow isn't installed; copying originals without resizing or recompressing.")
+    written = []
+    for name, url in remote.items():
+        dest = STATIC / name
+        if dest.exists() and not force:
+            continue
+        filename = name.rsplit("/", 1)[-1]
+        original = (source or cache) / filename
+        if not original.exists():
+            if source is not None:
+                raise FileNotFoundError(f"{original} (for {name}, originally {url})")
+            try:
+                _fetch(url, original)
+            except OSError as e:
+                if not keep_going:
+                    raise
+                log(f"{name}: skipped, couldn't fetch {url} ({e})")
+                continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if Image is None:
+            shutil.copyfile(original, dest)
+        else:
+            _optimize(original, dest, conf)
+        log(f"{name}: {original.stat().st_size / 1024:.0f} KB -> {dest.stat().st_size / 1024:.0f} KB")
+        written.append(name)
+    return written
+
+
+# ------------------------------------------------------------
+# Lookup (no Pillow needed)
+# ------------------------------------------------------------
+_cache: dict = {}
+_lock = threading.Lock()
+
+def _load() -> dict[str, ResponsiveImage]:
+    key = MANIFEST.stat().st_mtime_ns if MANIFEST.exists() else None
+    with _lock:
+        if _cache.get("key") != key or "images" not in _cache:
+            raw = json.loads(MANIFEST.read_text(encoding="utf-8")) if key is not None else {}
+            _cache["images"] = {
+                name: ResponsiveImage(e["width"], e["height"], tuple(
+                    (fmt, tuple((w, n) for w, n in e["variants"][fmt])) for fmt in e["formats"]
+                    if fmt in e["variants"]))
+                for name, e in raw.items()
+            }
+            _cache["key"] = key
+        return _cache["images"]
+
+
+def get_image(name: str) -> ResponsiveImage | None:
+    return _load().get(name)
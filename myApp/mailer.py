@@ -0,0 +1,142 @@
+# myApp/mailer.py
+"""
+Persistent SMTP sessions for outbound mail.
+
+A `Mailer` holds one open connection from `get_connection()` (the configured
+EMAIL_BACKEND) and reuses it across messages and batches. That makes one TLS
+handshake and one login per session instead of one per message. The connection
+is recycled:
+    - after IDLE_TIMEOUT seconds unused, when it is checked with NOOP first
+      (servers drop idle sessions; Gmail after a few minutes);
+    - after MAX_MESSAGES messages or MAX_AGE seconds (providers cap both);
+    - after any send error, with one immediate retry on a fresh session when
+      the server had simply dropped us.
+
+`send_messages()` takes a batch, such as the client auto-reply and the team
+notification of one inquiry. It returns one outcome per message, so the outbox can
+retry exactly the ones that failed, and it records per-send latency.
+
+One Mailer per thread (`get_mailer()`); the outbox worker is single-threaded.
+Configure with settings.EMAIL_POOL (see DEFAULTS).
+"""
+from __future__ import annotations
+import logging, smtplib, threading, time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+from .breaker import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {"IDLE_TIMEOUT": 60, "MAX_AGE": 15 * 60, "MAX_MESSAGES": 100}
+
+# errors that mean "the session is gone", not "this message is bad"
+_DROPPED = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class Mailer:
+    def __init__(self, conf: dict | None = None):
+        self.conf = {**DEFAULTS, **(conf or {})}
+        self._conn = None
+        self._opened_at = 0.0
+        self._used_at = 0.0
+        self._sent_on_conn = 0
+        self.latency = LatencyWindow(500)
+        self.sent = self.failed = self.connects = self.reconnects = 0
+
+    # ---- session ----------------------------------------------------------
+    def _alive(self) -> bool:
+        smtp = getattr(self._conn, "connection", None)
+        if smtp is None:
+            return True  # not an SMTP backend (console/locmem/anymail): nothing to probe
+        try:
+            return smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _connection(self):
+        now = time.monotonic()
+        c = self.conf
+        if self._conn is not None:
+            stale = (now - self._opened_at > c["MAX_AGE"] or self._sent_on_conn >= c["MAX_MESSAGES"]
+                     or (now - self._used_at > c["IDLE_TIMEOUT"] and not self._alive()))
+            if stale:
+                self.reconnects += 1
+                self.close()
+        if self._conn is None:
+            conn = get_connection(fail_silently=False)
+            conn.open()
+            self._conn, self._sent_on_conn = conn, 0
+            self._opened_at = self._used_at = time.monotonic()
+            self.connects += 1
+        return self._conn
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # ---- sending ----------------------------------------------------------
+    def _send_one(self, msg) -> None:
+        for attempt in (1, 2):
+            conn = self._connection()
+            started = time.monotonic()
+            try:
+                conn.send_messages([msg])
+            except _DROPPED:
+                self.close()
+                if attempt == 2:
+                    raise
+                self.reconnects += 1
+                continue  # the server hung up on an idle/old session: one retry on a fresh one
+            except Exception:
+                self.close()  # unknown state after a failed transaction; start clean next time
+                raise
+            elapsed = time.monotonic() - started
+            self.latency.add(elapsed)
+            self._used_at = time.monotonic()
+            self._sent_on_conn += 1
+            logger.info("Mail to %s sent in %.0f ms", ", ".join(msg.to), elapsed * 1000)
+            return
+
+    def send_messages(self, messages) -> list[BaseException | None]:
+        """Send a batch over the shared session; returns None (sent) or the error, per message."""
+        messages = list(messages)
+        try:
+            self._connection()
+        except Exception as e:  # server unreachable / login refused: no point trying each message
+            self.close()
+            self.failed += len(messages)
+            return [e] * len(messages)
+        outcomes: list[BaseException | None] = []
+        for msg in messages:
+            try:
+                self._send_one(msg)
+            except Exception as e:
+                self.failed += 1
+                outcomes.append(e)
+            else:
+                self.sent += 1
+                outcomes.append(None)
+        return outcomes
+
+    def stats(self) -> dict:
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        return {"sent": self.sent, "failed": self.failed, "connects": self.connects,
+                "reconnects": self.reconnects,
+                "send_p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "send_p95_ms": round(p95 * 1000) if p95 is not None else None}
+
+
+_local = threading.local()
+
+def get_mailer() -> Mailer:
+    """This thread's Mailer, built from settings.EMAIL_POOL on first use."""
+    mailer = getattr(_local, "mailer", None)
+    if mailer is None:
+        mailer = _local.mailer = Mailer(getattr(settings, "EMAIL_POOL", {}))
+    return mailer
@@ -0,0 +1,56 @@
+"""
+Micro-benchmark for contact-form email rendering.
+
+Times one submission's worth of rendering (client auto-reply and team notification,
+html and txt each) two ways: four `render_to_string` calls, as contact_submit used to
+do, and the compiled pairs from myApp.emails. Prints the mean and p95 per submission.
+
+    python manage.py bench_email_render --iterations 2000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from myApp.emails import EmailTemplate
+
+SAMPLE = {
+    "full_name": "Ada O'Brien", "email": "ada@example.com", "company": "Candles & Co",
+    "website": "https://example.com", "budget": "$3k–$5k", "timeline": "1–2 months",
+    "services": ["Website", "Branding"], "message": "We need a shop <fast> & a new logo.\n" * 5,
+}
+NAMES = ("contact_email_client", "contact_email_team")
+
+
+def _render_to_string(ctx):
+    for name in NAMES:
+        render_to_string(f"emails/{name}.html", ctx)
+        render_to_string(f"emails/{name}.txt", ctx)
+
+
+class Command(BaseCommand):
+    help = "Time per-submission email rendering: render_to_string x4 vs compiled html/txt pairs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    def _time(self, fn, n):
+        fn()  # warm up (first load compiles)
+        samples = []
+        for _ in range(n):
+            t = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t)
+        samples.sort()
+        return sum(samples) / n * 1e6, samples[int(0.95 * (n - 1))] * 1e6
+
+    def handle(self, *args, **o):
+        n = o["iterations"]
+        ctx = {"d": SAMPLE}
+        pairs = [EmailTemplate(name) for name in NAMES]
+        rows = [("render_to_string x4", self._time(lambda: _render_to_string(ctx), n)),
+                ("compiled pairs", self._time(lambda: [p.render(ctx) for p in pairs], n))]
+        self.stdout.write(f"{'':<22}{'mean µs':>10}{'p95 µs':>10}   ({n} submissions)")
+        for label, (mean, p95) in rows:
+            self.stdout.write(f"{label:<22}{mean:>10.1f}{p95:>10.1f}")
+        self.stdout.write(f"speedup: {rows[0][1][0] / rows[1][1][0]:.2f}x")
@@ -0,0 +1,202 @@
+"""
+Build front-end assets into myApp/static, ready for collectstatic.
+
+Tailwind: compiles myApp/assets/tailwind.input.css with the Tailwind v3 CLI. The
+content globs in tailwind.config.js cover every template, so only classes the site
+actually uses are emitted, and the output is minified into css/tailwind.css.
+`{% tailwind_css %}` then links it under its hashed name instead of loading the
+in-browser JIT from cdn.tailwindcss.com.
+
+The CLI is, in order: --tailwind, settings.TAILWIND_CLI / $TAILWIND_CLI, `tailwindcss`
+on PATH, ./node_modules/.bin/tailwindcss, then the standalone binary pinned to
+TAILWIND_VERSION, which is downloaded once from GitHub into myApp/assets/vendor/ (no Node
+needed, which suits the deploy build; see nixpacks.toml).
+
+Chat: concatenates a pinned marked.min.js and js/chat/chat.js into a single minified
+js/chat.bundle.js, which base.html loads only when the chat is about to open. marked
+is fetched once from jsDelivr into myApp/assets/vendor/ and reused from there, so
+later builds work offline; --marked takes a local file instead. Minification uses
+rjsmin when it's installed, otherwise a conservative whitespace/comment strip.
+
+Critical CSS: renders home and about, takes the markup above each page's
+`<!-- below-the-fold -->` marker and keeps only the rules of its full CSS (Tailwind +
+site + page + chat) that can match it (myApp/critical.py). It writes
+css/critical/<page>.css to be inlined and css/page-<page>.css to load after first paint.
+It runs after the Tailwind step, because it needs the compiled CSS. The step fails if a
+page's inline CSS is over settings.CRITICAL_CSS["BUDGET"]; --check only measures the
+pages as they render now, which suits CI.
+
+    python manage.py build_assets && python manage.py collectstatic --noinput
+    python manage.py build_assets --only chat --marked ~/Downloads/marked.min.js
+    python manage.py build_assets --check
+"""
+import os, platform, re, shutil, subprocess, sys, time, urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from myApp import critical
+from myApp.content import HOME_CONTEXT
+from myApp.templatetags.assets import (
+    CHAT_BUNDLE, CHAT_SOURCE, MARKED_CDN, MARKED_VERSION, TAILWIND_CSS, bundle_name, critical_name, stylesheets,
+)
+
+try:
+    import rjsmin  # type: ignore
+except Exception:  # optional dependency
+    rjsmin = None  # type: ignore
+
+APP_DIR = Path(__file__).resolve().parents[2]
+ASSETS = APP_DIR / "assets"
+STATIC = APP_DIR / "static"
+VENDOR = ASSETS / "vendor"
+STEPS = ("tailwind", "chat", "critical")
+TAILWIND_VERSION = "3.4.17"
+TAILWIND_RELEASE = f"https://github.com/tailwindlabs/tailwindcss/releases/download/v{TAILWIND_VERSION}/"
+PAGES = {"home": ("home.html", HOME_CONTEXT), "about": ("about.html", {})}
+_STYLE = re.compile(r"<style(?:\s+media=[^>]*)?>(.*?)</style>", re.S)  # not page_styles' data-* ones
+
+
+def _tailwind_cli(explicit: str | None) -> list[str]:
+    for cand in (explicit, getattr(settings, "TAILWIND_CLI", None), os.getenv("TAILWIND_CLI")):
+        if cand:
+            return cand.split()
+    if shutil.which("tailwindcss"):
+        return ["tailwindcss"]
+    local = Path(settings.BASE_DIR) / "node_modules" / ".bin" / "tailwindcss"
+    if local.exists():
+        return [str(local)]
+    return [str(_standalone_cli())]
+
+
+def _standalone_cli() -> Path:
+    system = {"linux": "linux", "darwin": "macos", "win32": "windows"}.get(sys.platform)
+    arch = {"x86_64": "x64", "amd64": "x64", "aarch64": "arm64", "arm64": "arm64"}.get(platform.machine().lower())
+    if system is None or arch is None:
+        raise CommandError(f"No standalone Tailwind CLI for {sys.platform}/{platform.machine()}; set TAILWIND_CLI.")
+    name = f"tailwindcss-{system}-{arch}" + (".exe" if system == "windows" else "")
+    cached = VENDOR / name.replace("tailwindcss-", f"tailwindcss-{TAILWIND_VERSION}-", 1)
+    if not cached.exists():
+        try:
+            with urllib.request.urlopen(TAILWIND_RELEASE + name, timeout=60) as resp:
+                body = resp.read()
+        except OSError as e:
+            raise CommandError(f"Couldn't fetch the Tailwind CLI v{TAILWIND_VERSION} ({e}); "
+                               "install it and set TAILWIND_CLI.")
+        VENDOR.mkdir(parents=True, exist_ok=True)
+        cached.write_bytes(body)
+        cached.chmod(0o755)
+    return cached
+
+
+def minify_js(code: str) -> str:
+    if rjsmin is not None:
+        return rjsmin.jsmin(code)
+    # safe without a parser for our sources (no multi-line strings): indentation, blank and // lines
+    lines = (line.strip() for line in code.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+class Command(BaseCommand):
+    help = "Compile purged, minified Tailwind CSS (and other front-end assets) into myApp/static."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", action="append", choices=STEPS, help="build just this step (repeatable)")
+        parser.add_argument("--tailwind", help="Tailwind CLI command (default: auto-detect)")
+        parser.add_argument("--marked", help=f"local marked.min.js (v{MARKED_VERSION}) instead of the vendored copy")
+        parser.add_argument("--check", action="store_true", help="only check each page's inline CSS against the budget")
+
+    def _kb(self, path: Path) -> str:
+        return f"{path.stat().st_size / 1024:.1f} KB"
+
+    def build_tailwind(self, o) -> None:
+        out = STATIC / TAILWIND_CSS
+        out.parent.mkdir(parents=True, exist_ok=True)
+        cmd = _tailwind_cli(o["tailwind"]) + [
+            "-c", str(ASSETS / "tailwind.config.js"), "-i", str(ASSETS / "tailwind.input.css"),
+            "-o", str(out), "--minify",
+        ]
+        started = time.monotonic()
+        try:
+            subprocess.run(cmd, check=True, cwd=ASSETS, capture_output=True, text=True, timeout=300)
+        except FileNotFoundError as e:
+            raise CommandError(f"Tailwind CLI not runnable: {e}")
+        except subprocess.CalledProcessError as e:
+            raise CommandError(f"Tailwind build failed:\n{e.stderr or e.stdout}")
+        except subprocess.TimeoutExpired:
+            raise CommandError("Tailwind build timed out")
+        self.stdout.write(f"{TAILWIND_CSS}  {self._kb(out)}  ({time.monotonic() - started:.1f}s)")
+
+    def _marked(self, local: str | None) -> str:
+        if local:
+            return Path(local).expanduser().read_text(encoding="utf-8")
+        cached = VENDOR / f"marked-{MARKED_VERSION}.min.js"
+        if not cached.exists():
+            try:
+                with urllib.request.urlopen(MARKED_CDN, timeout=20) as resp:
+                    body = resp.read().decode("utf-8")
+            except OSError as e:
+                raise CommandError(f"Couldn't fetch {MARKED_CDN} ({e}); pass --marked /path/to/marked.min.js")
+            VENDOR.mkdir(parents=True, exist_ok=True)
+            cached.write_text(body, encoding="utf-8")
+        return cached.read_text(encoding="utf-8")
+
+    def build_chat(self, o) -> None:
+        marked = self._marked(o["marked"])
+        if not re.search(r"\bmarked\b", marked[:2000]):
+            raise CommandError("That doesn't look like marked.min.js")
+        out = STATIC / CHAT_BUNDLE
+        out.parent.mkdir(parents=True, exist_ok=True)
+        chat = minify_js((STATIC / CHAT_SOURCE).read_text(encoding="utf-8"))
+        out.write_text(marked.rstrip() + "\n;\n" + chat + "\n", encoding="utf-8")
+        self.stdout.write(f"{CHAT_BUNDLE}  {self._kb(out)}  (marked {MARKED_VERSION} + chat)")
+
+    def _render(self, page: str) -> str:
+        template, context = PAGES[page]
+        return render_to_string(template, dict(context), request=RequestFactory().get("/"))
+
+    def check_budget(self) -> None:
+        """Fail if any page inlines more CSS than the budget: its critical file, plus any
+        <style> written into the templates. Sheets that `{% page_styles %}` inlines before a
+        build don't count, so this measures what production serves (before collectstatic too)."""
+        budget, over = critical.conf()["BUDGET"], []
+        for page in PAGES:
+            html = self._render(page)
+            inline = sum(len(m.group(1).encode()) for m in _STYLE.finditer(html))
+            crit = STATIC / critical_name(page)
+            if crit.exists():
+                inline += crit.stat().st_size
+            self.stdout.write(f"{page}: {inline / 1024:.1f} KB inline CSS (budget {budget / 1024:.1f} KB)")
+            if inline > budget:
+                over.append(page)
+        if over:
+            raise CommandError(f"Inline CSS over budget on: {', '.join(over)}. Trim above-the-fold styles, "
+                               f"move the fold marker, or raise CRITICAL_CSS['BUDGET'] deliberately.")
+
+    def build_critical(self, o) -> None:
+        missing = [n for n in stylesheets() if not (STATIC / n).exists()]
+        if missing:
+            raise CommandError(f"Build these first: {', '.join(missing)} (critical CSS needs the compiled Tailwind)")
+        conf = critical.conf()
+        for page in PAGES:
+            full = "\n".join((STATIC / n).read_text(encoding="utf-8") for n in stylesheets(page))
+            try:
+                fold = critical.above_the_fold(self._render(page))
+            except ValueError as e:
+                raise CommandError(f"{PAGES[page][0]}: {e}")
+            crit, bundle = STATIC / critical_name(page), STATIC / bundle_name(page)
+            crit.parent.mkdir(parents=True, exist_ok=True)
+            crit.write_text(critical.extract(full, fold, conf["ALWAYS"]), encoding="utf-8")
+            bundle.write_text(critical.minify_css(full), encoding="utf-8")
+            self.stdout.write(f"{critical_name(page)}  {self._kb(crit)}  ({bundle_name(page)}  {self._kb(bundle)})")
+        self.check_budget()
+
+    def handle(self, *args, **o):
+        if o["check"]:
+            return self.check_budget()
+        for step in o["only"] or STEPS:
+            getattr(self, f"build_{step}")(o)
+        self.stdout.write(self.style.SUCCESS("Assets built; run collectstatic to hash and compress them."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myApp.images import MANIFEST, build
+
+
+class Command(BaseCommand):
+    help = "Write AVIF/WebP width variants of myApp/static images and their manifest (run before collectstatic)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="rebuild variants even if the source is unchanged")
+
+    def handle(self, *args, **o):
+        try:
+            manifest = build(force=o["force"], log=self.stdout.write)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"{len(manifest)} image(s) in {MANIFEST.name}."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from myApp.pagecache import get_page_cache
+
+
+class Command(BaseCommand):
+    help = "Invalidate every cached page (home, about) in all workers by bumping the content version."
+
+    def handle(self, *args, **o):
+        self.stdout.write(f"Page cache version is now {get_page_cache().bump_version()}.")
@@ -0,0 +1,175 @@
+"""
+Open-loop load test for /chatbot-response/.
+
+Requests go out on a fixed schedule (target RPS) whether or not earlier ones have
+returned, and latency is measured from each request's *scheduled* send time. A
+stalled server therefore shows up in the percentiles instead of quietly slowing
+the test down.
+
+By default this starts the OpenAI stub and, for each worker model, a server on
+--port (gunicorn sync, gunicorn gthread, uvicorn), runs the load, stops it, and
+prints one row per model. Pass --url to hit an already running server instead.
+
+    python manage.py chat_loadtest --rps 20 --duration 30 --models sync,gthread,uvicorn
+"""
+import importlib.util, itertools, os, subprocess, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myApp.openai_stub import StubConfig, start as start_stub
+
+TOPICS = ("a candle shop", "a dental clinic", "a coffee cart", "a yoga studio", "a bike repair shop",
+          "a wedding florist", "an indie game", "a law firm", "a bakery", "a skincare brand")
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100.0 * len(sorted_values)))]
+
+
+class Command(BaseCommand):
+    help = "Drive /chatbot-response/ at a target RPS and report latency percentiles per worker model."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="existing server base URL (skips starting servers)")
+        parser.add_argument("--models", default="sync,gthread,uvicorn")
+        parser.add_argument("--rps", type=float, default=10.0)
+        parser.add_argument("--duration", type=float, default=20.0, help="seconds of measured load")
+        parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured load first")
+        parser.add_argument("--workers", type=int, default=2, help="server processes")
+        parser.add_argument("--threads", type=int, default=8, help="threads per gthread worker")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--timeout", type=float, default=60.0, help="client timeout per request")
+        parser.add_argument("--max-outstanding", type=int, default=1000)
+        parser.add_argument("--rate-limit", action="store_true",
+                            help="keep per-visitor throttling on (all load comes from one IP)")
+        parser.add_argument("--stub-port", type=int, default=8766)
+        parser.add_argument("--stub-latency-ms", type=float, default=800.0)
+        parser.add_argument("--stub-tokens-per-sec", type=float, default=60.0)
+        parser.add_argument("--stub-error-rate", type=float, default=0.0)
+
+    # ---- servers ----------------------------------------------------------
+    def _server_cmd(self, model: str, o: dict) -> list[str] | None:
+        bind = f"127.0.0.1:{o['port']}"
+        if model in ("sync", "gthread"):
+            if importlib.util.find_spec("gunicorn") is None:
+                return None
+            cmd = [sys.executable, "-m", "gunicorn", "myproject.wsgi:application", "--bind", bind,
+                   "--workers", str(o["workers"]), "--worker-class", model, "--timeout", "120"]
+            return cmd + (["--threads", str(o["threads"])] if model == "gthread" else [])
+        if model == "uvicorn":
+            if importlib.util.find_spec("uvicorn") is None:
+                return None
+            return [sys.executable, "-m", "uvicorn", "myproject.asgi:application", "--host", "127.0.0.1",
+                    "--port", str(o["port"]), "--workers", str(o["workers"]), "--no-access-log"]
+        raise CommandError(f"unknown worker model {model!r} (sync, gthread, uvicorn)")
+
+    def _start_server(self, cmd: list[str], o: dict) -> subprocess.Popen:
+        env = {**os.environ,
+               "OPENAI_BASE_URL": f"http://127.0.0.1:{o['stub_port']}/v1",
+               "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-stub",
+               "CHAT_RATE_LIMIT": "1" if o["rate_limit"] else "0"}
+        proc = subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise CommandError(f"server exited early: {' '.join(cmd)}")
+            try:
+                requests.get(f"http://127.0.0.1:{o['port']}/", timeout=1)
+                return proc
+            except requests.RequestException:
+                time.sleep(0.25)
+        proc.terminate()
+        raise CommandError("server did not come up within 30 s")
+
+    # ---- load -------------------------------------------------------------
+    def _run_load(self, base_url: str, o: dict) -> dict:
+        url = base_url.rstrip("/") + "/chatbot-response/"
+        local = threading.local()
+        counter = itertools.count()
+        results: list[tuple[float, float, str]] = []  # (scheduled, latency, outcome)
+        lock = threading.Lock()
+
+        def fire(scheduled: float, measured: bool) -> None:
+            session = getattr(local, "session", None) or requests.Session()
+            local.session = session
+            n = next(counter)
+            # unique text: no reply-cache / single-flight / offline short-cuts
+            msg = f"Write two caption ideas for {TOPICS[n % len(TOPICS)]}, post #{n}."
+            try:
+                r = session.post(url, json={"message": msg}, timeout=o["timeout"])
+                outcome = str(r.status_code)
+            except requests.RequestException as e:
+                outcome = type(e).__name__
+            if measured:
+                with lock:
+                    results.append((scheduled, time.monotonic() - scheduled, outcome))
+
+        interval = 1.0 / o["rps"]
+        total = int((o["warmup"] + o["duration"]) * o["rps"])
+        warm = int(o["warmup"] * o["rps"])
+        with ThreadPoolExecutor(o["max_outstanding"], thread_name_prefix="load") as pool:
+            t0 = time.monotonic()
+            for i in range(total):
+                scheduled = t0 + i * interval
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(fire, scheduled, i >= warm)
+            measured_start = t0 + warm * interval
+        finished = time.monotonic()
+
+        ok = sorted(lat for _, lat, outcome in results if outcome == "200")
+        outcomes: dict[str, int] = {}
+        for _, _, outcome in results:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        return {
+            "sent": len(results), "ok": len(ok), "outcomes": outcomes,
+            "p50": _percentile(ok, 50), "p95": _percentile(ok, 95), "p99": _percentile(ok, 99),
+            "max": ok[-1] if ok else float("nan"),
+            "throughput": len(ok) / max(1e-9, finished - measured_start),
+        }
+
+    def _report(self, name: str, r: dict) -> None:
+        errors = ", ".join(f"{k}={v}" for k, v in sorted(r["outcomes"].items()) if k != "200") or "-"
+        self.stdout.write(f"{name:<10} {r['sent']:>6} {r['ok']:>6} {r['p50'] * 1000:>9.0f} {r['p95'] * 1000:>9.0f} "
+                          f"{r['p99'] * 1000:>9.0f} {r['max'] * 1000:>9.0f} {r['throughput']:>9.1f}  {errors}")
+
+    def handle(self, *args, **o):
+        header = (f"{'model':<10} {'sent':>6} {'ok':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                  f"{'max ms':>9} {'ok/s':>9}  errors")
+        self.stdout.write(f"target {o['rps']:.1f} rps for {o['duration']:.0f}s (+{o['warmup']:.0f}s warm-up)")
+
+        if o["url"]:
+            self.stdout.write(header)
+            self._report("(url)", self._run_load(o["url"], o))
+            return
+
+        stub = start_stub(StubConfig(latency_ms=o["stub_latency_ms"], tokens_per_sec=o["stub_tokens_per_sec"],
+                                     error_rate=o["stub_error_rate"]), port=o["stub_port"])
+        self.stdout.write(f"stub: {o['stub_latency_ms']:.0f} ms to first token, "
+                          f"{o['stub_tokens_per_sec']:.0f} tok/s, error rate {o['stub_error_rate']:.0%}; "
+                          f"{o['workers']} worker(s)")
+        self.stdout.write(header)
+        try:
+            for model in [m.strip() for m in o["models"].split(",") if m.strip()]:
+                cmd = self._server_cmd(model, o)
+                if cmd is None:
+                    self.stdout.write(f"{model:<10} skipped (server package not installed)")
+                    continue
+                proc = self._start_server(cmd, o)
+                try:
+                    self._report(model, self._run_load(f"http://127.0.0.1:{o['port']}", o))
+                finally:
+                    proc.terminate()
+                    try:
+                        proc.wait(10)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+        finally:
+            stub.shutdown()
@@ -0,0 +1,45 @@
+"""
+Self-host the stock images the site used to hotlink (content.REMOTE_IMAGES).
+
+Each original is downloaded once into the import cache (RESPONSIVE_IMAGES["IMPORT_CACHE"]),
+then resized, recompressed and written to myApp/static/img/stock/. After that, the
+AVIF/WebP variants are built as in `build_images`. Re-runs only touch missing files,
+and they work offline once the cache is filled. --source reads the originals from a local
+directory (matched by file name) instead.
+
+    python manage.py import_images && python manage.py collectstatic --noinput
+    python manage.py import_images --source ~/liorae-photos --force
+    python manage.py import_images --keep-going   # deploy: a flaky host doesn't fail the build
+"""
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myApp.content import REMOTE_IMAGES
+from myApp.images import Image, build, import_remote
+
+
+class Command(BaseCommand):
+    help = "Download, optimize and self-host the remote stock images, then build their variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", help="directory holding the originals (no network access)")
+        parser.add_argument("--force", action="store_true", help="re-import images that are already in static/")
+        parser.add_argument("--keep-going", action="store_true",
+                            help="skip images that can't be downloaded (they keep hotlinking) instead of failing")
+
+    def handle(self, *args, **o):
+        source = Path(o["source"]).expanduser() if o["source"] else None
+        if source is not None and not source.is_dir():
+            raise CommandError(f"{source} is not a directory")
+        try:
+            written = import_remote(REMOTE_IMAGES, source=source, force=o["force"], log=self.stdout.write,
+                                    keep_going=o["keep_going"])
+        except (OSError, ValueError) as e:  # network errors are OSErrors too
+            raise CommandError(f"Import failed: {e}. Fetch the originals elsewhere and pass --source DIR.")
+        self.stdout.write(f"{len(written)} of {len(REMOTE_IMAGES)} image(s) imported.")
+        if Image is None:
+            self.stdout.write(self.style.WARNING("Skipped AVIF/WebP variants: Pillow isn't installed."))
+            return
+        build(force=o["force"], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS("Stock images self-hosted; run collectstatic to hash them."))
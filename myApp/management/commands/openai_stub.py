@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from myApp.openai_stub import StubConfig, make_server
+
+
+class Command(BaseCommand):
+    help = "Serve a local OpenAI-compatible chat completions stub (latency, token rate, errors configurable)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8766)
+        parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+        parser.add_argument("--latency-ms", type=float, default=800.0, help="median time to first token")
+        parser.add_argument("--jitter", type=float, default=0.5, help="uniform: ±fraction; lognormal: sigma")
+        parser.add_argument("--tokens-per-sec", type=float, default=60.0, help="0 = whole reply at once")
+        parser.add_argument("--reply-tokens", type=int, default=80)
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument("--error-status", type=int, default=500)
+        parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that never answer")
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **o):
+        config = StubConfig(
+            latency=o["latency"], latency_ms=o["latency_ms"], jitter=o["jitter"],
+            tokens_per_sec=o["tokens_per_sec"], reply_tokens=o["reply_tokens"],
+            error_rate=o["error_rate"], error_status=o["error_status"],
+            hang_rate=o["hang_rate"], seed=o["seed"],
+        )
+        server = make_server(config, o["host"], o["port"])
+        self.stdout.write(f"OpenAI stub on http://{o['host']}:{o['port']}/v1 — "
+                          f"set OPENAI_BASE_URL to that (any OPENAI_API_KEY). Ctrl-C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
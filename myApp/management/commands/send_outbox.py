@@ -0,0 +1,49 @@
+import signal, time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from myApp.mailer import get_mailer
+from myApp.outbox import deliver_due, requeue_dead
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails (retries with backoff, dead-letters after too many failures)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="deliver what's due now, then exit")
+        parser.add_argument("--interval", type=float, default=2.0, help="seconds between polls when idle")
+        parser.add_argument("--batch", type=int, default=None, help="rows per batch (default EMAIL_OUTBOX['BATCH'])")
+        parser.add_argument("--requeue-dead", action="store_true", help="move dead-lettered emails back to pending")
+
+    def handle(self, *args, **o):
+        if o["requeue_dead"]:
+            self.stdout.write(f"Requeued {requeue_dead()} dead-lettered email(s).")
+            if o["once"]:
+                return
+
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        mailer = get_mailer()  # keeps its SMTP session open between polls
+        try:
+            while not stopping:
+                close_old_connections()  # long-running process: don't hold a stale DB connection
+                counts = deliver_due(o["batch"])
+                if any(counts.values()):
+                    s = mailer.stats()
+                    self.stdout.write(f"sent={counts['sent']} retry={counts['retry']} dead={counts['dead']} "
+                                      f"send_p50={s['send_p50_ms']}ms p95={s['send_p95_ms']}ms "
+                                      f"connects={s['connects']}")
+                if o["once"]:
+                    break
+                if not any(counts.values()):
+                    time.sleep(o["interval"])
+        finally:
+            mailer.close()
@@ -1,3 +1,33 @@
 from django.db import models
 
-# Create your models here.
+
+class OutboxEmail(models.Model):
+    """
+    One outbound email waiting for (or done with) delivery by `manage.py send_outbox`.
+    Bodies are rendered at enqueue time, so the worker only has to send.
+    """
+    PENDING, SENDING, SENT, DEAD = "pending", "sending", "sent", "dead"
+    STATUS_CHOICES = [(PENDING, "Pending"), (SENDING, "Sending"), (SENT, "Sent"), (DEAD, "Dead-lettered")]
+
+    kind = models.CharField(max_length=40, blank=True)  # e.g. "contact_client", "contact_team"
+    subject = models.CharField(max_length=255)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    locked_until = models.DateTimeField(null=True, blank=True)  # lease while a worker is sending
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.kind or 'email'} to {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,224 @@
+# myApp/offline.py
+"""
+Instant offline answers for the chat assistant.
+
+A tiny intent matcher over a precomputed n-gram index. Each intent has a handful of
+trigger phrases; at import time their unigrams/bigrams are indexed with IDF-style
+weights (features shared by many intents count less). A message is scored by how
+much of *its* weight an intent explains, so "how much is ignite" matches strongly
+while "write a caption for my bakery, also how much is ignite" does not — anything
+off-script should go to the LLM.
+
+Answers are built from the same tier/FAQ/process data (content.py) the homepage and the
+system prompt use, so they can't drift from either. A lookup costs on the order of 10 µs.
+"""
+from __future__ import annotations
+import math, re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from .content import FaqItem, ProcessStep, Tier
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOP = frozenset(
+    "a an the is are am be been do does did i you we me my your our us it its of to in on for "
+    "and or with at by can could would should will please hi hello hey so there that this "
+    "what which who how about any some just s t re ll ve d m".split()  # + contraction tails
+)
+# "how" / "what" / "which" are stop words for coverage, but a few question shapes matter
+_KEEP_PHRASES = ("how much", "how long", "how does", "who owns")
+
+
+def _stem(w: str) -> str:
+    if len(w) > 4 and w.endswith("ies"):
+        return w[:-3] + "y"
+    if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+        return w[:-1]
+    return w
+
+
+def features(text: str) -> list[str]:
+    """Unigrams + bigrams of stemmed, stop-word-free tokens (plus a few kept phrases)."""
+    low = (text or "").lower()
+    words = [_stem(w) for w in _WORD.findall(low) if w not in _STOP]
+    feats = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    feats += [p for p in _KEEP_PHRASES if p in low]
+    return feats
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    answer: str
+    phrases: tuple[str, ...]
+    # entity intents (one per tier) take over a "generic" topic intent when both match,
+    # so "how much does ascend cost" answers with ASCEND rather than the whole price list
+    entity: bool = False
+    generic: bool = False
+
+
+@dataclass(frozen=True)
+class Match:
+    intent: str
+    answer: str
+    confidence: float
+
+
+class OfflineEngine:
+    def __init__(self, intents: list[Intent], threshold: float = 0.6):
+        self.threshold = threshold
+        self.intents = {i.name: i for i in intents}
+        owners: dict[str, set[str]] = defaultdict(set)
+        for intent in intents:
+            for phrase in intent.phrases:
+                for f in features(phrase):
+                    owners[f].add(intent.name)
+        n = len(intents)
+        # feature -> weight (rarer across intents = more telling); bigrams count extra
+        self.weights = {
+            f: (1.0 + math.log(n / len(names))) * (1.5 if " " in f else 1.0)
+            for f, names in owners.items()
+        }
+        self.postings = {f: tuple(names) for f, names in owners.items()}
+        self.unknown_weight = 1.0 + math.log(n)  # an unseen word is as telling as the rarest known one
+
+    def match(self, text: str) -> Match | None:
+        feats = set(features(text))
+        if not feats:
+            return None
+        scores: dict[str, float] = defaultdict(float)
+        total = 0.0
+        for f in feats:
+            w = self.weights.get(f)
+            if w is None:
+                total += self.unknown_weight if " " not in f else 0.5  # unknown words dilute confidence
+                continue
+            total += w
+            for name in self.postings[f]:
+                scores[name] += w
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        best, score = ranked[0]
+        # entities named by a feature only they own (e.g. "ascend"), not by shared words like "include"
+        entities = {self.postings[f][0] for f in feats
+                    if len(self.postings.get(f, ())) == 1 and self.intents[self.postings[f][0]].entity}
+        topic = next((n for n, _ in ranked if self.intents[n].generic), None)
+        if len(entities) == 1 and topic:
+            # entity + topic explain the message together; score them as one intent
+            entity = entities.pop()
+            pair = {topic, entity}
+            score = sum(self.weights[f] for f in feats
+                        if f in self.weights and pair.intersection(self.postings[f]))
+            ranked = [(entity, score)] + [(n, v) for n, v in ranked if n not in pair]
+            best = entity
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        # coverage of the message, discounted when another intent is nearly as good
+        confidence = (score / total) * (1.0 - 0.5 * (runner_up / score))
+        return Match(best, self.intents[best].answer, round(confidence, 3))
+
+    def answer(self, text: str) -> str | None:
+        m = self.match(text)
+        return m.answer if m and m.confidence >= self.threshold else None
+
+
+# ------------------------------------------------------------
+# Intents built from site content
+# ------------------------------------------------------------
+CTA = ("\n\nWant me to map your goals to a tier? Book a 20-min discovery call or email "
+       "**hello@liorae.co** (we typically reply within ~24h).")
+
+
+def _tier_answer(t: Tier) -> str:
+    bullets = "\n".join(f"- {b}" for b in t.bullets)
+    return f"**{t.name}** — *{t.tag}* ({t.badge})\n\n**{t.price}**\n\n{bullets}{CTA}"
+
+
+def build_intents(tiers: tuple[Tier, ...], faq: tuple[FaqItem, ...], steps: tuple[str, ...],
+                  process: tuple[ProcessStep, ...]) -> list[Intent]:
+    tier_lines = "\n".join(f"- **{t.name}** — {t.tag}: {t.price}" for t in tiers)
+    intents = [
+        Intent(
+            "pricing",
+            "Our monthly retainers (scopes can be tailored):\n\n" + tier_lines + CTA,
+            # no bare "budget" / "per month" / "monthly": they also fit ad-spend questions ("how much should
+            # i spend on ads per month"), which belong with the model, so they only appear next to a price word
+            ("how much", "pricing", "price", "prices", "cost", "costs", "retainer", "retainers",
+             "rates", "monthly fee", "how much are your retainers", "price list",
+             "packages and pricing", "how much does it cost",
+             "monthly price", "monthly retainer", "retainer budget", "package budget",
+             "what are your prices", "what are the prices"),
+            generic=True,
+        ),
+        Intent(
+            "tiers",
+            "We offer five tiers, from social foundations to a full growth ecosystem:\n\n"
+            + tier_lines + "\n\nAsk me about any tier for the full list of inclusions." + CTA,
+            ("packages", "tiers", "plans", "what packages do you offer", "service tiers",
+             "compare packages", "which plans", "tell me about"),
+            generic=True,
+        ),
+        Intent(
+            "services",
+            "We do **strategy-first social media + content**, light **automation/CRM**, "
+            "**dashboards**, and **funnels/landing pages** — shipped weekly on monthly retainers.\n\n"
+            "Channels & tools: Instagram, TikTok, YouTube; Meta Ads, Google Ads; Figma/Notion; "
+            "Shopify/Stripe; HubSpot; Klaviyo.\n\nTiers:\n" + tier_lines + CTA,
+            ("what services do you offer", "services", "what do you do", "offer", "offerings",
+             "social media management", "content creation", "what you do",
+             "what tools do you use", "tools", "platforms", "channels"),
+        ),
+        Intent(
+            "startup",
+            "For most startups we recommend **IGNITE** — it covers the social foundations "
+            "(content calendar, AI-assisted captions, a basic landing page) and you can "
+            "upgrade to SYNC for funnels/CRM as you grow.\n\n" + _tier_answer(tiers[0]),
+            ("best package for a startup", "startup", "startups", "small business", "just starting",
+             "new business", "which package is best", "best package", "recommend package",
+             "which tier should i choose", "best tier"),
+        ),
+        Intent(
+            "process",
+            "How we work:\n\n" + "\n".join(f"{i}. **{s.name}** — {s.detail}" for i, s in enumerate(process, 1))
+            + "\n\nWe ship weekly and iterate; retainers are monthly and you can upgrade anytime." + CTA,
+            ("process", "how do you work", "how does it work", "onboarding", "steps", "workflow",
+             "what happens after i sign up", "getting started", "kickoff")
+            + tuple(s.lower() for s in steps),
+        ),
+        Intent(
+            "contact",
+            "You can reach us at **hello@liorae.co**, or use the **Contact** form on this page. "
+            "We suggest a 20-min discovery call for fit and a draft plan — we typically reply within ~24h.",
+            ("contact", "email", "email address", "reach you", "talk to someone", "book a call",
+             "discovery call", "phone", "get in touch", "schedule a call", "talk to a human"),
+        ),
+        Intent(
+            "min_term",
+            "Retainers are monthly and you can upgrade or customize anytime. "
+            "**VISION** has a minimum 3-month plan; the other tiers don't." + CTA,
+            ("contract", "minimum term", "lock in", "cancel", "commitment", "minimum commitment",
+             "how long is the contract"),
+        ),
+    ]
+    faq_phrases = {
+        "website": ("need a website", "do i need a website", "website required", "no website"),
+        "ai": ("how does ai help", "ai help", "use ai", "artificial intelligence", "ai tools"),
+        "results": ("how long before results", "results", "when will i see results", "how long", "roi",
+                    "timeline", "how soon"),
+        "social_only": ("social only", "only social media", "start with social", "just social media"),
+        "ownership": ("who owns", "ownership", "who owns the content", "own the assets", "own the website",
+                      "intellectual property", "do i own"),
+        "all_in_one": ("freelancers", "why not freelancers", "separate agencies", "why choose you",
+                       "what makes you different"),
+    }
+    for f in faq:
+        intents.append(Intent(f"faq:{f.key}", f.short, (f.question.lower(),) + faq_phrases.get(f.key, ())))
+    for t in tiers:
+        name = t.name.lower()
+        intents.append(Intent(
+            f"tier:{name}", _tier_answer(t),
+            (name, f"{name} package", f"{name} tier",
+             f"what is included in {name}", f"what does {name} include", t.tag.lower()),
+            entity=True,
+        ))
+    return intents
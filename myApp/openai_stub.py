@@ -0,0 +1,159 @@
+# myApp/openai_stub.py
+"""
+A local stand-in for the OpenAI chat completions API, for benchmarks and offline dev.
+
+Speaks enough of the wire format for the `openai` SDK: POST /v1/chat/completions
+(blocking JSON, or SSE with `stream: true`, including the usage chunk when
+`stream_options.include_usage` is set) and GET /v1/models.
+
+Shape of a response:
+    time to first token   drawn from LATENCY ("fixed" | "uniform" | "lognormal") around
+                          LATENCY_MS, spread by JITTER (uniform: ±fraction; lognormal: sigma)
+    generation            REPLY_TOKENS words paced at TOKENS_PER_SEC (0 = instant)
+    errors                ERROR_RATE of requests get ERROR_STATUS; HANG_RATE never answer
+                          (until HANG_S), to exercise client timeouts and the breaker
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8766/v1 (any OPENAI_API_KEY).
+Run it with `python manage.py openai_stub`, or in-process with `start()`.
+"""
+from __future__ import annotations
+import json, random, threading, time, uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = ("Here's a quick plan: lead with one clear hook, show the product in use, "
+          "keep captions short, post at your audience's best time, and end with a single "
+          "call to action. Test two variants for a week and keep the winner.").split()
+
+
+@dataclass
+class StubConfig:
+    latency: str = "lognormal"
+    latency_ms: float = 800.0
+    jitter: float = 0.5
+    tokens_per_sec: float = 60.0
+    reply_tokens: int = 80
+    error_rate: float = 0.0
+    error_status: int = 500
+    hang_rate: float = 0.0
+    hang_s: float = 120.0
+    seed: int | None = None
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def first_token_delay(self) -> float:
+        base = self.latency_ms / 1000.0
+        with self._lock:
+            if self.latency == "fixed":
+                return base
+            if self.latency == "uniform":
+                return max(0.0, self._rng.uniform(base * (1 - self.jitter), base * (1 + self.jitter)))
+            return self._rng.lognormvariate(0.0, self.jitter) * base  # median = base, long right tail
+
+    def roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._rng.random() < rate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "openai-stub/1"
+    protocol_version = "HTTP/1.1"
+    config: StubConfig  # set on the subclass built by make_server()
+
+    def log_message(self, fmt, *args):  # quiet; the load test reports what matters
+        pass
+
+    def _json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            return self._json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        self._json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._json(400, {"error": {"message": "invalid JSON", "type": "invalid_request_error"}})
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+        conf = self.config
+        if conf.roll(conf.hang_rate):
+            time.sleep(conf.hang_s)
+            return
+        time.sleep(conf.first_token_delay())
+        if conf.roll(conf.error_rate):
+            return self._json(conf.error_status, {"error": {"message": "injected failure",
+                                                            "type": "server_error", "code": conf.error_status}})
+
+        model = req.get("model", "stub")
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in req.get("messages", [])) // 4
+        words = [(_WORDS[i % len(_WORDS)] if i == 0 else " " + _WORDS[i % len(_WORDS)])
+                 for i in range(max(1, conf.reply_tokens))]
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words), "prompt_tokens_details": {"cached_tokens": 0}}
+        cid, created = f"chatcmpl-{uuid.uuid4().hex[:24]}", int(time.time())
+        pace = 1.0 / conf.tokens_per_sec if conf.tokens_per_sec > 0 else 0.0
+
+        if not req.get("stream"):
+            time.sleep(pace * len(words))
+            return self._json(200, {
+                "id": cid, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(words)}}],
+                "usage": usage,
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(payload) -> None:
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            self.wfile.write(f"data: {data}\n\n".encode())
+            self.wfile.flush()
+
+        def chunk(delta: dict, finish: str | None = None) -> dict:
+            return {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+        try:
+            send(chunk({"role": "assistant", "content": ""}))
+            for w in words:
+                send(chunk({"content": w}))
+                if pace:
+                    time.sleep(pace)
+            send(chunk({}, "stop"))
+            if (req.get("stream_options") or {}).get("include_usage"):
+                send({"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                      "choices": [], "usage": usage})
+            send("[DONE]")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away mid-stream
+
+
+def make_server(config: StubConfig, host: str = "127.0.0.1", port: int = 8766) -> ThreadingHTTPServer:
+    handler = type("StubHandler", (_Handler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start(config: StubConfig, host: str = "127.0.0.1", port: int = 8766) -> ThreadingHTTPServer:
+    """Serve on a background thread; call `.shutdown()` on the result to stop."""
+    server = make_server(config, host, port)
+    threading.Thread(target=server.serve_forever, name="openai-stub", daemon=True).start()
+    return server
@@ -0,0 +1,123 @@
+# myApp/outbox.py
+"""
+DB-backed outbox for transactional email.
+
+Views call `enqueue()` and return right away. `manage.py send_outbox` delivers due
+rows. A failed send is retried with exponential backoff (BACKOFF · 2^(attempts-1)
+seconds, ±20% jitter, capped at MAX_BACKOFF). After MAX_ATTEMPTS it is dead-lettered
+(status "dead", with the last error kept) for a human to look at in the admin or
+requeue with `send_outbox --requeue-dead`.
+
+Workers claim rows with a conditional UPDATE and a LEASE, so several workers can
+share the table on SQLite or Postgres. A row whose worker died mid-send becomes due
+again once its lease expires. Delivery is therefore at-least-once.
+
+Sending goes through `mailer.get_mailer()`, whose SMTP session stays open across
+batches, so a due client auto-reply and team notification share one login.
+
+Configure with settings.EMAIL_OUTBOX (see DEFAULTS).
+"""
+from __future__ import annotations
+import logging, random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db.models import Q
+from django.utils import timezone
+
+from .mailer import get_mailer
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {"MAX_ATTEMPTS": 6, "BACKOFF": 30, "MAX_BACKOFF": 60 * 60, "LEASE": 5 * 60, "BATCH": 20}
+
+
+def _conf() -> dict:
+    return {**DEFAULTS, **getattr(settings, "EMAIL_OUTBOX", {})}
+
+
+def enqueue(msg: EmailMultiAlternatives, kind: str = "") -> OutboxEmail:
+    """Store `msg` for the worker (text body plus an optional text/html alternative)."""
+    html = next((content for content, mimetype in getattr(msg, "alternatives", [])
+                 if mimetype == "text/html"), "")
+    return OutboxEmail.objects.create(
+        kind=kind, subject=msg.subject, body_text=msg.body, body_html=html,
+        from_email=msg.from_email, to=list(msg.to), reply_to=list(msg.reply_to),
+        next_attempt_at=timezone.now(),
+    )
+
+
+def to_message(row: OutboxEmail, connection=None) -> EmailMultiAlternatives:
+    msg = EmailMultiAlternatives(row.subject, row.body_text, row.from_email, row.to,
+                                 reply_to=row.reply_to or None, connection=connection)
+    if row.body_html:
+        msg.attach_alternative(row.body_html, "text/html")
+    return msg
+
+
+def backoff(attempts: int, conf: dict | None = None) -> float:
+    c = conf or _conf()
+    delay = min(float(c["MAX_BACKOFF"]), float(c["BACKOFF"]) * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_due(limit: int, conf: dict | None = None) -> list[OutboxEmail]:
+    """Lease up to `limit` due rows to this worker."""
+    c = conf or _conf()
+    now = timezone.now()
+    due = (Q(status=OutboxEmail.PENDING, next_attempt_at__lte=now)
+           | Q(status=OutboxEmail.SENDING, locked_until__lt=now))  # lease expired: worker died
+    claimed = []
+    for row in OutboxEmail.objects.filter(due).order_by("next_attempt_at", "id")[:limit]:
+        lease = now + timedelta(seconds=c["LEASE"])
+        won = OutboxEmail.objects.filter(pk=row.pk, status=row.status, attempts=row.attempts).update(
+            status=OutboxEmail.SENDING, locked_until=lease, attempts=row.attempts + 1)
+        if won:
+            row.status, row.locked_until, row.attempts = OutboxEmail.SENDING, lease, row.attempts + 1
+            claimed.append(row)
+    return claimed
+
+
+def mark_sent(row: OutboxEmail) -> None:
+    OutboxEmail.objects.filter(pk=row.pk).update(
+        status=OutboxEmail.SENT, sent_at=timezone.now(), locked_until=None, last_error="")
+
+
+def mark_failed(row: OutboxEmail, error: BaseException, conf: dict | None = None) -> str:
+    """Schedule a retry, or dead-letter after MAX_ATTEMPTS; returns the new status."""
+    c = conf or _conf()
+    text = f"{type(error).__name__}: {error}"[:2000]
+    if row.attempts >= c["MAX_ATTEMPTS"]:
+        OutboxEmail.objects.filter(pk=row.pk).update(status=OutboxEmail.DEAD, locked_until=None, last_error=text)
+        logger.error("Outbox email %s dead-lettered after %d attempts: %s", row.pk, row.attempts, text)
+        return OutboxEmail.DEAD
+    retry_at = timezone.now() + timedelta(seconds=backoff(row.attempts, c))
+    OutboxEmail.objects.filter(pk=row.pk).update(
+        status=OutboxEmail.PENDING, next_attempt_at=retry_at, locked_until=None, last_error=text)
+    logger.warning("Outbox email %s failed (attempt %d), retrying at %s: %s",
+                   row.pk, row.attempts, retry_at.isoformat(timespec="seconds"), text)
+    return OutboxEmail.PENDING
+
+
+def deliver_due(limit: int | None = None) -> dict:
+    """Send one batch of due rows over this thread's warm SMTP session; returns counts by outcome."""
+    c = _conf()
+    rows = claim_due(limit or c["BATCH"], c)
+    counts = {"sent": 0, "retry": 0, "dead": 0}
+    if not rows:
+        return counts
+    outcomes = get_mailer().send_messages(to_message(row) for row in rows)
+    for row, error in zip(rows, outcomes):
+        if error is None:
+            mark_sent(row)
+            counts["sent"] += 1
+        else:
+            counts["dead" if mark_failed(row, error, c) == OutboxEmail.DEAD else "retry"] += 1
+    return counts
+
+
+def requeue_dead() -> int:
+    return OutboxEmail.objects.filter(status=OutboxEmail.DEAD).update(
+        status=OutboxEmail.PENDING, attempts=0, next_attempt_at=timezone.now(), last_error="")
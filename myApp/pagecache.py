@@ -0,0 +1,115 @@
+# myApp/pagecache.py
+"""
+Rendered-page cache for the public pages.
+
+The home and about pages only vary per visitor by the CSRF token in the contact form.
+`render_cached()` renders the page once with a placeholder where the token goes and
+stores the output as bytes, split at the placeholder. Later hits join the pieces
+around this visitor's token (`get_token`, which also sets the cookie). A hit costs one
+lookup and a join instead of a template render, and the context builder is not called.
+
+Entries are keyed by a content version, "<VERSION>.<content>.<generation>":
+    - VERSION comes from settings (the deploy's commit SHA on Railway), so every deploy
+      starts from fresh pages;
+    - content is `content.VERSION`, a fingerprint of the site copy;
+    - generation is a counter in CACHES[ALIAS], which `bump_version()`
+      (`manage.py bump_page_version`) increments to drop every page in all workers
+      without a restart.
+
+BACKEND "local" keeps pages in this process (fastest; the generation is still shared).
+"django" keeps them in CACHES[ALIAS]. It is on whatever DEBUG says (this site runs with
+DEBUG on in production); set PAGE_CACHE=0 while editing templates so edits show up.
+
+Configure with settings.PAGE_CACHE (see DEFAULTS).
+"""
+from __future__ import annotations
+import secrets, threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+
+from .content import VERSION as CONTENT_VERSION
+
+DEFAULTS = {"ENABLED": True, "BACKEND": "local", "ALIAS": "default", "VERSION": "1", "TTL": 24 * 60 * 60}
+
+_GENERATION_KEY = "pagecache:generation"
+# letters only: survives autoescaping and attribute quoting untouched
+_PLACEHOLDER = "csrfplaceholder" + "".join(secrets.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(24))
+
+
+class PageCache:
+    def __init__(self, conf: dict | None = None):
+        self.conf = {**DEFAULTS, **(conf or {})}
+        self.enabled = bool(self.conf["ENABLED"])
+        self._local: dict[str, list[bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        from django.core.cache import caches
+        self._cache = caches[self.conf["ALIAS"]]
+
+    def version(self) -> str:
+        return f"{self.conf['VERSION']}.{CONTENT_VERSION}.{self._cache.get(_GENERATION_KEY, 0)}"
+
+    def bump_version(self) -> str:
+        self._cache.add(_GENERATION_KEY, 0, None)
+        try:
+            self._cache.incr(_GENERATION_KEY)
+        except ValueError:
+            self._cache.set(_GENERATION_KEY, 1, None)
+        with self._lock:
+            self._local.clear()
+        return self.version()
+
+    def _get(self, key: str) -> list[bytes] | None:
+        if self.conf["BACKEND"] == "django":
+            return self._cache.get(key)
+        return self._local.get(key)
+
+    def _set(self, key: str, parts: list[bytes]) -> None:
+        if self.conf["BACKEND"] == "django":
+            self._cache.set(key, parts, self.conf["TTL"])
+            return
+        with self._lock:
+            # drop pages of older versions of the same template
+            prefix = key.rsplit(":", 1)[0] + ":"
+            for k in [k for k in self._local if k.startswith(prefix)]:
+                del self._local[k]
+            self._local[key] = parts
+
+    def render(self, request, template: str, build_context) -> HttpResponse:
+        if not self.enabled:
+            return render(request, template, build_context())
+        key = f"page:{template}:{self.version()}"
+        parts = self._get(key)
+        if parts is None:
+            self.misses += 1
+            ctx = {**build_context(), "csrf_token": _PLACEHOLDER}  # the view's context outranks the csrf processor
+            parts = render(request, template, ctx).content.split(_PLACEHOLDER.encode())
+            self._set(key, parts)
+        else:
+            self.hits += 1
+        token = get_token(request).encode() if len(parts) > 1 else b""
+        return HttpResponse(token.join(parts))
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "backend": self.conf["BACKEND"], "version": self.version(),
+                "hits": self.hits, "misses": self.misses, "local_pages": len(self._local)}
+
+
+_instance: PageCache | None = None
+_instance_lock = threading.Lock()
+
+def get_page_cache() -> PageCache:
+    """Process-wide page cache, built from settings.PAGE_CACHE on first use."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = PageCache(getattr(settings, "PAGE_CACHE", {}))
+    return _instance
+
+def render_cached(request, template: str, build_context=dict) -> HttpResponse:
+    """`render(request, template, build_context())`, served from the page cache when possible."""
+    return get_page_cache().render(request, template, build_context)
@@ -0,0 +1,229 @@
+# myApp/prompts.py
+"""
+Token-budget aware assembly of the chat system prompt.
+
+SYSTEM_PROMPT is split into its titled sections once, at startup, and each section is
+tokenized then. The always-on sections are joined once into `PromptBuilder.prefix`,
+which is byte-identical on every call and goes first, for provider-side prompt caching.
+Providers only cache prefixes past a minimum length (CACHE_MIN_TOKENS, 1024 for OpenAI).
+
+Mode "all" (the default) freezes the whole SYSTEM_PROMPT into the prefix. At ~1.3k tokens it
+clears that minimum, so after the first call the prompt is billed and served from cache.
+
+Mode "select" keeps only persona, behavior, style, formatting and safety in the prefix. A
+cheap keyword classifier adds brand facts, tiers, process, FAQs and the sales hand-off
+when a message is about Lioraè, in a separate system message after the conversation
+history. General "help me write a hook" traffic then ships well under half the prompt,
+but the prefix is too short to be cached; a warning is logged at startup.
+
+Token counts use tiktoken's encoding for the model (pinned in requirements.txt; the
+encoding file is downloaded on first use). Without it they fall back to ~4 characters
+per token, and the logs and chat_health label them "estimate".
+"""
+from __future__ import annotations
+import hashlib, logging, re, threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_MIN_TOKENS = 1024  # shortest prompt prefix OpenAI caches
+
+try:
+    import tiktoken  # type: ignore
+except Exception:  # optional dependency
+    tiktoken = None  # type: ignore
+
+
+def _load_encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:  # unknown model, or the BPE file can't be downloaded
+        logger.info("tiktoken unavailable for %s (%s); using length estimate.", model, e)
+        return None
+
+_encoding = None
+_encoding_model: str | None = None
+
+def use_model(model: str) -> None:
+    """Pick the tokenizer used by `count_tokens` (call once at startup)."""
+    global _encoding, _encoding_model
+    if model != _encoding_model:
+        _encoding, _encoding_model = _load_encoding(model), model
+
+def tokenizer() -> str:
+    """How `count_tokens` counts: "tiktoken", or "estimate" for the length fallback."""
+    return "tiktoken" if _encoding is not None else "estimate"
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+# ------------------------------------------------------------
+# Sections
+# ------------------------------------------------------------
+# heading prefix -> section key; sections not listed here are always included
+SECTION_KEYS = (
+    ("Core behavior", "core"),
+    ("About Lioraè", "about"),
+    ("Service tiers", "tiers"),
+    ("Process", "process"),
+    ("FAQs", "faq"),
+    ("Working style", "style"),
+    ("If the user asks about Lioraè services", "cta"),
+    ("Formatting", "format"),
+    ("Refusals", "safety"),
+    ("Short self-description", "self"),
+)
+ALWAYS = frozenset({"persona", "core", "style", "format", "safety"})
+
+# cheap intent signals -> sections they pull in
+TOPICS = (
+    ("tiers", re.compile(r"\b(pric\w*|costs?|budget|tiers?|packages?|plans?|retainers?|php|how much|monthly|"
+                         r"ignite|sync|vision|authority|ascend|cheapest|upgrade)\b", re.I)),
+    ("process", re.compile(r"\b(process|onboard\w*|kick-?off|workflow|steps?|how (do|does) (you|it) work|"
+                           r"get(ting)? started|sign up|timeline)\b", re.I)),
+    ("faq", re.compile(r"\b(websites?|results?|roi|own(s|ership)?|social[- ]only|how long|how soon|"
+                       r"ai help|how does ai)\b", re.I)),
+    ("about", re.compile(r"\b(liora[eè]?|lioraè|agency|your (company|team|services|work)|services|offer\w*|"
+                         r"what do you do|hire|work with you|contact|call|email|tools do you)\b", re.I)),
+    ("self", re.compile(r"\b(who are you|what are you|your name|introduce yourself|are you (a )?(bot|ai|human))\b", re.I)),
+)
+BUSINESS = frozenset({"tiers", "process", "faq", "about"})
+
+
+def split_sections(prompt: str) -> list[tuple[str, str]]:
+    """[(key, text)] in prompt order. A heading is an unindented, non-list line after a blank line."""
+    sections: list[tuple[str, list[str]]] = [("persona", [])]
+    prev_blank = True
+    for line in prompt.strip("\n").splitlines():
+        is_heading = (prev_blank and line and not line[0].isspace()
+                      and not line.startswith("-") and not line[0].isdigit() and sections[-1][1])
+        if is_heading:
+            key = next((k for prefix, k in SECTION_KEYS if line.startswith(prefix)),
+                       re.sub(r"\W+", "_", line.lower()).strip("_")[:24])
+            sections.append((key, [line]))
+        else:
+            sections[-1][1].append(line)
+        prev_blank = not line.strip()
+    return [(k, "\n".join(lines).strip()) for k, lines in sections]
+
+
+def classify(text: str) -> frozenset[str]:
+    """Section keys a message needs beyond ALWAYS."""
+    hits = {key for key, rx in TOPICS if rx.search(text or "")}
+    if hits & BUSINESS:
+        hits |= {"about", "cta"}
+    return frozenset(hits)
+
+
+@dataclass(frozen=True)
+class Prompt:
+    prefix: str   # frozen at startup, identical for every request
+    extra: str    # per-request sections ("" if none)
+    sections: tuple[str, ...]
+    tokens: int
+
+    def head(self) -> list[dict]:
+        """Messages that open the request (the cacheable prefix)."""
+        return [{"role": "system", "content": self.prefix}]
+
+    def tail(self) -> list[dict]:
+        """Per-request system material; goes after history, before the user message."""
+        return [{"role": "system", "content": self.extra}] if self.extra else []
+
+
+class PromptBuilder:
+    def __init__(self, system_prompt: str, model: str, mode: str = "all"):
+        use_model(model)
+        self.mode = mode
+        self.sections = split_sections(system_prompt)
+        self.section_tokens = {k: count_tokens(t) for k, t in self.sections}
+        known = {k for _, k in SECTION_KEYS} | {"persona"}
+        if mode == "all":
+            self.always = frozenset(k for k, _ in self.sections)
+        else:
+            self.always = frozenset(k for k, _ in self.sections if k in ALWAYS or k not in known)
+        self.optional = frozenset(k for k, _ in self.sections) - self.always
+        self.prefix = "\n\n".join(t for k, t in self.sections if k in self.always)
+        self.prefix_tokens = count_tokens(self.prefix)
+        self.prefix_hash = hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()[:12]
+        logger.info("System prompt sections (%s tokens): %s; full=%d; frozen prefix=%d tokens (%s)",
+                    tokenizer(), ", ".join(f"{k}={n}" for k, n in self.section_tokens.items()),
+                    self.full_tokens, self.prefix_tokens, self.prefix_hash)
+        if self.prefix_tokens < CACHE_MIN_TOKENS:
+            logger.warning("Frozen prompt prefix is %d tokens (mode %r), under the %d-token minimum for provider caching; "
+                           "cached_tokens will stay 0.", self.prefix_tokens, mode, CACHE_MIN_TOKENS)
+
+    @property
+    def full_tokens(self) -> int:
+        return sum(self.section_tokens.values())
+
+    def build(self, user_msg: str, context: str = "") -> Prompt:
+        """`context` (e.g. the previous user turn) is classified along with the message."""
+        wanted = classify(f"{context}\n{user_msg}") & self.optional
+        return self._assemble(wanted)
+
+    @lru_cache(maxsize=64)
+    def _assemble(self, extra_keys: frozenset[str]) -> Prompt:
+        # prompt order, so equal section sets always produce equal bytes
+        extra = [(k, t) for k, t in self.sections if k in extra_keys]
+        return Prompt(
+            prefix=self.prefix,
+            extra="\n\n".join(t for _, t in extra),
+            sections=tuple(k for k, _ in self.sections if k in self.always or k in extra_keys),
+            tokens=self.prefix_tokens + sum(self.section_tokens[k] for k, _ in extra),
+        )
+
+    def report(self) -> dict:
+        return {"tokenizer": tokenizer(), "mode": self.mode,
+                "full_tokens": self.full_tokens, "prefix_tokens": self.prefix_tokens,
+                "prefix_hash": self.prefix_hash, "sections": dict(self.section_tokens),
+                "usage": usage.stats()}
+
+
+# ------------------------------------------------------------
+# Provider usage (prompt-cache hit rate)
+# ------------------------------------------------------------
+class UsageStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, u) -> None:
+        """Logs and accumulates an SDK `usage` object (None-safe)."""
+        if u is None:
+            return
+        prompt = getattr(u, "prompt_tokens", 0) or 0
+        details = getattr(u, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        completion = getattr(u, "completion_tokens", 0) or 0
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt
+            self.cached_tokens += cached
+            self.completion_tokens += completion
+        logger.info("Chat usage: prompt=%d cached=%d (%.0f%%) completion=%d",
+                    prompt, cached, 100.0 * cached / prompt if prompt else 0.0, completion)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cached_ratio": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+            }
+
+
+usage = UsageStats()
@@ -0,0 +1,335 @@
+# myApp/ratelimit.py
+"""
+Per-visitor throttling for the chat endpoints.
+
+Two checks run before a chat view does any work:
+
+token bucket   each visitor refills RATE tokens/s up to BURST; a request costs one.
+               Buckets exist per session and per client IP; the IP bucket is
+               IP_MULTIPLIER× larger, since offices and phones share addresses. A
+               scraper that drops or rotates cookies still runs out of tokens.
+in-flight cap  at most PER_VISITOR_INFLIGHT chat turns per visitor, and GLOBAL_INFLIGHT
+               across the site, may be running at once. A streaming turn holds its
+               slot until the stream ends.
+
+A refused request gets 429 with Retry-After (see `throttle`).
+
+Backends, as elsewhere in the chat stack:
+    "local"   in-process, exact, per worker;
+    "django"  a Django cache alias, so every worker sees the same counts. In-flight
+              counters use add/incr/decr, which are atomic on Redis/Memcached. Bucket
+              refills are read-modify-write, so racing requests can overdraw a bucket
+              by a token or two. Counters expire after INFLIGHT_TTL in case a worker
+              dies holding a slot.
+
+The client IP is REMOTE_ADDR, or, behind PROXIES trusted reverse proxies, the address
+those proxies appended to X-Forwarded-For (never the client-supplied left end).
+
+Configure with settings.CHAT_RATE_LIMIT (see DEFAULTS).
+"""
+from __future__ import annotations
+import math, threading, time
+from collections import OrderedDict
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+
+DEFAULTS = {
+    "ENABLED": True, "BACKEND": "local", "ALIAS": "default",
+    "RATE": 0.2, "BURST": 8, "IP_MULTIPLIER": 4,
+    "PER_VISITOR_INFLIGHT": 2, "GLOBAL_INFLIGHT": 64, "INFLIGHT_TTL": 120,
+    "PROXIES": 0, "MAX_KEYS": 10000,
+}
+
+LIMITED_REPLY = "Whoa, that’s a lot of messages at once — give me a few seconds and try again."
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float, reason: str):
+        super().__init__(f"{reason}; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def _refill(state: tuple[float, float] | None, rate: float, burst: float, now: float) -> tuple[float, float]:
+    """Spend one token from (tokens, stamp); returns the new state, or raises the wait if empty."""
+    tokens, stamp = state if state else (burst, now)
+    tokens = min(burst, tokens + max(0.0, now - stamp) * rate)
+    if tokens < 1.0:
+        raise RateLimited((1.0 - tokens) / rate, "rate")
+    return tokens - 1.0, now
+
+
+# ------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------
+class LocalBackend:
+    def __init__(self, max_keys: int):
+        self.max_keys = max(1, int(max_keys))
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._inflight: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float) -> None:
+        with self._lock:
+            self._buckets[key] = _refill(self._buckets.get(key), rate, burst, time.monotonic())
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)  # oldest is full again by now, or close to it
+
+    def acquire(self, key: str, limit: int, ttl: int) -> bool:
+        with self._lock:
+            n = self._inflight.get(key, 0)
+            if n >= limit:
+                return False
+            self._inflight[key] = n + 1
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            n = self._inflight.get(key, 0) - 1
+            if n > 0:
+                self._inflight[key] = n
+            else:
+                self._inflight.pop(key, None)
+
+    def inflight(self, key: str) -> int:
+        return self._inflight.get(key, 0)
+
+
+class DjangoCacheBackend:
+    def __init__(self, alias: str):
+        from django.core.cache import caches
+        self._cache = caches[alias]
+
+    def take(self, key: str, rate: float, burst: float) -> None:
+        k = f"chatrl:b:{key}"
+        state = _refill(self._cache.get(k), rate, burst, time.time())
+        self._cache.set(k, state, int(burst / rate) + 60)  # past this it would be full anyway
+
+    def acquire(self, key: str, limit: int, ttl: int) -> bool:
+        k = f"chatrl:f:{key}"
+        self._cache.add(k, 0, ttl)
+        try:
+            n = self._cache.incr(k)
+        except ValueError:  # expired between add and incr
+            self._cache.add(k, 1, ttl)
+            n = 1
+        if n > limit:
+            self.release(key)
+            return False
+        return True
+
+    def release(self, key: str) -> None:
+        try:
+            self._cache.decr(f"chatrl:f:{key}")
+        except ValueError:
+            pass  # expired; nothing to give back
+
+    def inflight(self, key: str) -> int:
+        return int(self._cache.get(f"chatrl:f:{key}") or 0)
+
+
+# ------------------------------------------------------------
+# Front
+# ------------------------------------------------------------
+class Ticket:
+    """In-flight slots held by one admitted request; `release()` is idempotent."""
+
+    def __init__(self, limiter: "RateLimiter", keys: list[str]):
+        self._limiter, self._keys = limiter, keys
+
+    def release(self) -> None:
+        keys, self._keys = self._keys, []
+        for k in keys:
+            self._limiter.backend.release(k)
+
+    async def arelease(self) -> None:
+        if isinstance(self._limiter.backend, LocalBackend):
+            return self.release()
+        await sync_to_async(self.release)()
+
+
+class RateLimiter:
+    def __init__(self, backend, conf: dict):
+        self.backend = backend
+        self.conf = conf
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.limited: dict[str, int] = {}
+
+    def client_ip(self, request) -> str:
+        proxies = int(self.conf["PROXIES"])
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if proxies and forwarded:
+            hops = [h.strip() for h in forwarded.split(",") if h.strip()]
+            if hops:
+                return hops[-min(proxies, len(hops))]
+        return request.META.get("REMOTE_ADDR", "") or "unknown"
+
+    def _count(self, reason: str | None) -> None:
+        with self._lock:
+            if reason is None:
+                self.admitted += 1
+            else:
+                self.limited[reason] = self.limited.get(reason, 0) + 1
+
+    def admit(self, ip: str, session_key: str | None, inflight: bool = True) -> Ticket:
+        """Spend a token and (optionally) take in-flight slots, or raise RateLimited."""
+        c = self.conf
+        rate, burst = float(c["RATE"]), float(c["BURST"])
+        m = float(c["IP_MULTIPLIER"])
+        try:
+            self.backend.take(f"ip:{ip}", rate * m, burst * m)
+            if session_key:
+                self.backend.take(f"s:{session_key}", rate, burst)
+            ticket = Ticket(self, [])
+            if inflight:
+                visitor = f"v:{session_key or ip}"
+                if not self.backend.acquire(visitor, int(c["PER_VISITOR_INFLIGHT"]), int(c["INFLIGHT_TTL"])):
+                    raise RateLimited(1.0, "visitor_inflight")
+                ticket._keys.append(visitor)
+                if not self.backend.acquire("global", int(c["GLOBAL_INFLIGHT"]), int(c["INFLIGHT_TTL"])):
+                    ticket.release()
+                    raise RateLimited(2.0, "global_inflight")
+                ticket._keys.append("global")
+        except RateLimited as e:
+            self._count(e.reason)
+            raise
+        self._count(None)
+        return ticket
+
+    async def aadmit(self, ip: str, session_key: str | None, inflight: bool = True) -> Ticket:
+        if isinstance(self.backend, LocalBackend):
+            return self.admit(ip, session_key, inflight)
+        return await sync_to_async(self.admit)(ip, session_key, inflight)
+
+    def stats(self) -> dict:
+        try:
+            global_inflight = self.backend.inflight("global")
+        except Exception:
+            global_inflight = None
+        with self._lock:
+            return {"enabled": bool(self.conf["ENABLED"]), "backend": type(self.backend).__name__,
+                    "admitted": self.admitted, "limited": dict(self.limited),
+                    "global_inflight": global_inflight}
+
+
+_instance: RateLimiter | None = None
+_instance_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter built from settings.CHAT_RATE_LIMIT on first use."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                conf = {**DEFAULTS, **getattr(settings, "CHAT_RATE_LIMIT", {})}
+                if conf["BACKEND"] == "django":
+                    backend = DjangoCacheBackend(conf["ALIAS"])
+                else:
+                    backend = LocalBackend(conf["MAX_KEYS"])
+                _instance = RateLimiter(backend, conf)
+    return _instance
+
+
+# ------------------------------------------------------------
+# View decorator
+# ------------------------------------------------------------
+def too_many(e: RateLimited) -> JsonResponse:
+    resp = JsonResponse({"reply": LIMITED_REPLY, "error": "rate_limited", "reason": e.reason}, status=429)
+    resp["Retry-After"] = str(max(1, math.ceil(e.retry_after)))
+    return resp
+
+
+class _ReleaseAfter:
+    """
+    Wraps streaming content and releases the ticket when it's exhausted, fails, or is
+    closed by Django (which happens even if the stream was never started).
+    """
+
+    def __init__(self, content, ticket: Ticket):
+        self._content, self._ticket = content, ticket
+        self._it = None
+
+    def __iter__(self):
+        self._it = iter(self._content)
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._it)
+        except BaseException:
+            self.close()
+            raise
+
+    def __aiter__(self):
+        self._it = self._content.__aiter__()
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._it.__anext__()
+        except BaseException:
+            await self._ticket.arelease()
+            raise
+
+    def close(self) -> None:
+        self._ticket.release()
+        close = getattr(self._content, "close", None)
+        if close:
+            close()
+
+
+def throttle(inflight: bool = True):
+    """
+    Rate-limit a chat view (sync or async). With `inflight`, the request also holds
+    per-visitor and global slots until its response (or stream) is finished.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapped(request, *args, **kwargs):
+                limiter = get_rate_limiter()
+                if not limiter.conf["ENABLED"]:
+                    return await view(request, *args, **kwargs)
+                await request.session.aget("chat_cid")  # load it, so session_key is a real session
+                try:
+                    ticket = await limiter.aadmit(limiter.client_ip(request), request.session.session_key, inflight)
+                except RateLimited as e:
+                    return too_many(e)
+                try:
+                    resp = await view(request, *args, **kwargs)
+                except BaseException:
+                    await ticket.arelease()
+                    raise
+                if getattr(resp, "streaming", False):
+                    resp.streaming_content = _ReleaseAfter(resp.streaming_content, ticket)
+                else:
+                    await ticket.arelease()
+                return resp
+        else:
+            @wraps(view)
+            def wrapped(request, *args, **kwargs):
+                limiter = get_rate_limiter()
+                if not limiter.conf["ENABLED"]:
+                    return view(request, *args, **kwargs)
+                request.session.get("chat_cid")  # load it, so session_key is a real session
+                try:
+                    ticket = limiter.admit(limiter.client_ip(request), request.session.session_key, inflight)
+                except RateLimited as e:
+                    return too_many(e)
+                try:
+                    resp = view(request, *args, **kwargs)
+                except BaseException:
+                    ticket.release()
+                    raise
+                if getattr(resp, "streaming", False):
+                    resp.streaming_content = _ReleaseAfter(resp.streaming_content, ticket)
+                else:
+                    ticket.release()
+                return resp
+        return wrapped
+    return decorator
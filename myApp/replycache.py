@@ -0,0 +1,172 @@
+# myApp/replycache.py
+"""
+Exact-match reply cache for the chat assistant.
+
+Keys are a normalized user message plus a fingerprint of everything else that shapes
+the answer (system prompt, model, temperature), so editing SYSTEM_PROMPT or switching
+models naturally invalidates old entries.
+
+Configure with settings.CHAT_REPLY_CACHE:
+    {"BACKEND": "local" | "django", "TTL": 3600, "MAX_ENTRIES": 512, "ALIAS": "default"}
+A TTL of 0 disables caching.
+"""
+from __future__ import annotations
+import hashlib, re, threading, time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+DEFAULTS = {"BACKEND": "local", "TTL": 60 * 60, "MAX_ENTRIES": 512, "ALIAS": "default"}
+
+_WS = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.…]+$")
+
+def normalize(msg: str) -> str:
+    """Case/whitespace/trailing-punctuation insensitive form of a chat message."""
+    return _TRAILING.sub("", _WS.sub(" ", (msg or "").strip().lower()))
+
+def fingerprint(*parts) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(repr(p).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+def make_key(msg: str, prefix: str) -> str:
+    """`prefix` is a `fingerprint()` of the prompt/model/temperature in use."""
+    digest = hashlib.sha256(normalize(msg).encode("utf-8")).hexdigest()[:32]
+    return f"chatreply:{prefix}:{digest}"
+
+
+# ------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------
+class LocalBackend:
+    """In-process LRU with per-entry expiry. Thread-safe; one copy per worker."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, int(max_entries))
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+    """
+    Delegates to a Django cache alias so all workers share entries.
+    Size limits/eviction are the cache's own (e.g. OPTIONS.MAX_ENTRIES for locmem/db).
+    """
+
+    def __init__(self, alias: str):
+        from django.core.cache import caches
+        self._cache = caches[alias]
+
+    def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._cache.set(key, value, ttl)
+
+    def clear(self) -> None:
+        pass  # never flush a shared cache from here; entries age out via TTL
+
+
+# ------------------------------------------------------------
+# Front
+# ------------------------------------------------------------
+class ReplyCache:
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = int(ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str) -> str | None:
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            value = None  # a broken cache must never break chat
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if not self.enabled or not value:
+            return
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception:
+            pass
+
+    # Async views: shared backends may hit the DB/network, so keep them off the event loop.
+    async def aget(self, key: str) -> str | None:
+        if isinstance(self.backend, LocalBackend):
+            return self.get(key)
+        return await sync_to_async(self.get)(key)
+
+    async def aset(self, key: str, value: str) -> None:
+        if isinstance(self.backend, LocalBackend):
+            return self.set(key, value)
+        await sync_to_async(self.set)(key, value)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+_instance: ReplyCache | None = None
+_instance_lock = threading.Lock()
+
+def get_reply_cache() -> ReplyCache:
+    """Process-wide cache built from settings.CHAT_REPLY_CACHE on first use."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                conf = {**DEFAULTS, **getattr(settings, "CHAT_REPLY_CACHE", {})}
+                if conf["BACKEND"] == "django":
+                    backend = DjangoCacheBackend(conf["ALIAS"])
+                else:
+                    backend = LocalBackend(conf["MAX_ENTRIES"])
+                _instance = ReplyCache(backend, conf["TTL"])
+    return _instance
@@ -0,0 +1,285 @@
+# myApp/router.py
+"""
+Multi-model routing for chat completions.
+
+settings.CHAT_ROUTER["ROUTES"] lists the models in fallback order. A route may limit
+which messages it *starts* with (MAX_TOKENS of input, MAX_COMPLEXITY score); the first
+healthy route that fits is tried first, then the rest of the list in order. So short,
+simple messages start on the cheap model, and everything falls back down the chain
+when a call fails.
+
+A route is unhealthy once it has MIN_SAMPLES results and either its error rate over the
+last WINDOW calls is above MAX_ERROR_RATE or its p90 latency is above MAX_P90 seconds.
+Every error counts toward the rate (a missing model or a 403 as much as a 429), except
+CircuitOpen: that is the model's own breaker failing fast, and it says nothing new.
+Unhealthy routes still run, but only after every healthy one.
+
+CLIENT is "openai" (the shared SDK client) or "local", a canned stand-in with the same
+`chat.completions.create` surface. The local client needs no key or network, which
+makes it handy in tests and dev. Every decision (input size, complexity, chain,
+per-attempt timings) is logged and the last few are kept for chat_health.
+"""
+from __future__ import annotations
+import asyncio, logging, re, threading, time
+from collections import deque
+from dataclasses import dataclass, field
+from types import SimpleNamespace as NS
+
+from django.conf import settings
+
+from .breaker import CircuitOpen, LatencyWindow
+from .prompts import count_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ROUTES": (
+        {"MODEL": "gpt-4.1-nano", "CLIENT": "openai", "MAX_TOKENS": 24, "MAX_COMPLEXITY": 0.3},
+        {"MODEL": "gpt-4o-mini", "CLIENT": "openai"},
+    ),
+    "MAX_ERROR_RATE": 0.5, "MAX_P90": 12.0, "MIN_SAMPLES": 5, "WINDOW": 50, "KEEP_DECISIONS": 50,
+}
+
+
+# ------------------------------------------------------------
+# Message complexity
+# ------------------------------------------------------------
+_HARD = re.compile(r"\b(strateg\w*|plan|campaign|analy[sz]\w*|compare|versus|vs|explain|why|"
+                   r"step[- ]by[- ]step|framework|funnel|calendar|roadmap|audit|scripts?|thread|"
+                   r"sequence|rewrite|brainstorm|pros and cons)\b", re.I)
+_STRUCTURE = re.compile(r"```|\n\s*(?:[-*•]|\d+[.)])\s")
+
+
+def complexity(text: str, turns: int = 0) -> float:
+    """0..1 guess at how much model the message needs: length, asks, structure, follow-up depth."""
+    text = text or ""
+    score = 0.5 * min(count_tokens(text) / 120.0, 1.0)
+    score += 0.12 * min(len(_HARD.findall(text)), 3)
+    score += 0.1 if text.count("?") > 1 else 0.0
+    score += 0.1 if _STRUCTURE.search(text) else 0.0
+    score += 0.025 * min(turns, 4)  # follow-ups lean on the context
+    return round(min(score, 1.0), 3)
+
+
+# ------------------------------------------------------------
+# Routes
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class Route:
+    model: str
+    client: str = "openai"
+    max_tokens: int | None = None        # only *start* here for inputs up to this size
+    max_complexity: float | None = None  # ...and this complexity
+
+    @property
+    def local(self) -> bool:
+        return self.client == "local"
+
+    def fits(self, tokens: int, score: float) -> bool:
+        return ((self.max_tokens is None or tokens <= self.max_tokens)
+                and (self.max_complexity is None or score <= self.max_complexity))
+
+
+class ModelStats:
+    def __init__(self, window: int):
+        self.latency = LatencyWindow(window)
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True = failure
+        self._lock = threading.Lock()
+        self.calls = self.failures = 0
+
+    def record(self, seconds: float, failed: bool) -> None:
+        if not failed:
+            self.latency.add(seconds)
+        with self._lock:
+            self.calls += 1
+            self.failures += failed
+            self._outcomes.append(failed)
+
+    def error_rate(self) -> float:
+        with self._lock:
+            return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def samples(self) -> int:
+        return len(self._outcomes)
+
+    def report(self) -> dict:
+        p50, p90 = self.latency.percentile(50), self.latency.percentile(90)
+        return {"calls": self.calls, "failures": self.failures,
+                "recent_error_rate": round(self.error_rate(), 3),
+                "p50_s": round(p50, 3) if p50 is not None else None,
+                "p90_s": round(p90, 3) if p90 is not None else None}
+
+
+@dataclass
+class Decision:
+    tokens: int
+    complexity: float
+    chain: tuple[Route, ...]
+    attempts: list[tuple[str, float, str | None]] = field(default_factory=list)  # (model, s, error)
+    served_by: str | None = None
+    started: float = field(default_factory=time.monotonic)
+
+
+class Router:
+    def __init__(self, conf: dict | None = None):
+        self.conf = {**DEFAULTS, **(conf or {})}
+        self.routes = tuple(
+            Route(r["MODEL"], r.get("CLIENT", "openai"), r.get("MAX_TOKENS"), r.get("MAX_COMPLEXITY"))
+            for r in self.conf["ROUTES"]
+        )
+        self.stats_by_model = {r.model: ModelStats(int(self.conf["WINDOW"])) for r in self.routes}
+        self._recent: deque[dict] = deque(maxlen=int(self.conf["KEEP_DECISIONS"]))
+        self._lock = threading.Lock()
+
+    def healthy(self, route: Route) -> bool:
+        s, c = self.stats_by_model[route.model], self.conf
+        if s.samples() < c["MIN_SAMPLES"]:
+            return True
+        p90 = s.latency.percentile(90)
+        return s.error_rate() <= c["MAX_ERROR_RATE"] and (p90 is None or p90 <= c["MAX_P90"])
+
+    def plan(self, user_msg: str, turns: int = 0, available=lambda route: True) -> Decision:
+        """Chain for this message: first fitting healthy route, the rest in order, unhealthy last."""
+        tokens, score = count_tokens(user_msg), complexity(user_msg, turns)
+        routes = [r for r in self.routes if available(r)]
+        healthy = [r for r in routes if self.healthy(r)]
+        start = next((r for r in healthy if r.fits(tokens, score)), healthy[0] if healthy else None)
+        chain = ([start] if start else []) + [r for r in healthy if r is not start]
+        chain += [r for r in routes if r not in chain]
+        return Decision(tokens, score, tuple(chain))
+
+    def record(self, decision: Decision, route: Route, seconds: float, error: BaseException | None = None) -> None:
+        decision.attempts.append((route.model, seconds, type(error).__name__ if error else None))
+        if error is None:
+            decision.served_by = route.model
+            self.stats_by_model[route.model].record(seconds, False)
+        elif not isinstance(error, CircuitOpen):
+            # any error counts here, not just brownouts: a 404/403 on this model (renamed,
+            # no access) fails every call, and should push the route to the back of the chain
+            self.stats_by_model[route.model].record(seconds, True)
+        if error is not None:
+            logger.warning("Chat route %s failed after %.0f ms (%s)", route.model, seconds * 1000, error)
+
+    def close(self, decision: Decision) -> None:
+        total = time.monotonic() - decision.started
+        tried = " -> ".join(f"{m} {s * 1000:.0f}ms{'' if e is None else ' ' + e}" for m, s, e in decision.attempts)
+        logger.info("Chat route: tokens=%d complexity=%.2f chain=%s served_by=%s total=%.0fms [%s]",
+                    decision.tokens, decision.complexity, ",".join(r.model for r in decision.chain),
+                    decision.served_by, total * 1000, tried)
+        with self._lock:
+            self._recent.append({
+                "tokens": decision.tokens, "complexity": decision.complexity,
+                "chain": [r.model for r in decision.chain], "served_by": decision.served_by,
+                "attempts": [{"model": m, "ms": round(s * 1000), "error": e} for m, s, e in decision.attempts],
+                "total_ms": round(total * 1000),
+            })
+
+    def run(self, decision: Decision, call):
+        """`call(route)` returns the reply or raises to fall through to the next route."""
+        error: BaseException | None = None
+        try:
+            for route in decision.chain:
+                started = time.monotonic()
+                try:
+                    result = call(route)
+                except Exception as e:
+                    self.record(decision, route, time.monotonic() - started, e)
+                    error = e
+                    continue
+                self.record(decision, route, time.monotonic() - started)
+                return result
+        finally:
+            self.close(decision)
+        raise error or RuntimeError("no chat model available")
+
+    async def arun(self, decision: Decision, call):
+        """`call(route)` returns an awaitable."""
+        error: BaseException | None = None
+        try:
+            for route in decision.chain:
+                started = time.monotonic()
+                try:
+                    result = await call(route)
+                except Exception as e:
+                    self.record(decision, route, time.monotonic() - started, e)
+                    error = e
+                    continue
+                self.record(decision, route, time.monotonic() - started)
+                return result
+        finally:
+            self.close(decision)
+        raise error or RuntimeError("no chat model available")
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = list(self._recent)
+        served: dict[str, int] = {}
+        for d in recent:
+            served[d["served_by"] or "none"] = served.get(d["served_by"] or "none", 0) + 1
+        return {
+            "routes": [{"model": r.model, "client": r.client, "max_tokens": r.max_tokens,
+                        "max_complexity": r.max_complexity, "healthy": self.healthy(r),
+                        **self.stats_by_model[r.model].report()} for r in self.routes],
+            "served_recently": served,
+            "recent": recent[-10:],
+        }
+
+
+# ------------------------------------------------------------
+# Local stand-in model
+# ------------------------------------------------------------
+def _local_text(kwargs: dict) -> str:
+    user = next((m["content"] for m in reversed(kwargs.get("messages", [])) if m["role"] == "user"), "")
+    return f"(local model) You said: {' '.join(user.split())[:200]}"
+
+
+class _LocalCompletions:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def create(self, stream: bool = False, **kwargs):
+        time.sleep(self.latency)
+        text = _local_text(kwargs)
+        if stream:
+            words = text.split(" ")
+            return iter([NS(choices=[NS(delta=NS(content=w if i == 0 else " " + w))])
+                         for i, w in enumerate(words)])
+        return NS(choices=[NS(message=NS(content=text))], usage=None)
+
+
+class _AsyncLocalCompletions(_LocalCompletions):
+    async def create(self, stream: bool = False, **kwargs):
+        await asyncio.sleep(self.latency)
+        text = _local_text(kwargs)
+        if not stream:
+            return NS(choices=[NS(message=NS(content=text))], usage=None)
+
+        async def chunks():
+            for i, w in enumerate(text.split(" ")):
+                yield NS(choices=[NS(delta=NS(content=w if i == 0 else " " + w))])
+        return chunks()
+
+
+class LocalClient:
+    """Deterministic echo with the SDK's `chat.completions.create` shape (blocking + stream)."""
+
+    def __init__(self, latency: float = 0.0):
+        self.chat = NS(completions=_LocalCompletions(latency))
+
+
+class AsyncLocalClient:
+    def __init__(self, latency: float = 0.0):
+        self.chat = NS(completions=_AsyncLocalCompletions(latency))
+
+
+_instance: Router | None = None
+_instance_lock = threading.Lock()
+
+def get_router() -> Router:
+    """Process-wide router built from settings.CHAT_ROUTER on first use."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = Router(getattr(settings, "CHAT_ROUTER", {}))
+    return _instance
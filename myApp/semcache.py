@@ -0,0 +1,163 @@
+# myApp/semcache.py
+"""
+Opt-in semantic (near-duplicate) reply cache.
+
+Messages are embedded locally with a hashed bag-of-words vectorizer (word unigrams +
+bigrams + character trigrams, signed feature hashing, L2-normalized), so rewordings
+like "How much is IGNITE?" / "how much does ignite cost" (~0.86) land close together
+while "How much is IGNITE?" / "How much is VISION?" (~0.61) stay apart, without any
+model download. Recent question/answer pairs live in a fixed-size
+NumPy matrix used as a ring buffer; a lookup is a single matrix-vector product.
+
+Configure with settings.CHAT_SEMANTIC_CACHE:
+    {"ENABLED": False, "THRESHOLD": 0.82, "MAX_ENTRIES": 1000, "DIM": 1024, "TTL": 3600}
+Requires numpy (pinned in requirements.txt); if it is missing the cache stays disabled and
+the first lookup logs a warning.
+"""
+from __future__ import annotations
+import hashlib, logging, re, threading, time
+
+from django.conf import settings
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # optional dependency
+    np = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {"ENABLED": False, "THRESHOLD": 0.82, "MAX_ENTRIES": 1000, "DIM": 1024, "TTL": 60 * 60}
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Words that carry no intent; dropping them keeps "what are the prices" ≈ "prices?"
+_STOP = frozenset("a an the is are am be do does did i you we me my your our it of to in on for "
+                  "and or with at by can could would should will please hi hello hey so".split())
+
+
+def _bucket(feature: str, dim: int) -> tuple[int, float]:
+    h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, (1.0 if (h >> 63) & 1 else -1.0)
+
+
+class HashingVectorizer:
+    def __init__(self, dim: int):
+        self.dim = int(dim)
+
+    def features(self, text: str) -> list[tuple[str, float]]:
+        words = [w for w in _WORD.findall((text or "").lower()) if w not in _STOP]
+        feats = [(f"w:{w}", 1.0) for w in words]
+        feats += [(f"b:{a}_{b}", 0.7) for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f"<{w}>"
+            feats += [(f"c:{padded[i:i + 3]}", 0.3) for i in range(len(padded) - 2)]
+        return feats
+
+    def embed(self, text: str):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feat, weight in self.features(text):
+            idx, sign = _bucket(feat, self.dim)
+            vec[idx] += sign * weight
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+
+class SemanticCache:
+    """Thread-safe ring buffer of (embedding, answer) pairs with cosine lookup."""
+
+    enabled = True
+
+    def __init__(self, threshold: float, max_entries: int, dim: int, ttl: int):
+        self.threshold = float(threshold)
+        self.capacity = max(1, int(max_entries))
+        self.ttl = int(ttl)
+        self.vectorizer = HashingVectorizer(dim)
+        self._vecs = np.zeros((self.capacity, self.vectorizer.dim), dtype=np.float32)
+        self._expires = np.zeros(self.capacity, dtype=np.float64)  # 0 = empty slot
+        self._answers: list[str | None] = [None] * self.capacity
+        self._questions: list[str | None] = [None] * self.capacity
+        self._next = 0
+        self._lock = threading.Lock()
+        # metrics
+        self.lookups = 0
+        self.hits = 0
+        self._hit_sim_total = 0.0
+        self.best_miss = 0.0  # highest similarity that still missed (helps tune THRESHOLD)
+
+    def lookup(self, text: str) -> str | None:
+        q = self.vectorizer.embed(text)
+        if not q.any():
+            return None
+        with self._lock:
+            self.lookups += 1
+            sims = self._vecs @ q
+            sims[self._expires < time.monotonic()] = -1.0  # expired and empty slots
+            i = int(sims.argmax())
+            sim = float(sims[i])
+            if sim >= self.threshold:
+                self.hits += 1
+                self._hit_sim_total += sim
+                logger.debug("Semantic hit %.3f: %r ~ %r", sim, text, self._questions[i])
+                return self._answers[i]
+            self.best_miss = max(self.best_miss, sim)
+            return None
+
+    def add(self, text: str, answer: str) -> None:
+        if not answer:
+            return
+        v = self.vectorizer.embed(text)
+        if not v.any():
+            return
+        with self._lock:
+            i = self._next
+            self._vecs[i] = v
+            self._expires[i] = time.monotonic() + self.ttl
+            self._answers[i] = answer
+            self._questions[i] = text
+            self._next = (i + 1) % self.capacity
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = int((self._expires >= time.monotonic()).sum())
+        return {
+            "enabled": True,
+            "threshold": self.threshold,
+            "entries": size,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "avg_hit_similarity": round(self._hit_sim_total / self.hits, 3) if self.hits else None,
+            "best_miss_similarity": round(self.best_miss, 3),
+        }
+
+
+class _Disabled:
+    enabled = False
+
+    def lookup(self, text: str) -> None:
+        return None
+
+    def add(self, text: str, answer: str) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"enabled": False, "numpy_installed": np is not None}
+
+
+_instance: SemanticCache | _Disabled | None = None
+_instance_lock = threading.Lock()
+
+def get_semantic_cache() -> SemanticCache | _Disabled:
+    """Process-wide semantic cache built from settings.CHAT_SEMANTIC_CACHE on first use."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                conf = {**DEFAULTS, **getattr(settings, "CHAT_SEMANTIC_CACHE", {})}
+                if not conf["ENABLED"]:
+                    _instance = _Disabled()
+                elif np is None:
+                    logger.warning("CHAT_SEMANTIC_CACHE enabled but numpy is not installed; skipping.")
+                    _instance = _Disabled()
+                else:
+                    _instance = SemanticCache(conf["THRESHOLD"], conf["MAX_ENTRIES"], conf["DIM"], conf["TTL"])
+    return _instance
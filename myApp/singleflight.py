@@ -0,0 +1,133 @@
+# myApp/singleflight.py
+"""
+Request coalescing ("single-flight") for identical concurrent chat messages.
+
+The first caller for a key becomes the leader and makes the upstream call; callers
+that arrive while it's in flight wait for the leader's result instead of starting
+their own. Once the leader finishes, the key is released — later callers are served
+by the reply cache, not by this module.
+
+`SingleFlight` is for threads (gunicorn sync/gthread), `AsyncSingleFlight` for
+coroutines on one event loop (uvicorn). Both offer `do(key, fn)` for plain calls and
+`claim(key)` for callers that need to produce the result themselves (streaming).
+"""
+from __future__ import annotations
+import asyncio, threading
+
+
+def _shareable(error: BaseException) -> Exception:
+    # a leader's cancellation/exit must not look like the followers' own cancellation
+    if isinstance(error, Exception):
+        return error
+    return RuntimeError(f"single-flight leader aborted ({type(error).__name__})")
+
+
+class Call:
+    """One in-flight upstream call shared by a leader and its followers."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.result: str | None = None
+        self.error: BaseException | None = None
+        self.followers = 0
+
+    def wait(self, timeout: float | None = None) -> str:
+        if not self._done.wait(timeout):
+            raise TimeoutError("single-flight leader did not finish in time")
+        if self.error is not None:
+            raise self.error
+        return self.result  # type: ignore[return-value]
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[str, Call] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0  # followers served by someone else's call
+
+    def claim(self, key: str) -> tuple[bool, Call]:
+        """(True, call) for the leader, who must `finish()`; (False, call) for followers."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.coalesced += 1
+                return False, call
+            call = self._calls[key] = Call()
+            return True, call
+
+    def finish(self, key: str, call: Call, result: str | None = None,
+               error: BaseException | None = None) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.result, call.error = result, (_shareable(error) if error is not None else None)
+        call._done.set()
+
+    def do(self, key: str, fn, timeout: float | None = None) -> str:
+        leader, call = self.claim(key)
+        if not leader:
+            return call.wait(timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "coalesced": self.coalesced}
+
+
+class AsyncSingleFlight:
+    """Coroutine flavour; all callers must share one event loop (one per ASGI worker)."""
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+        self._followers: dict[str, int] = {}
+        self.coalesced = 0
+
+    def claim(self, key: str) -> tuple[bool, asyncio.Future]:
+        fut = self._calls.get(key)
+        if fut is not None and not fut.done():
+            self.coalesced += 1
+            self._followers[key] = self._followers.get(key, 0) + 1
+            return False, fut
+        fut = self._calls[key] = asyncio.get_running_loop().create_future()
+        return True, fut
+
+    def finish(self, key: str, fut: asyncio.Future, result: str | None = None,
+               error: BaseException | None = None) -> None:
+        if self._calls.get(key) is fut:
+            del self._calls[key]
+            self._followers.pop(key, None)
+        if fut.done():
+            return
+        if error is not None:
+            fut.set_exception(_shareable(error))
+            fut.exception()  # mark retrieved: no "never retrieved" warning when nobody waited
+        else:
+            fut.set_result(result)
+
+    def followers(self, key: str) -> int:
+        """Callers waiting on the in-flight call for `key`."""
+        return self._followers.get(key, 0)
+
+    async def do(self, key: str, fn, timeout: float | None = None) -> str:
+        """`fn` is a zero-arg coroutine function."""
+        leader, fut = self.claim(key)
+        if not leader:
+            # shield: a follower timing out/cancelling must not cancel the shared call
+            return await asyncio.wait_for(asyncio.shield(fut), timeout)
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.finish(key, fut, error=e)
+            raise
+        self.finish(key, fut, result=result)
+        return result
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "coalesced": self.coalesced}
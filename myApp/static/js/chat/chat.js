@@ -0,0 +1,226 @@
+// Lioraè chat concierge. Loaded on demand by the loader in base.html (see build_assets):
+// bundled after marked.min.js into js/chat.bundle.js, so first paint never waits on it.
+(() => {
+  const $ = s => document.querySelector(s);
+  const toggle   = $('#chat-toggle');
+  const chatbox  = $('#chatbox');
+  const closeBtn = $('#chat-close');
+  const messages = $('#chat-messages');
+  const input    = $('#chat-input');
+  const sendBtn  = $('#send-btn');
+  const micBtn   = $('#mic-btn');
+  const preview  = $('#chat-preview');
+  const chipsBar = $('#chips');
+
+  // Markdown (safe)
+  const hasMarked = !!window.marked;
+  if (hasMarked) { try { marked.setOptions({ breaks:true, headerIds:false, mangle:true }); } catch(e){} }
+  const escapeHTML = s => (s||'').replace(/[&<>"']/g, m => ({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[m]));
+  const mdSafe = t => { const c=t.replace(/<script[\s\S]*?>[\s\S]*?<\/script>/gi,''); try{ return hasMarked? marked.parse(c) : escapeHTML(c).replace(/\n/g,'<br>'); }catch(e){ return escapeHTML(c); } };
+
+  const getCSRF = () => { const m=document.cookie.match(/csrftoken=([^;]+)/); return m?m[1]:''; };
+
+  // UI open/close and state
+  const STATE_KEY='lia:open', LOG_KEY='lia:log';
+  const openChat = () => { chatbox.classList.remove('hidden'); toggle.classList.remove('pulse'); preview.style.opacity=0; try{localStorage.setItem(STATE_KEY,'1')}catch(e){}; input.focus(); };
+  const closeChat= () => { chatbox.classList.add('hidden');   toggle.classList.add('pulse');   preview.style.opacity=1; try{localStorage.setItem(STATE_KEY,'0')}catch(e){}; };
+
+  toggle?.addEventListener('click', openChat);
+  closeBtn?.addEventListener('click', closeChat);
+  preview?.addEventListener('click', openChat);
+  document.addEventListener('click', (e)=>{ const hit=e.target.closest('#chat-toggle,#chat-close,#chat-preview'); if(!hit) return; hit.id==='chat-close'?closeChat():openChat(); }, true);
+
+  // Restore state/history
+  try{
+    if(localStorage.getItem(STATE_KEY)==='1') openChat();
+    const log=JSON.parse(localStorage.getItem(LOG_KEY)||'[]');
+    if(log.length){ chipsBar?.remove(); log.forEach(({role,html})=> appendBubble(role, html, true)); }
+  }catch(e){}
+
+  // Auto-resize & send
+  const autoResize=()=>{ input.style.height='auto'; input.style.height=Math.min(input.scrollHeight,120)+'px'; };
+  input.addEventListener('input', ()=>{ sendBtn.disabled=!input.value.trim(); autoResize(); });
+  input.addEventListener('keydown', (e)=>{ if(e.key==='Enter'&&!e.shiftKey){ e.preventDefault(); if(!sendBtn.disabled) sendMessage(); }});
+  chipsBar?.addEventListener('click',(e)=>{ const btn=e.target.closest('.chip'); if(!btn) return; input.value=btn.dataset.q; sendBtn.disabled=false; sendMessage(); });
+
+  // UI helpers
+  function appendBubble(role, html, restoring=false){
+    const row=document.createElement('div'); row.className='mrow '+(role==='user'?'user':'ai');
+    if(role==='ai'){ const av=document.createElement('div'); av.className='avatar'; av.textContent='L'; row.appendChild(av); }
+    else{ const spacer=document.createElement('div'); spacer.style.width='26px'; row.appendChild(spacer); }
+    const b=document.createElement('div'); b.className='bubble'; b.innerHTML=html; row.appendChild(b);
+    messages.appendChild(row); messages.scrollTop=messages.scrollHeight;
+    if(!restoring) persist(role, html);
+  }
+  // keep the last LOG_MAX bubbles (trimming the array, not the JSON string, so it stays parseable);
+  // the server keeps the real conversation context
+  const LOG_MAX=30;
+  function persist(role, html){ try{ const log=JSON.parse(localStorage.getItem(LOG_KEY)||'[]'); log.push({role,html}); localStorage.setItem(LOG_KEY, JSON.stringify(log.slice(-LOG_MAX))); }catch(e){} }
+
+  // typing indicator
+  function showTyping(){
+    const t=document.createElement('div'); t.className='typing'; t.id='typing';
+    t.innerHTML='<span class="dot"></span><span class="dot"></span><span class="dot"></span>';
+    messages.appendChild(t); messages.scrollTop=messages.scrollHeight;
+  }
+  function hideTyping(){ document.getElementById('typing')?.remove(); }
+
+  // typewriter
+  function typeWriterAI(html){
+    const row=document.createElement('div'); row.className='mrow ai';
+    const av=document.createElement('div'); av.className='avatar'; av.textContent='L';
+    const bubble=document.createElement('div'); bubble.className='bubble';
+    row.appendChild(av); row.appendChild(bubble); messages.appendChild(row);
+
+    // Build a DOM tree from HTML and reveal node-by-node
+    const tmp=document.createElement('div'); tmp.innerHTML=html;
+    const nodes=Array.from(tmp.childNodes);
+
+    const writeNode = (node, target, done) => {
+      if(node.nodeType===Node.TEXT_NODE){
+        const text=node.textContent||'';
+        let i=0; (function step(){
+          if(i<text.length){ target.append(text.charAt(i++)); messages.scrollTop=messages.scrollHeight; setTimeout(step, 16); }
+          else done();
+        })();
+      }else{
+        const el=node.cloneNode(false); target.appendChild(el);
+        const kids=Array.from(node.childNodes); let k=0;
+        (function step(){
+          if(k>=kids.length){ done(); return; }
+          writeNode(kids[k++], el, step);
+        })();
+      }
+    };
+
+    let idx=0; (function next(){
+      if(idx>=nodes.length){ persist('ai', bubble.innerHTML); return; }
+      writeNode(nodes[idx++], bubble, next);
+    })();
+  }
+
+  // streaming: open an empty AI bubble and re-render markdown as deltas arrive (one paint per frame)
+  const STREAM_URL = chatbox.dataset.streamUrl;
+  const REPLY_URL  = chatbox.dataset.replyUrl;
+  const canStream = !!(STREAM_URL && window.ReadableStream && window.TextDecoder);
+
+  function streamBubble(){
+    const row=document.createElement('div'); row.className='mrow ai';
+    const av=document.createElement('div'); av.className='avatar'; av.textContent='L';
+    const bubble=document.createElement('div'); bubble.className='bubble';
+    row.appendChild(av); row.appendChild(bubble); messages.appendChild(row);
+    let text='', queued=false;
+    const paint=()=>{ queued=false; bubble.innerHTML=mdSafe(text); messages.scrollTop=messages.scrollHeight; };
+    return {
+      push(t){ text+=t; if(!queued){ queued=true; requestAnimationFrame(paint); } },
+      end(){ paint(); persist('ai', bubble.innerHTML); },
+      get started(){ return text.length>0; },
+      drop(){ row.remove(); },
+    };
+  }
+
+  // 429 (rate limited) / 503 (busy): show the server's "try again shortly" reply instead of an error dump (and don't retry)
+  async function showLimited(resp){
+    let reply='';
+    try{ reply=(await resp.json())?.reply||''; }catch(e){}
+    hideTyping();
+    appendBubble('ai', mdSafe(reply || 'Too many messages at once — give me a few seconds and try again.'));
+  }
+
+  // returns false when nothing was received so the caller can fall back to the JSON endpoint
+  async function streamReply(text){
+    const resp = await fetch(STREAM_URL, {
+      method:'POST',
+      headers:{ 'Content-Type':'application/json', 'Accept':'text/event-stream', 'X-CSRFToken': getCSRF() },
+      body: JSON.stringify({ message: text })
+    });
+    if (resp.status === 429 || resp.status === 503) { await showLimited(resp); return true; }
+    if (!resp.ok || !resp.body) return false;
+
+    const reader=resp.body.getReader(), dec=new TextDecoder();
+    let buf='', out=null;
+    try{
+      for(;;){
+        const {value, done}=await reader.read();
+        if(done) break;
+        buf+=dec.decode(value, {stream:true});
+        let cut;
+        while((cut=buf.indexOf('\n\n'))>=0){
+          const frame=buf.slice(0,cut); buf=buf.slice(cut+2);
+          const ev=(frame.match(/^event: (.*)$/m)||[])[1]||'message';
+          const raw=(frame.match(/^data: (.*)$/m)||[])[1];
+          if(ev==='delta' && raw){
+            if(!out){ hideTyping(); out=streamBubble(); }
+            out.push(JSON.parse(raw).t||'');
+          }
+        }
+      }
+    }catch(err){
+      console.error('Chat stream error:', err);
+      if(!out?.started){ out?.drop(); return false; }
+    }
+    if(!out) return false;
+    out.end();
+    return true;
+  }
+
+  sendBtn.addEventListener('click', sendMessage);
+
+  async function sendMessage(){
+    const text = input.value.trim(); if(!text) return;
+    chipsBar?.remove();
+    appendBubble('user', mdSafe(text));
+    input.value=''; sendBtn.disabled=true; autoResize();
+    showTyping();
+    if (canStream) {
+      try{ if (await streamReply(text)) return; }catch(err){ console.error(err); }
+    }
+    try{
+      const resp = await fetch(REPLY_URL, {
+        method:'POST',
+        headers:{ 'Content-Type':'application/json', 'X-CSRFToken': getCSRF() },
+        body: JSON.stringify({ message: text })
+      });
+
+      if (resp.status === 429 || resp.status === 503) { await showLimited(resp); return; }
+
+      // robust error surfacing
+      if (!resp.ok) {
+        const errText = await resp.text();
+        hideTyping();
+        appendBubble('ai', mdSafe(`Server error (${resp.status}).\n\n\`\`\`\n${(errText||'').slice(0,600)}\n\`\`\``));
+        console.error('Chat error:', resp.status, errText);
+        return;
+      }
+
+      // prefer JSON; if not JSON, show the raw text
+      const ct = resp.headers.get('content-type') || '';
+      let reply = '';
+      if (ct.includes('application/json')) {
+        const data = await resp.json();
+        reply = data?.reply || 'Hmm… I got an empty reply.';
+      } else {
+        const txt = await resp.text();
+        reply = txt || 'Hmm… I got a non-JSON reply.';
+      }
+
+      hideTyping();
+      const safeHtml = mdSafe(reply);
+      typeWriterAI(safeHtml);
+    }catch(err){
+      hideTyping();
+      appendBubble('ai', mdSafe("Sorry, I couldn't reach the assistant 😔"));
+      console.error(err);
+    }
+  }
+
+  // Voice (optional)
+  if('webkitSpeechRecognition' in window){
+    const rec=new webkitSpeechRecognition(); rec.continuous=false; rec.interimResults=false; rec.lang='en-US';
+    micBtn.onclick=()=>rec.start();
+    rec.onresult=e=>{ input.value=e.results[0][0].transcript; sendBtn.disabled=!input.value.trim(); autoResize(); };
+  } else { micBtn.style.display='none'; }
+
+  // the loader calls this for the click that triggered the download
+  window.LioraChat = { open: openChat, close: closeChat };
+})();
@@ -0,0 +1,159 @@
+# myApp/templatetags/assets.py
+"""
+Template tags for built front-end assets (`manage.py build_assets`).
+
+{% tailwind_css %} links the compiled stylesheet (css/tailwind.css, hashed by the
+manifest storage). If it hasn't been built, it falls back to the Tailwind CDN runtime
+with the same theme, so a fresh checkout still renders. That fallback is logged once,
+because it puts a blocking third-party script back on every page.
+
+{% page_styles "home" %} is the page's CSS: Tailwind, css/site.css, the page's own
+sheet (PAGE_CSS) and css/chat.css, in that cascade order. Once `build_assets` has
+written css/critical/<page>.css and the css/page-<page>.css bundle, only the critical
+rules are inlined and the bundle is preloaded and applied on load, so it doesn't block
+first paint. Before that, the site's own sheets are inlined whole (no extra requests),
+next to {% tailwind_css %}.
+
+{% chat_bundle_urls %} is the JSON list of scripts the chat loader in base.html fetches
+on demand: the built js/chat.bundle.js (marked + chat), or, before a build, marked
+from jsDelivr plus the unbundled js/chat/chat.js.
+
+{% responsive_img name alt=... sizes=... %} renders a static image as a <picture> with
+AVIF/WebP srcsets (`manage.py build_images`). Extra keyword arguments become <img>
+attributes; loading="lazy" also adds decoding="async", which is meant for anything below
+the fold. Stock images (content.REMOTE_IMAGES) keep hotlinking their remote URL until
+`manage.py import_images` has self-hosted them.
+"""
+from __future__ import annotations
+import json, logging
+from functools import lru_cache
+from pathlib import Path
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from myApp.content import REMOTE_IMAGES
+from myApp.images import get_image
+
+logger = logging.getLogger(__name__)
+register = template.Library()
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+TAILWIND_CSS = "css/tailwind.css"
+CHAT_BUNDLE = "js/chat.bundle.js"
+CHAT_SOURCE = "js/chat/chat.js"
+MARKED_VERSION = "4.3.0"  # the chat uses marked.parse/setOptions({headerIds, mangle}) from the v4 API
+MARKED_CDN = f"https://cdn.jsdelivr.net/npm/marked@{MARKED_VERSION}/marked.min.js"
+SITE_CSS = "css/site.css"
+CHAT_CSS = "css/chat.css"
+PAGE_CSS = {"home": ("css/home.css",), "about": ("css/about.css",)}
+
+
+@lru_cache(maxsize=1)
+def _cdn_fallback() -> str:
+    logger.warning("%s not built; falling back to the Tailwind CDN (run `manage.py build_assets`).", TAILWIND_CSS)
+    theme = json.loads((ASSETS_DIR / "tailwind.theme.json").read_text(encoding="utf-8"))
+    return ('<script src="https://cdn.tailwindcss.com"></script>\n'
+            f"<script>tailwind.config = {json.dumps({'theme': theme})}</script>")
+
+
+@lru_cache(maxsize=1)
+def _unbundled_chat() -> tuple[str, ...]:
+    logger.warning("%s not built; loading marked from jsDelivr and the unbundled chat source.", CHAT_BUNDLE)
+    return (MARKED_CDN, static(CHAT_SOURCE))
+
+
+def _built_url(name: str) -> str | None:
+    if not finders.find(name):
+        return None
+    try:
+        return static(name)
+    except ValueError:  # built after the last collectstatic: not in the manifest yet
+        return None
+
+
+def stylesheets(page: str = "") -> tuple[str, ...]:
+    """Static names of every sheet the page uses, in cascade order."""
+    return (TAILWIND_CSS, SITE_CSS, *PAGE_CSS.get(page, ()), CHAT_CSS)
+
+
+def critical_name(page: str) -> str:
+    return f"css/critical/{page}.css"
+
+
+def bundle_name(page: str) -> str:
+    return f"css/page-{page}.css"
+
+
+@lru_cache(maxsize=16)
+def _read(path: str, mtime_ns: int) -> str:
+    return Path(path).read_text(encoding="utf-8")
+
+
+def _critical_css(page: str) -> str | None:
+    path = finders.find(critical_name(page)) if page in PAGE_CSS else None
+    if not path:
+        return None
+    return _read(path, Path(path).stat().st_mtime_ns)
+
+
+def _sheet(name: str) -> str:
+    path = finders.find(name)
+    return _read(path, Path(path).stat().st_mtime_ns) if path else ""
+
+
+def _style_text(css: str):
+    return mark_safe(css.replace("</", "<\\/"))  # can't close the <style> element early
+
+
+@register.simple_tag
+def tailwind_css():
+    url = _built_url(TAILWIND_CSS)
+    if url is None:
+        return mark_safe(_cdn_fallback())
+    return format_html('<link rel="stylesheet" href="{}">', url)
+
+
+@register.simple_tag
+def page_styles(page: str = ""):
+    critical, bundle = _critical_css(page), _built_url(bundle_name(page))
+    if critical is not None and bundle:
+        return format_html(
+            '<style data-critical>{}</style>\n'
+            '<link rel="preload" as="style" href="{}" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            '\n<noscript><link rel="stylesheet" href="{}"></noscript>',
+            _style_text(critical), bundle, bundle,
+        )
+    # not built: inline our own sheets as the templates used to, rather than adding
+    # three render-blocking requests
+    inline = format_html_join("\n", '<style data-sheet="{}">{}</style>',
+                              ((n, _style_text(_sheet(n))) for n in stylesheets(page)[1:]))
+    return format_html("{}\n{}", tailwind_css(), inline)
+
+
+@register.simple_tag
+def chat_bundle_urls():
+    url = _built_url(CHAT_BUNDLE)
+    return json.dumps([url] if url else list(_unbundled_chat()))
+
+
+@register.simple_tag
+def responsive_img(name: str, alt: str = "", sizes: str = "100vw", **attrs):
+    if attrs.get("loading") == "lazy":
+        attrs.setdefault("decoding", "async")
+    img = get_image(name)
+    if img is not None:
+        attrs = {"width": img.width, "height": img.height, **attrs}
+    src = (_built_url(name) or REMOTE_IMAGES[name]) if name in REMOTE_IMAGES else static(name)
+    tag = format_html('<img src="{}" alt="{}"{}>', src, alt,
+                      format_html_join("", ' {}="{}"', attrs.items()))
+    if img is None:
+        return tag
+    sources = format_html_join(
+        "", '<source type="{}" srcset="{}" sizes="{}">',
+        ((mime, ", ".join(f"{static(n)} {w}w" for w, n in ws), sizes) for mime, ws in img.sources()),
+    )
+    return format_html("<picture>{}{}</picture>", sources, tag)
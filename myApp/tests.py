@@ -1,3 +1,297 @@
-from django.test import TestCase
+# myApp/tests.py
+"""
+Tests for the chat stack's hand-rolled concurrency primitives: single-flight handoff,
+the governor's queue, rate-limit tickets on streaming responses and the breaker's
+half-open probe. No network; the upstream is a gated local stand-in.
 
-# Create your tests here.
+    python manage.py test myApp
+"""
+import asyncio, threading, time, uuid
+from types import SimpleNamespace as NS
+from unittest import mock
+
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from myApp import views
+from myApp.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from myApp.governor import NEW, RETURNING, AsyncGovernor, Governor, Overloaded
+from myApp.ratelimit import get_rate_limiter, throttle
+from myApp.router import Router
+from myApp.singleflight import SingleFlight
+
+WORDS = ("Ferns", " unfurl", " slowly", " at", " dawn.")
+
+
+def _chunk(word: str):
+    return NS(choices=[NS(delta=NS(content=word))])
+
+
+class GatedClient:
+    """Streams WORDS, holding everything after the first word until `gate` is set."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.chat = NS(completions=NS(create=self._create))
+
+    def _create(self, stream: bool = False, **kwargs):
+        def chunks():
+            yield _chunk(WORDS[0])
+            self.gate.wait(5)
+            for w in WORDS[1:]:
+                yield _chunk(w)
+        return chunks()
+
+
+class AsyncGatedClient:
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.chat = NS(completions=NS(create=self._create))
+
+    async def _create(self, stream: bool = False, **kwargs):
+        async def chunks():
+            yield _chunk(WORDS[0])
+            await asyncio.wait_for(self.gate.wait(), 5)
+            for w in WORDS[1:]:
+                yield _chunk(w)
+        return chunks()
+
+
+def _local_router() -> Router:
+    return Router({"ROUTES": [{"MODEL": "local", "CLIENT": "local"}]})
+
+
+def _wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        time.sleep(0.005)
+
+
+async def _await_until(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        await asyncio.sleep(0.005)
+
+
+# ------------------------------------------------------------
+# Single-flight
+# ------------------------------------------------------------
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight, calls, release = SingleFlight(), [], threading.Event()
+
+        def fn():
+            calls.append(1)
+            release.wait(2)
+            return "reply"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", fn, timeout=2)))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        _wait_until(lambda: flight.coalesced == 3)
+        release.set()
+        for t in threads:
+            t.join(2)
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ["reply"] * 4)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_leader_error_reaches_followers(self):
+        flight = SingleFlight()
+        leader, call = flight.claim("k")
+        follower, same = flight.claim("k")
+        self.assertTrue(leader)
+        self.assertFalse(follower)
+        self.assertIs(call, same)
+        flight.finish("k", call, error=GeneratorExit())
+        with self.assertRaisesMessage(RuntimeError, "leader aborted"):
+            call.wait(0)
+
+
+class StreamHandoffTests(SimpleTestCase):
+    """A coalesced stream must still finish for its followers after the leader's client leaves."""
+
+    def test_follower_finishes_when_leader_disconnects(self):
+        client = GatedClient()
+        msg = f"write a haiku about ferns {uuid.uuid4()}"
+        key = views._reply_key(msg)
+        with mock.patch.object(views, "_local_client", client), \
+                mock.patch.object(views, "get_router", _local_router):
+            leader = views._llm_stream(msg)
+            self.assertEqual(next(leader), WORDS[0])
+
+            followed = []
+            follower = threading.Thread(target=lambda: followed.append("".join(views._llm_stream(msg))))
+            follower.start()
+            _wait_until(lambda: key in views._flight._calls and views._flight._calls[key].followers == 1)
+
+            client.gate.set()
+            leader.close()  # the leader's visitor disconnects mid-answer
+            follower.join(5)
+
+        self.assertEqual(followed, ["".join(WORDS)])
+        self.assertNotIn(key, views._flight._calls)
+
+    async def test_async_follower_finishes_when_leader_disconnects(self):
+        client = AsyncGatedClient()
+        msg = f"write a haiku about ferns {uuid.uuid4()}"
+        key = views._reply_key(msg)
+
+        async def collect(gen):
+            return "".join([piece async for piece in gen])
+
+        with mock.patch.object(views, "_alocal_client", client), \
+                mock.patch.object(views, "get_router", _local_router):
+            leader = views._allm_stream(msg)
+            self.assertEqual(await leader.__anext__(), WORDS[0])
+
+            follower = asyncio.ensure_future(collect(views._allm_stream(msg)))
+            await _await_until(lambda: views._aflight.followers(key) == 1)
+
+            await leader.aclose()
+            client.gate.set()
+            followed = await asyncio.wait_for(follower, 5)
+
+        self.assertEqual(followed, "".join(WORDS))
+        self.assertEqual(views._aflight.followers(key), 0)
+
+
+# ------------------------------------------------------------
+# Governor
+# ------------------------------------------------------------
+class GovernorTests(SimpleTestCase):
+    def test_full_queue_sheds(self):
+        gov = Governor({"LIMIT": 1, "MAX_QUEUE": 0})
+        with gov.slot():
+            with self.assertRaises(Overloaded) as cm:
+                with gov.slot():
+                    pass
+        self.assertEqual(cm.exception.reason, "queue_full")
+        self.assertEqual(gov.stats()["in_flight"], 0)
+
+    def test_returning_visitors_go_first(self):
+        gov, order = Governor({"LIMIT": 1}), []
+
+        def turn(priority, label):
+            with gov.slot(priority):
+                order.append(label)
+
+        with gov.slot():
+            new = threading.Thread(target=turn, args=(NEW, "new"))
+            new.start()
+            _wait_until(lambda: gov.stats()["queue_depth"] == 1)
+            returning = threading.Thread(target=turn, args=(RETURNING, "returning"))
+            returning.start()
+            _wait_until(lambda: gov.stats()["queue_depth"] == 2)
+        new.join(2)
+        returning.join(2)
+        self.assertEqual(order, ["returning", "new"])
+
+    async def test_waiter_cancelled_right_after_grant_passes_the_slot_on(self):
+        gov = AsyncGovernor({"LIMIT": 1})
+        entered = []
+
+        async def turn(label):
+            async with gov.slot():
+                entered.append(label)
+                await asyncio.sleep(0)
+
+        async with gov.slot():
+            cancelled = asyncio.ensure_future(turn("cancelled"))
+            await asyncio.sleep(0)
+            nxt = asyncio.ensure_future(turn("next"))
+            await asyncio.sleep(0)
+            self.assertEqual(gov.stats()["queue_depth"], 2)
+        # leaving the block granted the slot to `cancelled`, which hasn't run yet
+        cancelled.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+        await asyncio.wait_for(nxt, 2)
+
+        self.assertEqual(entered, ["next"])
+        self.assertEqual(gov.stats()["in_flight"], 0)
+        self.assertEqual(gov.stats()["queue_depth"], 0)
+
+
+# ------------------------------------------------------------
+# Rate-limit tickets on streaming responses
+# ------------------------------------------------------------
+class StreamTicketTests(SimpleTestCase):
+    def _request(self):
+        request = RequestFactory().post("/", REMOTE_ADDR=f"10.9.{uuid.uuid4().int % 250}.1")
+        request.session = SessionStore()
+        return request
+
+    def test_ticket_released_when_stream_closed_before_iteration(self):
+        @throttle()
+        def view(request):
+            return StreamingHttpResponse(iter(["never", "sent"]))
+
+        backend = get_rate_limiter().backend
+        before = backend.inflight("global")
+        resp = view(self._request())
+        self.assertEqual(backend.inflight("global"), before + 1)
+        resp.close()  # client gone before the first chunk
+        self.assertEqual(backend.inflight("global"), before)
+
+    async def test_async_ticket_released_when_stream_closed_before_iteration(self):
+        async def events():
+            yield "never"
+
+        @throttle()
+        async def view(request):
+            return StreamingHttpResponse(events())
+
+        backend = get_rate_limiter().backend
+        before = backend.inflight("global")
+        resp = await view(self._request())
+        self.assertEqual(backend.inflight("global"), before + 1)
+        resp.close()
+        self.assertEqual(backend.inflight("global"), before)
+
+
+# ------------------------------------------------------------
+# Circuit breaker
+# ------------------------------------------------------------
+class BreakerTests(SimpleTestCase):
+    def _tripped(self) -> CircuitBreaker:
+        breaker = CircuitBreaker({"FAILURE_THRESHOLD": 2, "COOLDOWN": 0})
+        breaker.record_failure(TimeoutError())
+        breaker.record_failure(TimeoutError())
+        self.assertEqual(breaker.state, OPEN)
+        return breaker
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = self._tripped()
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow())  # the probe is still out
+        breaker.record_success(0.1)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        breaker = self._tripped()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure(TimeoutError())
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_abandoned_probe_is_given_back(self):
+        breaker = self._tripped()
+
+        def stream():
+            with breaker.guard(timed=False):
+                yield "delta"
+
+        gen = stream()
+        next(gen)
+        gen.close()  # the caller went away mid-stream: no verdict on upstream
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
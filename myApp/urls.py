@@ -1,10 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI (CHAT_ASYNC on) the chat endpoints await the LLM instead of holding a thread.
+if getattr(settings, "CHAT_ASYNC", False):
+    chat_reply_view, chat_stream_view = views.chatbot_response_async, views.chatbot_stream_async
+else:
+    chat_reply_view, chat_stream_view = views.chatbot_response, views.chatbot_stream
+
 urlpatterns = [
     path("", views.index, name="home"),
     path("contact/submit/", views.contact_submit, name="contact_submit"),
     # single chat endpoint
-    path("chatbot-response/", views.chatbot_response, name="chatbot_response"),
+    path("chatbot-response/", chat_reply_view, name="chatbot_response"),
+    path("chatbot-response/stream/", chat_stream_view, name="chatbot_stream"),
+    path("chat-health/", views.chat_health, name="chat_health"),  # staff or CHAT_HEALTH_TOKEN only
     path("about/", views.about, name="about"),  # ✅ add this
 ]
@@ -1,15 +1,33 @@
 from __future__ import annotations
-import json, os, re, uuid, logging
+import asyncio, json, os, re, time, uuid, logging
+from contextlib import aclosing, closing, nullcontext
+from dataclasses import replace
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.http import JsonResponse, HttpResponseBadRequest
-from django.shortcuts import render, redirect
-from django.template.loader import render_to_string
+from django.db import transaction
+from django.http import Http404, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from django.views.decorators.http import require_POST
 
+from .content import FAQ, FAQ_PROMPT, HOME_CONTEXT, PROCESS, PROCESS_PROMPT, STEPS, TIERS, TIERS_PROMPT
 from .forms import ContactForm
+from .pagecache import render_cached
+from . import outbox
+from .emails import get_email
+from .replycache import get_reply_cache, fingerprint, make_key
+from .semcache import get_semantic_cache
+from .offline import OfflineEngine, build_intents
+from .conversations import Conversation, get_conversations
+from .prompts import PromptBuilder, count_tokens, tokenizer, usage
+from .singleflight import SingleFlight, AsyncSingleFlight
+from .breaker import CircuitOpen, all_breakers, get_breaker
+from .hedging import get_hedger
+from .router import AsyncLocalClient, LocalClient, Route, get_router
+from .ratelimit import get_rate_limiter, throttle
+from .governor import BUSY_REPLY, NEW, RETURNING, Overloaded, get_async_governor, get_governor, too_busy
 
 logger = logging.getLogger(__name__)
 
@@ -26,54 +44,63 @@ except Exception:
 # OpenAI client (lazy + robust; prefers settings over env)
 # ------------------------------------------------------------
 try:
-    from openai import OpenAI  # type: ignore
+    from openai import OpenAI, AsyncOpenAI  # type: ignore
 except Exception:  # library not installed
     OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
 
 # Use a sentinel so we never call isinstance(OpenAI is None)
 _SENTINEL = object()
 _client_cache: object | None = _SENTINEL  # _SENTINEL = not built yet
+_async_client_cache: object | None = _SENTINEL
 
 def _mask(s: str) -> str:
     return f"{s[:4]}…{s[-4:]}" if s and len(s) > 8 else ("(set)" if s else "(missing)")
 
-def _get_openai_client():
-    """
-    Returns a cached OpenAI client instance or None.
-    Never raises if SDK/key are missing; logs why.
-    """
-    global _client_cache
-
-    # If we've already tried to build it, return the cached result (client or None)
-    if _client_cache is not _SENTINEL:
-        return _client_cache  # may be None on previous failure
-
-    # Not built yet — try now
-    if OpenAI is None:
+def _build_client(cls, label: str):
+    """Builds an SDK client of `cls` or returns None (logging why)."""
+    if cls is None:
         logger.warning("OpenAI SDK not installed in this environment.")
-        _client_cache = None
         return None
 
     key = getattr(settings, "OPENAI_API_KEY", None) or os.getenv("OPENAI_API_KEY")
     if not key:
         logger.warning("OPENAI_API_KEY not found (settings and env both empty).")
-        _client_cache = None
         return None
 
+    base_url = getattr(settings, "OPENAI_BASE_URL", None) or os.getenv("OPENAI_BASE_URL") or None
     try:
-        client = OpenAI(api_key=key)
-        _client_cache = client
-        logger.info("OpenAI client initialized (key=%s).", _mask(key))
+        client = cls(api_key=key, base_url=base_url)
+        logger.info("%s client initialized (key=%s, base_url=%s).", label, _mask(key), base_url or "default")
         return client
     except Exception as e:
-        logger.exception("Failed to create OpenAI client: %s", e)
-        _client_cache = None
+        logger.exception("Failed to create %s client: %s", label, e)
         return None
 
+def _get_openai_client():
+    """
+    Returns a cached OpenAI client instance or None.
+    Never raises if SDK/key are missing; logs why.
+    """
+    global _client_cache
+
+    # If we've already tried to build it, return the cached result (client or None)
+    if _client_cache is _SENTINEL:
+        _client_cache = _build_client(OpenAI, "OpenAI")
+    return _client_cache  # may be None on previous failure
+
+def _get_async_openai_client():
+    """Same contract as `_get_openai_client`, for the AsyncOpenAI client used by the ASGI views."""
+    global _async_client_cache
+
+    if _async_client_cache is _SENTINEL:
+        _async_client_cache = _build_client(AsyncOpenAI, "AsyncOpenAI")
+    return _async_client_cache
+
 # ------------------------------------------------------------
-# System prompt
+# System prompt (tier, process and FAQ sections come from content.py, like the homepage)
 # ------------------------------------------------------------
-SYSTEM_PROMPT = """
+SYSTEM_PROMPT = f"""
 You are Liora — a warm, capable, general-purpose AI companion for Lioraè Co.
 Be kind, witty, concise, and actually useful. Match the user’s tone.
 Use plain language. If feelings show up, acknowledge briefly, then problem-solve.
@@ -93,50 +120,11 @@ About Lioraè Co. (facts you can use)
 - Channels & tools we’re fluent with: Instagram, TikTok, YouTube; Meta Ads, Google Ads; Figma/Notion; Shopify/Stripe; HubSpot; Klaviyo.
 - Tone/brand: clear, friendly, no fluff; strategy first, creative with soul.
 
-Service tiers (typical inclusions; scopes can be tailored)
-1) IGNITE — “Smart Social Foundations” (approx. PHP 75,000 / month)
-   - ~20 posts • 25 stories • 3 reels
-   - AI-assisted captions/hashtags
-   - Content calendar + auto-scheduling
-   - Basic landing/portfolio + hosting
-   - Monthly analytics report
-   - Best for startups
-
-2) SYNC — “Social + Web Alignment” (approx. PHP 95,000 / month)
-   - ~30 posts • 35 stories • 6 reels
-   - Campaign strategy & funnel planning
-   - Landing page optimization + CRM hookups
-   - AI trend suggestions + conversion copy
-   - Lead & engagement dashboard
-   - Lead-gen ready
-
-3) VISION — “AI-Enhanced Growth Engine” (approx. PHP 120,000 / month, min. 3-month plan)
-   - ~25 posts • 25 stories • 8 reels
-   - Predictive campaign builder
-   - Social listening & competitor analysis
-   - Bi-weekly analytics & retargeting
-   - Advanced dashboards & automation
-
-4) AUTHORITY — “Omnipresence + Automation” (approx. PHP 150,000 / month)
-   - Thought leadership + multi-channel presence
-   - Heavier automation + repurposing
-
-5) ASCEND — “Full Growth Ecosystem” (PHP 200,000+ / month)
-   - Enterprise-style scope, >50 posts across platforms, multi-funnel orchestration
-
-Process (how we work)
-1) Discover & Audit — kickoff, goals, audience, baseline.
-2) Strategy — messaging, pillars, campaign roadmap.
-3) Setup — stack, scheduler, CRM, pixels, analytics.
-4) Ship — weekly content (AI-assisted captions, best-time posting), light automations.
-5) Review & Scale — dashboards, learnings, iterate, retarget, expand winners.
-
-FAQs (quick answers)
-- Do I need a website? Not required. We can ship a starter landing page in-package.
-- How does AI help? Caption drafts, best-time posting, light automations, predictive prompts, time savings.
-- Social-only? Yes—start with foundations; upgrade to funnels/automation later.
-- When will results show? 1–2 months for engagement lift; 3–6 months for clearer ROI signals (depends on baseline, budget, and velocity).
-- Who owns what? You do. We manage and optimize on your behalf.
+{TIERS_PROMPT}
+
+{PROCESS_PROMPT}
+
+{FAQ_PROMPT}
 
 Working style
 - Keep answers crisp; use short lists, bold keywords sparingly, and avoid jargon.
@@ -166,126 +154,468 @@ Short self-description for context replies
 # ------------------------------------------------------------
 # Instant offline replies
 # ------------------------------------------------------------
-
+_offline = OfflineEngine(
+    build_intents(TIERS, FAQ, STEPS, PROCESS),
+    threshold=getattr(settings, "CHAT_OFFLINE_THRESHOLD", 0.6),
+)
+
+def _offline_reply(user_msg: str) -> str | None:
+    """Confident canned answer for tier/pricing/process/ownership/contact questions, else None."""
+    m = _offline.match(user_msg)
+    if m is None:
+        return None
+    logger.debug("Offline match %s (%.2f) for %r", m.intent, m.confidence, user_msg)
+    return m.answer if m.confidence >= _offline.threshold else None
 
 # ------------------------------------------------------------
 # LLM helper
 # ------------------------------------------------------------
-def _llm_reply(user_msg: str) -> str:
-    client = _get_openai_client()
-    if not client:
-        return ("Got it. I don’t have my full AI brain connected yet. "
-                "Share your main channel (IG/TikTok/LinkedIn), audience, and desired outcome, "
-                "and I’ll sketch a quick plan.")
+NO_CLIENT_REPLY = ("Got it. I don’t have my full AI brain connected yet. "
+                   "Share your main channel (IG/TikTok/LinkedIn), audience, and desired outcome, "
+                   "and I’ll sketch a quick plan.")
+EMPTY_REPLY = "I blanked for a sec—mind asking that one more time?"
+SNAG_REPLY = ("I hit a snag reaching my brain. "
+              "Want to try again, or tell me the short version and I’ll help?")
+
+CHAT_MODEL = "gpt-4o-mini"  # tokenizer and default; the router picks the model per message
+CHAT_TEMPERATURE = 0.7
+CHAT_MAX_TOKENS = 600
+
+# Split + tokenized once and frozen into a byte-identical prefix for provider prompt caching
+# (the whole prompt by default; see CHAT_PROMPT_MODE).
+_prompt = PromptBuilder(SYSTEM_PROMPT, CHAT_MODEL, getattr(settings, "CHAT_PROMPT_MODE", "all"))
+
+# Anything that changes what the model would say for the same message belongs in here.
+_REPLY_KEY_PREFIX = fingerprint(SYSTEM_PROMPT, CHAT_MODEL, CHAT_TEMPERATURE, CHAT_MAX_TOKENS,
+                                *(r.model for r in get_router().routes))
+
+def _reply_key(user_msg: str) -> str:
+    return make_key(user_msg, _REPLY_KEY_PREFIX)
 
+def _ready_reply(user_msg: str, history: Conversation) -> tuple[str | None, str | None]:
+    """
+    Answers that don't need the LLM: offline facts, then the exact and (opt-in) semantic caches.
+    Returns (reply or None, cache key). Follow-ups depend on earlier turns, so they get no key
+    and never read or write the shared caches.
+    """
+    offline = _offline_reply(user_msg)
+    if offline:
+        return offline, None
+    if history.turns:
+        return None, None
+    key = _reply_key(user_msg)
+    hit = get_reply_cache().get(key)
+    if hit is None:
+        hit = get_semantic_cache().lookup(user_msg)
+    return hit, key
+
+async def _aready_reply(user_msg: str, history: Conversation) -> tuple[str | None, str | None]:
+    offline = _offline_reply(user_msg)
+    if offline:
+        return offline, None
+    if history.turns:
+        return None, None
+    key = _reply_key(user_msg)
+    hit = await get_reply_cache().aget(key)
+    if hit is None:
+        hit = get_semantic_cache().lookup(user_msg)  # in-process, no I/O
+    return hit, key
+
+def _remember_reply(user_msg: str, key: str | None, reply: str) -> None:
+    if key:
+        get_reply_cache().set(key, reply)
+        get_semantic_cache().add(user_msg, reply)
+
+async def _aremember_reply(user_msg: str, key: str | None, reply: str) -> None:
+    if key:
+        await get_reply_cache().aset(key, reply)
+        get_semantic_cache().add(user_msg, reply)
+
+def _completion_kwargs(user_msg: str, history: Conversation | None = None, model: str = CHAT_MODEL) -> dict:
+    """Shared request shape for blocking and streaming completions."""
+    past = history.messages() if history else []
+    last_user = next((m["content"] for m in reversed(past) if m["role"] == "user"), "")
+    prompt = _prompt.build(user_msg, context=last_user)
+    history_tokens = sum(count_tokens(m["content"]) for m in past)
+    user_tokens = count_tokens(user_msg)
+    logger.info("Chat prompt tokens (%s): system=%d/%d [%s] history=%d user=%d total=%d",
+                tokenizer(), prompt.tokens, _prompt.full_tokens, ",".join(prompt.sections),
+                history_tokens, user_tokens, prompt.tokens + history_tokens + user_tokens)
+    return dict(
+        model=model,
+        temperature=CHAT_TEMPERATURE,
+        max_tokens=CHAT_MAX_TOKENS,
+        # static prefix first; everything that varies per request comes after it
+        messages=[
+            *prompt.head(),
+            *past,
+            *prompt.tail(),
+            {"role": "user",   "content": user_msg},
+        ],
+        timeout=get_breaker(model).timeout(),  # seconds; this model's rolling p99 × margin, capped at 30
+    )
+
+def _log_failure(what: str, e: Exception) -> None:
+    if isinstance(e, (CircuitOpen, Overloaded)):
+        logger.info("%s: %s, served fallback", what, e)
+    else:
+        logger.exception(what)
+
+def _error_reply(e: Exception) -> str:
+    if isinstance(e, Overloaded):
+        return BUSY_REPLY  # saturated: answer now instead of queueing behind it
+    if isinstance(e, CircuitOpen):
+        return NO_CLIENT_REPLY  # upstream is down
+    if getattr(settings, "DEBUG", False):
+        return f"(DEBUG) OpenAI error: {e}"
+    return SNAG_REPLY
+
+# Identical first-turn messages in flight at the same time share one upstream call.
+_flight = SingleFlight()
+_aflight = AsyncSingleFlight()
+FLIGHT_WAIT = 35  # seconds a follower waits on the leader (upstream timeout + slack)
+
+# The router (settings.CHAT_ROUTER) picks the model per message and falls back down its
+# chain on failure; "local" routes use a canned stand-in that needs no key or network.
+_local_client = LocalClient()
+_alocal_client = AsyncLocalClient()
+
+def _client_for(route: Route):
+    return _local_client if route.local else _get_openai_client()
+
+def _aclient_for(route: Route):
+    return _alocal_client if route.local else _get_async_openai_client()
+
+def _guard(route: Route, timed: bool = True):
+    # OpenAI calls go through the circuit breaker: fail fast while it's down, and feed its
+    # latency window so the timeout tracks how slow the API actually is
+    return nullcontext() if route.local else get_breaker(route.model).guard(timed)
+
+def _complete(client, user_msg: str, history: Conversation, route: Route) -> str:
+    with _guard(route):
+        completion = client.chat.completions.create(**_completion_kwargs(user_msg, history, route.model))
+    usage.record(completion.usage)
+    return (completion.choices[0].message.content or "").strip()
+
+async def _acomplete(client, user_msg: str, history: Conversation, route: Route) -> str:
+    with _guard(route):
+        completion = await client.chat.completions.create(**_completion_kwargs(user_msg, history, route.model))
+    usage.record(completion.usage)
+    return (completion.choices[0].message.content or "").strip()
+
+def _record_first_delta(route: Route, started: float) -> None:
+    # a stream's total time depends on the answer's length; its time to first delta is what
+    # the timeout (per read) has to cover, so that's what streams feed the latency window
+    if not route.local:
+        get_breaker(route.model).record_latency(time.monotonic() - started)
+
+def _stream_deltas(client, user_msg: str, history: Conversation, route: Route):
+    with _guard(route, timed=False):
+        started, first = time.monotonic(), True
+        stream = client.chat.completions.create(stream=True, stream_options={"include_usage": True},
+                                                **_completion_kwargs(user_msg, history, route.model))
+        for chunk in stream:
+            if not chunk.choices:
+                usage.record(getattr(chunk, "usage", None))  # final chunk carries usage only
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if delta:
+                if first:
+                    _record_first_delta(route, started)
+                    first = False
+                yield delta
+
+async def _astream_deltas(client, user_msg: str, history: Conversation, route: Route):
+    with _guard(route, timed=False):
+        started, first = time.monotonic(), True
+        stream = await client.chat.completions.create(stream=True, stream_options={"include_usage": True},
+                                                      **_completion_kwargs(user_msg, history, route.model))
+        async for chunk in stream:
+            if not chunk.choices:
+                usage.record(getattr(chunk, "usage", None))
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if delta:
+                if first:
+                    _record_first_delta(route, started)
+                    first = False
+                yield delta
+
+# Optional hedging (settings.CHAT_HEDGE): a slow call gets a second one after ~p90 and the
+# first answer wins. The second call needs a free governor slot of its own. Blocking replies
+# only; a stream already shows progress.
+def _attempt(client, user_msg: str, history: Conversation, route: Route) -> str:
+    hedger = get_hedger()
+    if not hedger.enabled or route.local:
+        return _complete(client, user_msg, history, route)
+    backup = replace(route, model=hedger.model) if hedger.model else route
+    return hedger.run(lambda: _complete(client, user_msg, history, route),
+                      lambda: _complete(client, user_msg, history, backup), model=route.model,
+                      governor=get_governor())
+
+async def _aattempt(client, user_msg: str, history: Conversation, route: Route) -> str:
+    hedger = get_hedger()
+    if not hedger.enabled or route.local:
+        return await _acomplete(client, user_msg, history, route)
+    backup = replace(route, model=hedger.model) if hedger.model else route
+    return await hedger.arun(lambda: _acomplete(client, user_msg, history, route),
+                             lambda: _acomplete(client, user_msg, history, backup), model=route.model,
+                             governor=get_async_governor())
+
+# Upstream calls wait for a governor slot (settings.CHAT_GOVERNOR). Visitors mid-conversation
+# go first; a full queue sheds straight to the fallback reply.
+def _priority(history: Conversation) -> int:
+    return RETURNING if history.turns else NEW
+
+def _governed(history: Conversation, fn, *args):
+    with get_governor().slot(_priority(history)):
+        return fn(*args)
+
+async def _agoverned(history: Conversation, fn, *args):
+    async with get_async_governor().slot(_priority(history)):
+        return await fn(*args)
+
+def _llm_reply(user_msg: str, cid: str | None = None) -> str:
+    """
+    One chat turn. With a `cid`, earlier turns are sent along and this one is remembered.
+    Raises Overloaded when the governor sheds the turn.
+    """
+    memory = get_conversations()
+    history = memory.window(cid)
+    reply, key = _ready_reply(user_msg, history)
+
+    if reply is None:
+        router = get_router()
+        decision = router.plan(user_msg, len(history.turns), available=lambda r: _client_for(r) is not None)
+        if not decision.chain:
+            return NO_CLIENT_REPLY
+        try:
+            attempt = lambda route: _attempt(_client_for(route), user_msg, history, route)
+            call = lambda: _governed(history, router.run, decision, attempt)
+            reply = _flight.do(key, call, timeout=FLIGHT_WAIT) if key else call()
+        except Overloaded as e:
+            _log_failure("OpenAI call shed", e)
+            raise  # the view answers 503 + Retry-After
+        except Exception as e:
+            _log_failure("OpenAI call failed", e)
+            return _error_reply(e)
+        if not reply:
+            return EMPTY_REPLY
+        _remember_reply(user_msg, key, reply)
+
+    memory.append(cid, user_msg, reply)
+    return reply
+
+def _llm_stream(user_msg: str, cid: str | None = None):
+    """
+    Yields reply text in pieces as the model produces them.
+    Falls back to a single canned piece when the client is missing or every route fails
+    before anything was sent. A follower of an identical in-flight stream gets the
+    leader's full reply as one piece.
+    """
+    memory = get_conversations()
+    history = memory.window(cid)
+    reply, key = _ready_reply(user_msg, history)
+    if reply is not None:
+        memory.append(cid, user_msg, reply)
+        yield reply
+        return
+
+    router = get_router()
+    decision = router.plan(user_msg, len(history.turns), available=lambda r: _client_for(r) is not None)
+    if not decision.chain:
+        yield NO_CLIENT_REPLY
+        return
+
+    leader, call = _flight.claim(key) if key else (True, None)
+    if not leader:
+        try:
+            reply = call.wait(FLIGHT_WAIT)
+        except Exception as e:
+            yield _error_reply(e)
+            return
+        if reply:
+            memory.append(cid, user_msg, reply)
+        yield reply or EMPTY_REPLY
+        return
+
+    parts: list[str] = []
+    error: BaseException | None = RuntimeError("stream closed early")  # until proven otherwise
+    gone = False  # this client disconnected; still reading for coalesced followers
+    try:
+        with get_governor().slot(_priority(history)):
+            for route in decision.chain:
+                started = time.monotonic()
+                try:
+                    with closing(_stream_deltas(_client_for(route), user_msg, history, route)) as deltas:
+                        for delta in deltas:
+                            parts.append(delta)
+                            if gone:
+                                continue
+                            try:
+                                yield delta
+                            except GeneratorExit:
+                                if call is None or not call.followers:
+                                    raise
+                                gone = True  # no more yields: finish the answer for the followers
+                except Exception as e:
+                    router.record(decision, route, time.monotonic() - started, e)
+                    if parts or route is decision.chain[-1]:
+                        raise  # can't switch models halfway through an answer
+                    continue
+                router.record(decision, route, time.monotonic() - started)
+                break
+        error = None
+    except Exception as e:
+        error = e
+        _log_failure("OpenAI stream failed", e)
+        if not gone:
+            yield ("\n\n" if parts else "") + _error_reply(e)
+        return
+    finally:
+        router.close(decision)
+        if call is not None:
+            _flight.finish(key, call, "".join(parts).strip(), error)
+
+    reply = "".join(parts).strip()
+    if not reply:
+        if not gone:
+            yield EMPTY_REPLY
+        return
+    _remember_reply(user_msg, key, reply)
+    memory.append(cid, user_msg, reply)
+
+async def _allm_reply(user_msg: str, cid: str | None = None) -> str:
+    """Async twin of `_llm_reply`: awaits the upstream call instead of holding a worker thread."""
+    memory = get_conversations()
+    history = await memory.awindow(cid)
+    reply, key = await _aready_reply(user_msg, history)
+
+    if reply is None:
+        router = get_router()
+        decision = router.plan(user_msg, len(history.turns), available=lambda r: _aclient_for(r) is not None)
+        if not decision.chain:
+            return NO_CLIENT_REPLY
+        try:
+            attempt = lambda route: _aattempt(_aclient_for(route), user_msg, history, route)
+            call = lambda: _agoverned(history, router.arun, decision, attempt)
+            reply = await (_aflight.do(key, call, timeout=FLIGHT_WAIT) if key else call())
+        except Overloaded as e:
+            _log_failure("OpenAI call shed", e)
+            raise
+        except Exception as e:
+            _log_failure("OpenAI call failed", e)
+            return _error_reply(e)
+        if not reply:
+            return EMPTY_REPLY
+        await _aremember_reply(user_msg, key, reply)
+
+    await memory.aappend(cid, user_msg, reply)
+    return reply
+
+def _retrieve(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()  # the stream reports it; an orphaned pump's error needs no warning
+
+async def _apump_stream(user_msg: str, history: Conversation, router, decision, key, fut, parts: list[str],
+                        queue: asyncio.Queue) -> None:
+    """Leader side of `_allm_stream`: route chain → `parts` and `queue` (None when done)."""
+    error: BaseException | None = RuntimeError("stream closed early")
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.7,
-            max_tokens=600,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user",   "content": user_msg},
-            ],
-            timeout=30,  # seconds
-        )
-        reply = (completion.choices[0].message.content or "").strip()
-        return reply or "I blanked for a sec—mind asking that one more time?"
+        async with get_async_governor().slot(_priority(history)):
+            for route in decision.chain:
+                started = time.monotonic()
+                try:
+                    async with aclosing(_astream_deltas(_aclient_for(route), user_msg, history, route)) as deltas:
+                        async for delta in deltas:
+                            parts.append(delta)
+                            queue.put_nowait(delta)
+                except Exception as e:
+                    router.record(decision, route, time.monotonic() - started, e)
+                    if parts or route is decision.chain[-1]:
+                        raise
+                    continue
+                router.record(decision, route, time.monotonic() - started)
+                break
+        error = None
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        router.close(decision)
+        if fut is not None:
+            _aflight.finish(key, fut, "".join(parts).strip(), error)
+        queue.put_nowait(None)
+
+async def _allm_stream(user_msg: str, cid: str | None = None):
+    """Async twin of `_llm_stream`."""
+    memory = get_conversations()
+    history = await memory.awindow(cid)
+    reply, key = await _aready_reply(user_msg, history)
+    if reply is not None:
+        await memory.aappend(cid, user_msg, reply)
+        yield reply
+        return
+
+    router = get_router()
+    decision = router.plan(user_msg, len(history.turns), available=lambda r: _aclient_for(r) is not None)
+    if not decision.chain:
+        yield NO_CLIENT_REPLY
+        return
+
+    leader, fut = _aflight.claim(key) if key else (True, None)
+    if not leader:
+        try:
+            reply = await asyncio.wait_for(asyncio.shield(fut), FLIGHT_WAIT)
+        except Exception as e:
+            yield _error_reply(e)
+            return
+        if reply:
+            await memory.aappend(cid, user_msg, reply)
+        yield reply or EMPTY_REPLY
+        return
+
+    parts: list[str] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    # the upstream is read in its own task, which outlives this generator when the client
+    # disconnects (Django cancels it) while coalesced followers still wait for the answer
+    pump = asyncio.ensure_future(_apump_stream(user_msg, history, router, decision, key, fut, parts, queue))
+    pump.add_done_callback(_retrieve)
+    try:
+        while (delta := await queue.get()) is not None:
+            yield delta
+        await pump
     except Exception as e:
-        logger.exception("OpenAI call failed")
-        if getattr(settings, "DEBUG", False):
-            return f"(DEBUG) OpenAI error: {e}"
-        return ("I hit a snag reaching my brain. "
-                "Want to try again, or tell me the short version and I’ll help?")
+        _log_failure("OpenAI stream failed", e)
+        yield ("\n\n" if parts else "") + _error_reply(e)
+        return
+    finally:
+        if not pump.done() and not (fut is not None and _aflight.followers(key)):
+            pump.cancel()
+
+    reply = "".join(parts).strip()
+    if not reply:
+        yield EMPTY_REPLY
+        return
+    await _aremember_reply(user_msg, key, reply)
+    await memory.aappend(cid, user_msg, reply)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 # ------------------------------------------------------------
-# Home (sets CSRF for chat)
+# Home (sets CSRF for chat; served from the page cache)
 # ------------------------------------------------------------
 @ensure_csrf_cookie
 def index(request):
-    images = [
-        "https://images.unsplash.com/photo-1521737604893-d14cc237f11d?auto=format&fit=crop&w=1600&q=80",
-        "https://images.unsplash.com/photo-1522252234503-e356532cafd5?auto=format&fit=crop&w=1600&q=80",
-        "https://images.unsplash.com/photo-1529101091764-c3526daf38fe?auto=format&fit=crop&w=1600&q=80",
-        "https://images.unsplash.com/photo-1518770660439-4636190af475?auto=format&fit=crop&w=1600&q=80",
-        "https://images.unsplash.com/photo-1556761175-4b46a572b786?auto=format&fit=crop&w=1600&q=80",
-        "https://images.unsplash.com/photo-1519389950473-47ba0277781c?auto=format&fit=crop&w=1600&q=80",
-        "https://images.unsplash.com/photo-1542744173-05336fcc7ad4?auto=format&fit=crop&w=1600&q=80",
-        "https://images.unsplash.com/photo-1498050108023-c5249f4df085?auto=format&fit=crop&w=1600&q=80",
-        "https://images.unsplash.com/photo-1529101091764-c3526daf38fe?auto=format&fit=crop&w=1600&q=80",
-    ]
-    steps = ["Discovery", "Strategy", "Tech Integration", "AI Empowerment", "Growth & Optimization"]
-    faq = [
-        ("Do I need a website to start?", "Not necessarily. We can ship a starter landing page so your brand has a clean digital home."),
-        ("How does AI help a small team?", "From on-brand captioning to best-time posting and chatbot lead capture, AI saves hours and lifts consistency."),
-        ("How long before I see results?", "Engagement typically uplifts within 1–2 months; conversions/ROI often clarify within 3–6 months with consistent campaigns."),
-        ("Can I start with social only?", "Yes. Begin with IGNITE and upgrade to funnels/automation as you grow."),
-    ]
-    stats = [
-        {"label": "Total Users",  "value": "50,789", "delta": "8.5% from yesterday",  "trend": "up"},
-        {"label": "Total Orders", "value": "20,393", "delta": "1.3% from last week",  "trend": "up"},
-        {"label": "Total Sales",  "value": "$60,000","delta": "4.3% from yesterday",  "trend": "down"},
-        {"label": "Total Pending","value": "5,040",  "delta": "1.8% from yesterday",  "trend": "up"},
-    ]
-    tiers = [
-        {"name":"IGNITE","price":"PHP 75,000 / month","tag":"Smart Social Foundations","badge":"Best for startups",
-         "bullets":["20 posts • 25 stories • 3 reels","AI-assisted captions & hashtags","Content calendar + auto-scheduling",
-                    "Basic landing/portfolio + hosting","Monthly analytics report"]},
-        {"name":"SYNC","price":"PHP 95,000 / month","tag":"Social + Web Alignment","badge":"Lead-gen ready",
-         "bullets":["30 posts • 35 stories • 6 reels","Campaign strategy & funnel planning","Landing page optimization + CRM",
-                    "AI trend suggestions • conversion copy","Lead & engagement dashboard"]},
-        {"name":"VISION","price":"PHP 120,000 / month","tag":"AI-Enhanced Growth Engine","badge":"Min. 3-month plan",
-         "bullets":["25 posts • 25 stories • 8 reels","Predictive campaign builder","Social listening & competitor analysis",
-                    "Bi-weekly analytics & retargeting","Advanced dashboards & automation"]},
-        {"name":"AUTHORITY","price":"PHP 150,000 / month","tag":"Omnipresence + Automation","badge":"Thought leadership",
-         "bullets":["40 posts • 40 stories • 10 reels","Omnichannel (IG/TikTok/FB/LinkedIn)","Sentiment heatmap & campaign intelligence",
-                    "Dynamic website + CRM automation"]},
-        {"name":"ASCEND","price":"PHP 200,000+ / month","tag":"Full Growth Ecosystem","badge":"Enterprise",
-         "bullets":["50+ posts across platforms","Full funnel strategy & ad support","Weekly trend & business intelligence",
-                    "Enterprise automation & personalization"],"wide":True},
-    ]
-    testimonials = [
-        {"quote":"From scattered posts to a real funnel—we saw lift in 6 weeks.","author":"Amira","role":"COO"},
-        {"quote":"Clean, premium, and measurable. Exactly what we needed.","author":"Rami","role":"CMO"},
-        {"quote":"Finally feels like our brand—and it converts.","author":"Leah","role":"Founder"},
-        {"quote":"Strategy-first content. The dashboards made ROI obvious.","author":"Noah","role":"Head of Growth"},
-    ]
-    compare_rows = [
-        {"feature":"Posts / Stories / Reels","IGNITE":"20 / 25 / 3","SYNC":"30 / 35 / 6","VISION":"25 / 25 / 8","AUTHORITY":"40 / 40 / 10","ASCEND":"50+ / 50+ / 10+"},
-        {"feature":"AI-assisted captions & hashtags","IGNITE":"✓","SYNC":"✓","VISION":"✓","AUTHORITY":"✓","ASCEND":"✓"},
-        {"feature":"Content calendar & auto-scheduling","IGNITE":"✓","SYNC":"✓","VISION":"✓","AUTHORITY":"✓","ASCEND":"✓"},
-        {"feature":"Campaign strategy & funnel planning","IGNITE":"—","SYNC":"✓","VISION":"✓","AUTHORITY":"✓","ASCEND":"✓"},
-        {"feature":"Landing page / Website + CRM","IGNITE":"Basic site + hosting","SYNC":"Landing + CRM","VISION":"Optimization + CRM",
-         "AUTHORITY":"Dynamic site + CRM automation","ASCEND":"Enterprise personalization"},
-        {"feature":"Analytics cadence","IGNITE":"Monthly","SYNC":"Leads dashboard","VISION":"Bi-weekly + retargeting","AUTHORITY":"Advanced dashboards","ASCEND":"Weekly BI"},
-        {"feature":"Social listening & competitor analysis","IGNITE":"—","SYNC":"—","VISION":"✓","AUTHORITY":"✓","ASCEND":"✓"},
-        {"feature":"Ad support","IGNITE":"—","SYNC":"—","VISION":"—","AUTHORITY":"—","ASCEND":"✓"},
-    ]
-    logos = [
-        {"src":"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text=Stripe","alt":"Stripe"},
-        {"src":"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text=Shopify","alt":"Shopify"},
-        {"src":"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text=HubSpot","alt":"HubSpot"},
-        {"src":"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text=Notion","alt":"Notion"},
-        {"src":"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text=Figma","alt":"Figma"},
-        {"src":"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text=Klaviyo","alt":"Klaviyo"},
-        {"src":"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text=Meta+Ads","alt":"Meta Ads"},
-        {"src":"https://dummyimage.com/140x40/ffffff/0b0f1a.png&text=Google+Ads","alt":"Google Ads"},
-    ]
-    service_labels = ["Content","Reels","Community","Paid Social","Landing Page","CRM & Automation","Analytics"]
-
-    return render(request, "home.html", {
-        "images": images, "steps": steps, "faq": faq, "stats": stats,
-        "tiers": tiers, "testimonials": testimonials, "compare_rows": compare_rows,
-        "logos": logos, "service_labels": service_labels,
-        "og_image_url": "https://images.unsplash.com/photo-1556761175-4b46a572b786?auto=format&fit=crop&w=1600&q=80",
-        "logo_url": "https://dummyimage.com/200x200/0b0f1a/ffffff.png&text=L", "ig_handle": "liorae",
-    })
+    return render_cached(request, "home.html", lambda: dict(HOME_CONTEXT))
 
 # ------------------------------------------------------------
 # Chat endpoints
 # ------------------------------------------------------------
 @csrf_exempt
 @require_POST
+@throttle()
 def chatbot_response(request):
     try:
         data = json.loads(request.body.decode("utf-8"))
@@ -297,18 +627,61 @@ def chatbot_response(request):
         return JsonResponse({"reply": "What’s on your mind?"})
 
     # LLM reply (or graceful fallback)
-    return JsonResponse({"reply": _llm_reply(user_msg)})
+    try:
+        return JsonResponse({"reply": _llm_reply(user_msg, _chat_cid(request))})
+    except Overloaded as e:
+        return too_busy(e)
 
-# Back-compat with earlier widget
 @csrf_exempt
 @require_POST
-def chat_start(request):
+@throttle()
+def chatbot_stream(request):
+    """
+    Server-sent events flavour of `chatbot_response`:
+    `delta` events carry text pieces ({"t": ...}), a final `done` closes the turn.
+    """
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return HttpResponseBadRequest("Invalid JSON")
+
+    user_msg = (data.get("message") or "").strip()
+    cid = _chat_cid(request)  # before streaming starts, so the session cookie goes out with the headers
+
+    def events():
+        if not user_msg:
+            yield _sse("delta", {"t": "What’s on your mind?"})
+        else:
+            for piece in _llm_stream(user_msg, cid):
+                yield _sse("delta", {"t": piece})
+        yield _sse("done", {})
+
+    resp = StreamingHttpResponse(events(), content_type="text/event-stream; charset=utf-8")
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"  # keep nginx/railway proxies from buffering the stream
+    return resp
+
+def _chat_cid(request) -> str:
+    """Conversation id for this visitor (minted on first use; keys server-side chat memory)."""
     cid = request.session.get("chat_cid") or str(uuid.uuid4())
     request.session["chat_cid"] = cid
-    return JsonResponse({"conversation_id": cid})
+    return cid
+
+async def _achat_cid(request) -> str:
+    cid = await request.session.aget("chat_cid") or str(uuid.uuid4())
+    await request.session.aset("chat_cid", cid)
+    return cid
 
+# Back-compat with earlier widget
 @csrf_exempt
 @require_POST
+@throttle(inflight=False)
+def chat_start(request):
+    return JsonResponse({"conversation_id": _chat_cid(request)})
+
+@csrf_exempt
+@require_POST
+@throttle()
 def chat_send(request):
     try:
         data = json.loads(request.body.decode("utf-8"))
@@ -316,12 +689,85 @@ def chat_send(request):
         return HttpResponseBadRequest("Invalid JSON")
     msg = (data.get("message") or "").strip()
    
-    return JsonResponse({"reply": _llm_reply(msg)})
+    try:
+        return JsonResponse({"reply": _llm_reply(msg, _chat_cid(request))})
+    except Overloaded as e:
+        return too_busy(e)
+
+# ------------------------------------------------------------
+# Async chat endpoints (routed instead of the sync ones when CHAT_ASYNC is on,
+# which myproject/asgi.py enables by default)
+# ------------------------------------------------------------
+def _parse_message(request) -> str | None:
+    """Returns the stripped `message` from a JSON body, or None if the body isn't JSON."""
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return None
+    return (data.get("message") or "").strip()
+
+@csrf_exempt
+@require_POST
+@throttle()
+async def chatbot_response_async(request):
+    user_msg = _parse_message(request)
+    if user_msg is None:
+        return HttpResponseBadRequest("Invalid JSON")
+    if not user_msg:
+        return JsonResponse({"reply": "What’s on your mind?"})
+    try:
+        return JsonResponse({"reply": await _allm_reply(user_msg, await _achat_cid(request))})
+    except Overloaded as e:
+        return too_busy(e)
+
+@csrf_exempt
+@require_POST
+@throttle()
+async def chatbot_stream_async(request):
+    user_msg = _parse_message(request)
+    if user_msg is None:
+        return HttpResponseBadRequest("Invalid JSON")
+    cid = await _achat_cid(request)
+
+    async def events():
+        if not user_msg:
+            yield _sse("delta", {"t": "What’s on your mind?"})
+        else:
+            async for piece in _allm_stream(user_msg, cid):
+                yield _sse("delta", {"t": piece})
+        yield _sse("done", {})
+
+    resp = StreamingHttpResponse(events(), content_type="text/event-stream; charset=utf-8")
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"
+    return resp
+
+@csrf_exempt
+@require_POST
+@throttle()
+async def chat_send_async(request):
+    msg = _parse_message(request)
+    if msg is None:
+        return HttpResponseBadRequest("Invalid JSON")
+    try:
+        return JsonResponse({"reply": await _allm_reply(msg, await _achat_cid(request))})
+    except Overloaded as e:
+        return too_busy(e)
 
 # ------------------------------------------------------------
-# Tiny health probe (no secrets)
+# Tiny health probe (no secrets): staff, or `Authorization: Bearer $CHAT_HEALTH_TOKEN`
 # ------------------------------------------------------------
+def _health_allowed(request) -> bool:
+    token = getattr(settings, "CHAT_HEALTH_TOKEN", "")
+    if token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+@never_cache
 def chat_health(request):
+    if not _health_allowed(request):
+        raise Http404  # don't advertise the probe
     key_settings = getattr(settings, "OPENAI_API_KEY", None)
     key_env = os.getenv("OPENAI_API_KEY")
     client_ok = bool(_get_openai_client())
@@ -331,6 +777,16 @@ def chat_health(request):
         "has_key_in_env": bool(key_env),
         "key_seen": _mask(key_settings or key_env or ""),
         "client_initialized": client_ok,
+        "base_url": getattr(settings, "OPENAI_BASE_URL", None) or os.getenv("OPENAI_BASE_URL") or "default",
+        "reply_cache": get_reply_cache().stats(),
+        "semantic_cache": get_semantic_cache().stats(),
+        "prompt": _prompt.report(),
+        "single_flight": {"threads": _flight.stats(), "asyncio": _aflight.stats()},
+        "breaker": {model: b.stats() for model, b in all_breakers().items()},
+        "hedging": get_hedger().stats(),
+        "router": get_router().stats(),
+        "rate_limit": get_rate_limiter().stats(),
+        "governor": {"threads": get_governor().stats(), "asyncio": get_async_governor().stats()},
         "debug": bool(getattr(settings, "DEBUG", False)),
     })
 
@@ -348,28 +804,22 @@ def contact_submit(request):
     cd = form.cleaned_data
 
     # Auto-reply to client
-    subject_client = "We got your inquiry — Lioraè Co."
-    html_client = render_to_string("emails/contact_email_client.html", {"d": cd})
-    text_client = render_to_string("emails/contact_email_client.txt", {"d": cd})
-    msg_client = EmailMultiAlternatives(
-        subject_client, text_client, settings.DEFAULT_FROM_EMAIL, [cd["email"]]
-    )
-    msg_client.attach_alternative(html_client, "text/html")
-    msg_client.send(fail_silently=False)
+    msg_client = get_email("contact_email_client").message(
+        "We got your inquiry — Lioraè Co.", [cd["email"]], {"d": cd})
 
     # Team notification
-    subject_team = f"[New Inquiry] {cd['full_name']} — {cd.get('company','').strip() or 'No company'}"
-    html_team = render_to_string("emails/contact_email_team.html", {"d": cd})
-    text_team = render_to_string("emails/contact_email_team.txt", {"d": cd})
-    msg_team = EmailMultiAlternatives(
-        subject_team, text_team, settings.DEFAULT_FROM_EMAIL,
-        [getattr(settings, "CONTACT_RECIPIENT", "hello@liorae.co")],
+    msg_team = get_email("contact_email_team").message(
+        f"[New Inquiry] {cd['full_name']} — {cd.get('company','').strip() or 'No company'}",
+        [getattr(settings, "CONTACT_RECIPIENT", "hello@liorae.co")], {"d": cd},
         reply_to=[cd["email"]],
     )
-    msg_team.attach_alternative(html_team, "text/html")
-    msg_team.send(fail_silently=False)
+
+    # Queued, not sent: `manage.py send_outbox` delivers (with retries) off the request path
+    with transaction.atomic():
+        outbox.enqueue(msg_client, kind="contact_client")
+        outbox.enqueue(msg_team, kind="contact_team")
 
     return redirect("/#contact?ok=1")
 
 def about(request):
-    return render(request, "about.html")
\ No newline at end of file
+    return render_cached(request, "about.html")
\ No newline at end of file
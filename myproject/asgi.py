@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
+# Serve the async chat views by default under ASGI (set CHAT_ASYNC=0 to opt out).
+os.environ.setdefault('CHAT_ASYNC', '1')
 
 application = get_asgi_application()
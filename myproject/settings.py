@@ -102,7 +102,11 @@ STATICFILES_DIRS = [
 ]
 
 # Whitenoise: compressed + hashed filenames for long-term caching
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# (STORAGES; Django 5.1 no longer reads STATICFILES_STORAGE)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+}
 
 # Media (user uploads) — only if/when you add file uploads
 MEDIA_URL = "/media/"
@@ -122,8 +126,182 @@ else:
     EMAIL_USE_TLS = True
     EMAIL_HOST_USER = "no-reply@liorae.co"
     EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+    EMAIL_TIMEOUT = 20  # the worker keeps its session open; never block forever on a dead socket
     DEFAULT_FROM_EMAIL = "Lioraè Co. <no-reply@liorae.co>"
     CONTACT_RECIPIENT = "hello@liorae.co"
 
+# Contact emails are queued in the DB (myApp.OutboxEmail) and delivered by a worker process,
+# which the deploy's start command runs (nixpacks.toml):
+#   python manage.py send_outbox
+# Failed sends retry with exponential backoff (BACKOFF s doubling, up to MAX_BACKOFF) and are
+# dead-lettered after MAX_ATTEMPTS; see the admin or `send_outbox --requeue-dead`.
+EMAIL_OUTBOX = {
+    "MAX_ATTEMPTS": 6,
+    "BACKOFF": 30,
+    "MAX_BACKOFF": 60 * 60,
+    "LEASE": 5 * 60,
+    "BATCH": 20,
+}
+
+# The worker keeps one SMTP session open (myApp/mailer.py). It is checked with NOOP after
+# IDLE_TIMEOUT s unused and recycled after MAX_MESSAGES sends or MAX_AGE s.
+EMAIL_POOL = {
+    "IDLE_TIMEOUT": 60,
+    "MAX_AGE": 15 * 60,
+    "MAX_MESSAGES": 100,
+}
+
+# Email templates (myApp/emails.py) are compiled once per process and kept. Not tied to DEBUG
+# (it's on in production); EMAIL_TEMPLATE_CACHE=0 reloads them per message while editing.
+EMAIL_TEMPLATES = {
+    "CACHE": os.getenv("EMAIL_TEMPLATE_CACHE", "1") == "1",
+}
+
+# Rendered home/about pages (myApp/pagecache.py), with the CSRF token swapped in per request.
+# VERSION changes per deploy; `manage.py bump_page_version` invalidates without one.
+# On by default, not keyed to DEBUG (production runs with DEBUG on); PAGE_CACHE=0 for template work.
+PAGE_CACHE = {
+    "ENABLED": os.getenv("PAGE_CACHE", "1") == "1",
+    "BACKEND": os.getenv("PAGE_CACHE_BACKEND", "local"),
+    "ALIAS": "default",
+    "VERSION": os.getenv("RAILWAY_GIT_COMMIT_SHA", "1")[:12],
+}
+
+# AVIF/WebP width variants of myApp/static/img (`manage.py build_images`, before collectstatic),
+# rendered with {% responsive_img %}. `manage.py import_images` self-hosts the stock images
+# first; originals are cached in IMPORT_CACHE so re-imports don't need the network.
+RESPONSIVE_IMAGES = {
+    "WIDTHS": (160, 320, 480, 768, 1080, 1600),
+    "FORMATS": ("avif", "webp"),
+    "IMPORT_CACHE": os.getenv("IMAGE_IMPORT_CACHE", str(BASE_DIR / "myApp" / "assets" / "vendor" / "img")),
+    "IMPORT_MAX_WIDTH": 1600,
+}
+
+# Above-the-fold CSS inlined into home/about by `manage.py build_assets` (myApp/critical.py).
+# The build, and `build_assets --check` in CI, fail if a page inlines more than BUDGET bytes.
+CRITICAL_CSS = {
+    "BUDGET": int(os.getenv("CRITICAL_CSS_BUDGET", 20 * 1024)),
+}
+
 # -------------------- API Keys / Env --------------------
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# Alternative OpenAI-compatible endpoint, e.g. the local stub (`manage.py openai_stub`):
+# OPENAI_BASE_URL=http://127.0.0.1:8766/v1. Empty = api.openai.com.
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+
+# -------------------- Chat --------------------
+# /chat-health/ reports the chat stack's live stats (caches, breakers, router, limiter, governor).
+# Open to logged-in staff, or to `Authorization: Bearer <CHAT_HEALTH_TOKEN>` for monitors; 404 otherwise.
+CHAT_HEALTH_TOKEN = os.getenv("CHAT_HEALTH_TOKEN", "")
+
+# Route the async chat views (AsyncOpenAI). myproject/asgi.py turns this on by default.
+CHAT_ASYNC = os.getenv("CHAT_ASYNC", "0") == "1"
+
+# Exact-match reply cache in front of the LLM. BACKEND "local" = per-process LRU,
+# "django" = shared CACHES[ALIAS] (all workers see the same entries). TTL 0 disables.
+CHAT_REPLY_CACHE = {
+    "BACKEND": os.getenv("CHAT_REPLY_CACHE_BACKEND", "local"),
+    "TTL": int(os.getenv("CHAT_REPLY_CACHE_TTL", "3600")),
+    "MAX_ENTRIES": int(os.getenv("CHAT_REPLY_CACHE_MAX", "512")),
+    "ALIAS": "default",
+}
+
+# Near-duplicate (paraphrase) cache; needs numpy. Raise THRESHOLD if answers look off-topic,
+# lower it if chat_health shows a best_miss_similarity just under it for obvious paraphrases.
+CHAT_SEMANTIC_CACHE = {
+    "ENABLED": os.getenv("CHAT_SEMANTIC_CACHE", "0") == "1",
+    "THRESHOLD": float(os.getenv("CHAT_SEMANTIC_THRESHOLD", "0.82")),
+    "MAX_ENTRIES": 1000,
+    "DIM": 1024,
+    "TTL": 60 * 60,
+}
+
+# Minimum confidence (0–1) for answering from the built-in FAQ/tier facts without calling the LLM.
+CHAT_OFFLINE_THRESHOLD = float(os.getenv("CHAT_OFFLINE_THRESHOLD", "0.6"))
+
+# Server-side conversation memory keyed by the session's chat_cid. Older turns beyond
+# MAX_TOKENS are folded into a short summary; idle conversations expire after TTL.
+CHAT_MEMORY = {
+    "BACKEND": os.getenv("CHAT_MEMORY_BACKEND", "local"),
+    "ALIAS": "default",
+    "MAX_TOKENS": int(os.getenv("CHAT_MEMORY_TOKENS", "600")),
+    "SUMMARY_TOKENS": 150,
+    "TTL": 2 * 60 * 60,
+    "MAX_CONVERSATIONS": 2000,
+}
+
+# System prompt layout. "all": the whole prompt as one frozen prefix, past the 1024 tokens OpenAI
+# needs before it caches a prompt (check prompt.usage.cached_ratio in chat_health).
+# "select": always-on sections + per-question sections; fewer tokens, but never provider-cached.
+CHAT_PROMPT_MODE = os.getenv("CHAT_PROMPT_MODE", "all")
+
+# Circuit breaker around OpenAI. Opens after FAILURE_THRESHOLD straight failures (or FAILURE_RATE
+# over the last WINDOW calls) and serves the offline fallback for COOLDOWN seconds, then lets one
+# probe through. Per-call timeout = rolling p99 × TIMEOUT_MULTIPLIER within [MIN_TIMEOUT, MAX_TIMEOUT].
+CHAT_BREAKER = {
+    "FAILURE_THRESHOLD": 5,
+    "WINDOW": 20,
+    "FAILURE_RATE": 0.5,
+    "COOLDOWN": int(os.getenv("CHAT_BREAKER_COOLDOWN", "15")),
+    "MIN_TIMEOUT": 8,
+    "MAX_TIMEOUT": 30,
+    "TIMEOUT_MULTIPLIER": 1.5,
+    "MIN_SAMPLES": 20,
+}
+
+# Hedged requests (blocking replies only). When a call is slower than the PERCENTILE of recent
+# latencies (clamped to [MIN_DELAY, MAX_DELAY] s), fire a second one — to MODEL if set — and take
+# whichever answers first. BUDGET caps the share of requests that may hedge, and a hedge only runs
+# if a CHAT_GOVERNOR slot is free for it.
+CHAT_HEDGE = {
+    "ENABLED": os.getenv("CHAT_HEDGE", "0") == "1",
+    "PERCENTILE": 90,
+    "MIN_DELAY": 1.0,
+    "MAX_DELAY": 8.0,
+    "BUDGET": 0.1,
+    "MODEL": os.getenv("CHAT_HEDGE_MODEL") or None,
+}
+
+# Model routing, in fallback order. A route with MAX_TOKENS / MAX_COMPLEXITY (0..1) is only the
+# *first* choice for messages within those limits; failures fall through to the next route.
+# CLIENT "local" is a canned stand-in (no key, no network) for tests and offline dev.
+CHAT_ROUTER = {
+    "ROUTES": [
+        {"MODEL": os.getenv("CHAT_FAST_MODEL", "gpt-4.1-nano"), "CLIENT": "openai",
+         "MAX_TOKENS": 24, "MAX_COMPLEXITY": 0.3},
+        {"MODEL": "gpt-4o-mini", "CLIENT": "openai"},
+    ] + ([{"MODEL": "local", "CLIENT": "local"}] if os.getenv("CHAT_LOCAL_MODEL", "0") == "1" else []),
+    "MAX_ERROR_RATE": 0.5,
+    "MAX_P90": 12.0,
+}
+
+# Chat throttling per visitor (session and client IP). Token bucket: RATE tokens/s up to BURST
+# (the IP bucket is IP_MULTIPLIER× larger). In-flight caps per visitor and site-wide. Refusals
+# are 429 + Retry-After. BACKEND "django" shares counts across workers via CACHES[ALIAS].
+# PROXIES = number of trusted reverse proxies in front of the app (1 on Railway; set
+# CHAT_TRUSTED_PROXIES=0 when serving directly, e.g. runserver, so X-Forwarded-For can't be spoofed).
+CHAT_RATE_LIMIT = {
+    "ENABLED": os.getenv("CHAT_RATE_LIMIT", "1") == "1",
+    "BACKEND": os.getenv("CHAT_RATE_LIMIT_BACKEND", "local"),
+    "ALIAS": "default",
+    "RATE": 0.2,
+    "BURST": 8,
+    "IP_MULTIPLIER": 4,
+    "PER_VISITOR_INFLIGHT": 2,
+    "GLOBAL_INFLIGHT": int(os.getenv("CHAT_GLOBAL_INFLIGHT", "64")),
+    "PROXIES": int(os.getenv("CHAT_TRUSTED_PROXIES", "1")),
+}
+
+# Upstream concurrency governor. LIMIT calls per process run at once; up to MAX_QUEUE more wait
+# (returning visitors first) for at most QUEUE_TIMEOUT s, less if the TURN_DEADLINE can't be met
+# anyway. Beyond that, turns are shed with a "busy, try again" reply (503 + Retry-After: RETRY_AFTER s
+# from the JSON endpoints). CLUSTER_LIMIT > 0 adds a cap shared by all workers through CACHES[ALIAS].
+CHAT_GOVERNOR = {
+    "LIMIT": int(os.getenv("CHAT_LLM_CONCURRENCY", "16")),
+    "MAX_QUEUE": 32,
+    "QUEUE_TIMEOUT": 8.0,
+    "TURN_DEADLINE": 25.0,
+    "CLUSTER_LIMIT": int(os.getenv("CHAT_LLM_CLUSTER_CONCURRENCY", "0")),
+    "ALIAS": "default",
+    "RETRY_AFTER": 5,
+}